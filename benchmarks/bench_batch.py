@@ -0,0 +1,83 @@
+"""Benchmark per-frame dispatch against batch decode on state-dump bursts.
+
+After JOIN UPDATE the device dumps source and volume for every zone, which
+arrives as one coalesced read of 30+ SERIAL_BINARY echoes. This compares
+handling such a burst:
+
+- per frame: `FrameReassembler.feed()`, `decode_frame()` and one awaited
+  `StateManager.update_from_device()` per frame (the previous read loop)
+- batch: `FrameReassembler.write()`, one `decode_batch()` call and one
+  awaited `StateManager.apply_batch()` for the whole burst
+
+Usage:
+    python -m benchmarks.bench_batch --bursts 5000
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+from swamp.protocol.framer import FrameReassembler
+from swamp.protocol.swamp_protocol import SwampProtocol
+
+
+def serial_binary(unit: int, zone: int, register: int, value: int) -> bytes:
+    return bytes([
+        0x05, 0x00, 0x0e, 0x00, 0x00, 0x0b, 0x20,
+        unit, 0x08, 0x20, zone, 0x05, 0x14, 0x00, register,
+        (value >> 8) & 0xff, value & 0xff,
+    ])
+
+
+async def per_frame(protocol: SwampProtocol, state_manager: StateManager, burst: bytes, bursts: int) -> float:
+    framer = FrameReassembler()
+    decode = protocol.decode_frame
+    update = state_manager.update_from_device
+    start = time.perf_counter()
+    for _ in range(bursts):
+        for frame in framer.feed(burst):
+            await update(decode(frame))
+    return time.perf_counter() - start
+
+
+async def batch(protocol: SwampProtocol, state_manager: StateManager, burst: bytes, bursts: int) -> float:
+    framer = FrameReassembler()
+    decode_batch = protocol.decode_batch
+    apply_batch = state_manager.apply_batch
+    start = time.perf_counter()
+    for _ in range(bursts):
+        framer.write(burst)
+        await apply_batch(framer.decode_batch(decode_batch))
+    return time.perf_counter() - start
+
+
+async def main_async(config_path: Path, bursts: int) -> None:
+    protocol = SwampProtocol()
+    state_manager = StateManager(ConfigManager.load(config_path))
+    zones = sorted(state_manager.state.zones)
+    burst = b''.join(
+        serial_binary(unit, zone, 0x01, 1) + serial_binary(unit, zone, 0x02, 0x8000)
+        for unit, zone in zones
+    )
+    frames = 2 * len(zones)
+
+    single = await per_frame(protocol, state_manager, burst, bursts)
+    batched = await batch(protocol, state_manager, burst, bursts)
+
+    print(f'{bursts} bursts of {frames} frames ({len(burst)} bytes), us per burst')
+    print(f'  per frame {single / bursts * 1e6:8.1f}')
+    print(f'  batch     {batched / bursts * 1e6:8.1f}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Batch decode benchmark')
+    parser.add_argument('--bursts', type=int, default=5000)
+    parser.add_argument('--config', type=Path, default=Path('config/config.yaml'))
+    args = parser.parse_args()
+    asyncio.run(main_async(args.config, args.bursts))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Micro-benchmark the sync codec API against the async compatibility wrappers.
+
+Measures per-frame cost of encoding SERIAL_BINARY commands and decoding
+register echoes via `await protocol.encode_*()` / `await protocol.decode_message()`
+versus the synchronous `*_sync` methods the server and controller now call.
+
+It also compares register frame encoding by building a byte list per call
+(the original approach) against the precompiled struct template and the
+template with the encoded-frame LRU, over a volume-ramp workload, and the
+float volume conversion against the precomputed lookup tables.
+
+Usage:
+    python -m benchmarks.bench_codec --iterations 200000
+"""
+import argparse
+import asyncio
+import time
+
+from swamp.protocol.swamp_protocol import RAW_TO_VOLUME, VOLUME_TO_RAW, SwampProtocol
+
+
+async def bench_async(protocol: SwampProtocol, iterations: int) -> tuple[float, float]:
+    frame = protocol.encode_volume_command_sync(3, 4, 50)
+    start = time.perf_counter()
+    for i in range(iterations):
+        await protocol.encode_volume_command(3, 1 + i % 8, i % 101)
+    encode = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await protocol.decode_message(frame)
+    decode = time.perf_counter() - start
+    return encode, decode
+
+
+def bench_sync(protocol: SwampProtocol, iterations: int) -> tuple[float, float]:
+    frame = protocol.encode_volume_command_sync(3, 4, 50)
+    encode_volume = protocol.encode_volume_command_sync
+    decode = protocol.decode_message_sync
+    start = time.perf_counter()
+    for i in range(iterations):
+        encode_volume(3, 1 + i % 8, i % 101)
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode(frame)
+    decode_time = time.perf_counter() - start
+    return encode_time, decode_time
+
+
+def list_built_frame(unit: int, zone: int, register_id: int, value: int) -> bytes:
+    """Original per-call list + bytes() construction, for comparison."""
+    value = max(0, min(0xFFFF, value))
+    return bytes([
+        0x05, 0x00, 0x0e, 0x00, 0x00, 0x0b, 0x20,
+        unit, 0x08, 0x20, zone, 0x05, 0x14, 0x00, register_id,
+        (value >> 8) & 0xFF, value & 0xFF,
+    ])
+
+
+def bench_register_encode(iterations: int) -> dict[str, float]:
+    # A 20-step ramp across five zones, repeated: the same frames recur
+    workload = [(5, zone, 0x02, step * 3276) for step in range(1, 21) for zone in range(1, 6)]
+    rounds = max(1, iterations // len(workload))
+    uncached = SwampProtocol(encode_cache_size=0)
+    cached = SwampProtocol()
+    results = {}
+    for name, encode in (
+        ('list + bytes()', list_built_frame),
+        ('struct template', uncached._encode_serial_binary_register),
+        ('template + LRU', cached._encode_serial_binary_register),
+    ):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for unit, zone, register_id, value in workload:
+                encode(unit, zone, register_id, value)
+        results[name] = (time.perf_counter() - start) / (rounds * len(workload))
+    return results
+
+
+def bench_volume_conversion(iterations: int) -> tuple[dict[str, float], int]:
+    results = {}
+    start = time.perf_counter()
+    for i in range(iterations):
+        int((int((i % 101 / 100) * 0xFFFF) / 0xffff) * 100)
+    results['float'] = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(iterations):
+        RAW_TO_VOLUME[VOLUME_TO_RAW[i % 101]]
+    results['lookup table'] = time.perf_counter() - start
+    lossy = sum(int((int((v / 100) * 0xFFFF) / 0xffff) * 100) != v for v in range(101))
+    return {name: seconds / iterations for name, seconds in results.items()}, lossy
+
+
+async def main_async(iterations: int) -> None:
+    protocol = SwampProtocol()
+    async_encode, async_decode = await bench_async(protocol, iterations)
+    sync_encode, sync_decode = bench_sync(protocol, iterations)
+
+    def ns(seconds: float) -> float:
+        return seconds / iterations * 1e9
+
+    print(f'{iterations} iterations (ns per frame)')
+    print(f'  encode  async {ns(async_encode):8.0f}  sync {ns(sync_encode):8.0f}  saved {ns(async_encode - sync_encode):6.0f}')
+    print(f'  decode  async {ns(async_decode):8.0f}  sync {ns(sync_decode):8.0f}  saved {ns(async_decode - sync_decode):6.0f}')
+
+    frame = protocol.encode_volume_command_sync(3, 4, 50)
+    decode_frame = protocol.decode_frame
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode_frame(frame)
+    typed_decode = time.perf_counter() - start
+    print(f'  decode  typed message (decode_frame) {ns(typed_decode):8.0f}')
+
+    print('register frame encode (ns per frame, volume ramp workload)')
+    for name, seconds in bench_register_encode(iterations).items():
+        print(f'  {name:16} {seconds * 1e9:8.0f}')
+
+    conversions, lossy = bench_volume_conversion(iterations)
+    print(f'volume encode + decode (ns per round trip, float loses {lossy}/101 levels)')
+    for name, seconds in conversions.items():
+        print(f'  {name:16} {seconds * 1e9:8.0f}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Codec sync vs async benchmark')
+    parser.add_argument('--iterations', type=int, default=200000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.iterations))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark command throughput through the JSON-RPC control API.
+
+Starts a `SwampTcpServer` with a device that signs on like
+`tests/mock_swamp.py` and drains everything sent to it, plus a
+`ControlApiServer` on a temporary Unix socket, then pushes volume commands
+for every target through the API:
+
+- sequential: one request, wait for its response, next request
+- pipelined: all requests written at once, responses read afterwards
+- batched: JSON-RPC batches of one command per target
+
+Usage:
+    python -m benchmarks.bench_control_api --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from swamp.api.control import ControlApiServer
+from swamp.core.config_manager import ConfigManager
+from swamp.core.controller import SwampController
+from swamp.core.state_manager import StateManager
+from swamp.network.tcp_server import SwampTcpServer
+from swamp.protocol.swamp_protocol import SwampProtocol
+from tests.mock_swamp import CLIENT_SIGNON
+from tests.test_helpers import get_free_port
+
+
+def volume_request(request_id: int, target: str) -> dict:
+    return {'jsonrpc': '2.0', 'id': request_id, 'method': 'volume',
+            'params': {'target': target, 'level': request_id % 101}}
+
+
+async def device(port: int) -> None:
+    """Mock amp: sign on and discard whatever arrives"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(CLIENT_SIGNON)
+    await writer.drain()
+    while await reader.read(65536):
+        pass
+
+
+async def main_async(config_path: Path, requests: int) -> None:
+    config = ConfigManager.load(config_path)
+    state_manager = StateManager(config)
+    port = get_free_port()
+    tcp_server = SwampTcpServer(port, SwampProtocol(), state_manager)
+    controller = SwampController(config, tcp_server, state_manager)
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.1)
+    device_task = asyncio.create_task(device(port))
+    while not tcp_server.magic_packets_sent:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.2)
+
+    targets = [target.id for target in config.targets]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'swamp.sock'
+        control_api = ControlApiServer(path, controller)
+        await control_api.start()
+        reader, writer = await asyncio.open_unix_connection(str(path))
+
+        start = time.perf_counter()
+        for i in range(requests):
+            writer.write(json.dumps(volume_request(i, targets[i % len(targets)])).encode() + b'\n')
+            await reader.readline()
+        sequential = requests / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        writer.write(b''.join(json.dumps(volume_request(i, targets[i % len(targets)])).encode() + b'\n'
+                              for i in range(requests)))
+        for _ in range(requests):
+            await reader.readline()
+        pipelined = requests / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        batches = requests // len(targets)
+        writer.write(b''.join(
+            json.dumps([volume_request(b * len(targets) + t, target) for t, target in enumerate(targets)]).encode()
+            + b'\n' for b in range(batches)))
+        for _ in range(batches):
+            await reader.readline()
+        batched = batches * len(targets) / (time.perf_counter() - start)
+
+        writer.close()
+        await control_api.close()
+
+    print(f'sequential {sequential:10.0f} commands/s')
+    print(f'pipelined  {pipelined:10.0f} commands/s')
+    print(f'batched    {batched:10.0f} commands/s ({len(targets)} per batch)')
+    print(f'elided     {tcp_server.frames_elided:10d} frames')
+
+    device_task.cancel()
+    server_task.cancel()
+    await asyncio.gather(device_task, server_task, return_exceptions=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Control API throughput benchmark')
+    parser.add_argument('--config', type=Path, default=Path('config/config.yaml'))
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.config, args.requests))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Micro-benchmark table-driven dispatch against the original if/elif chains.
+
+Decodes and routes a receive-path workload dominated by SERIAL_BINARY
+register echoes (with some PING/PONG traffic) two ways:
+
+- chain: the original order of checks, type byte PING -> PONG ->
+  CLIENT_SIGNON -> JOIN then join type UPDATE -> SERIAL_BINARY when
+  decoding, and ping -> pong -> join when picking a handler
+- table: `SwampProtocol.decode_frame()` with its decoder dicts, then a
+  handler dict keyed by message class as in `SwampTcpServer._handle_message`
+
+Handlers are no-ops so only dispatch and decode costs are measured.
+
+Usage:
+    python -m benchmarks.bench_dispatch --iterations 200000
+"""
+import argparse
+import time
+
+from swamp.protocol.messages import Ping, Pong, SerialBinaryJoin
+from swamp.protocol.swamp_protocol import PING, PONG, SwampProtocol
+
+
+def build_workload(protocol: SwampProtocol) -> list[bytes]:
+    echoes = [
+        protocol.encode_volume_command_sync(5, zone, step * 5)
+        for step in range(20) for zone in range(1, 6)
+    ]
+    # Roughly one keepalive frame per 50 register echoes
+    return echoes[:50] + [PING] + echoes[50:] + [PONG]
+
+
+def chain_decode(protocol: SwampProtocol, data: bytes):
+    """Original if/elif decode order, reusing the per-type decoders."""
+    if len(data) < 3:
+        return None
+    message_type = data[0]
+    remaining_length = (data[1] << 8) | data[2]
+    if len(data) < 3 + remaining_length:
+        return None
+    payload = data[3:3 + remaining_length]
+    if message_type == 0x0d:
+        return protocol._decode_ping(data, payload)
+    elif message_type == 0x0e:
+        return protocol._decode_pong(data, payload)
+    elif message_type == 0x0a:
+        return protocol._decode_client_signon(data, payload)
+    elif message_type == 0x05:
+        if len(payload) < 4:
+            return None
+        inner_length = (payload[0] << 16) | (payload[1] << 8) | payload[2]
+        join_type = payload[3]
+        join_data = payload[4:4 + inner_length - 1] if inner_length > 1 else b''
+        if join_type == 0x03:
+            return protocol._decode_join_update(join_data)
+        elif join_type == 0x20:
+            return protocol._decode_serial_binary(join_data)
+        return None
+    return None
+
+
+def handle(message) -> None:
+    pass
+
+
+def bench_chain(protocol: SwampProtocol, workload: list[bytes], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for frame in workload:
+            message = chain_decode(protocol, frame)
+            if isinstance(message, Ping):
+                handle(message)
+            elif isinstance(message, Pong):
+                handle(message)
+            elif isinstance(message, SerialBinaryJoin):
+                handle(message)
+    return time.perf_counter() - start
+
+
+def bench_table(protocol: SwampProtocol, workload: list[bytes], rounds: int) -> float:
+    handlers = {SerialBinaryJoin: handle, Ping: handle, Pong: handle}
+    decode = protocol.decode_frame
+    get_handler = handlers.get
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for frame in workload:
+            message = decode(frame)
+            handler = get_handler(type(message))
+            if handler is not None:
+                handler(message)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Message dispatch benchmark')
+    parser.add_argument('--iterations', type=int, default=200000)
+    args = parser.parse_args()
+
+    protocol = SwampProtocol()
+    workload = build_workload(protocol)
+    rounds = max(1, args.iterations // len(workload))
+    frames = rounds * len(workload)
+
+    chain = bench_chain(protocol, workload, rounds)
+    table = bench_table(protocol, workload, rounds)
+
+    print(f'{frames} frames, {len(workload) - 2}/{len(workload)} SERIAL_BINARY (ns per frame)')
+    print(f'  if/elif chain  {chain / frames * 1e9:8.0f}')
+    print(f'  dispatch table {table / frames * 1e9:8.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark the CIP frame reassembler on large coalesced bursts.
+
+Feeds a stream of SERIAL_BINARY register echoes to `FrameReassembler` in
+chunks of various sizes (whole burst, typical 1024-byte reads, awkward splits)
+and reports frames/sec, both through `feed()` and through the
+`get_buffer()` / `buffer_updated()` path used by the buffered receive mode.
+A naive reassembler that re-slices a `bytes` buffer
+for every frame is measured alongside for comparison.
+
+Usage:
+    python -m benchmarks.bench_framer --frames 50000
+"""
+import argparse
+import time
+
+from swamp.protocol.framer import FrameReassembler
+
+
+def serial_binary(unit: int, zone: int, register: int, value: int) -> bytes:
+    return bytes([
+        0x05, 0x00, 0x0e, 0x00, 0x00, 0x0b, 0x20,
+        unit, 0x08, 0x20, zone, 0x05, 0x14, 0x00, register,
+        (value >> 8) & 0xff, value & 0xff,
+    ])
+
+
+def build_stream(frames: int) -> bytes:
+    return b''.join(
+        serial_binary(3 + i % 3, 1 + i % 8, 1 + i % 2, i & 0xffff)
+        for i in range(frames)
+    )
+
+
+def chunked(stream: bytes, size: int) -> list[bytes]:
+    return [stream[i:i + size] for i in range(0, len(stream), size)]
+
+
+class NaiveReassembler:
+    """Re-slices (copies) the remaining buffer after every frame."""
+
+    def __init__(self):
+        self._buffer = b''
+
+    def feed(self, data: bytes):
+        self._buffer += data
+        while len(self._buffer) >= 3:
+            end = 3 + int.from_bytes(self._buffer[1:3], 'big')
+            if len(self._buffer) < end:
+                break
+            frame = self._buffer[:end]
+            self._buffer = self._buffer[end:]
+            yield frame
+
+
+def run(framer_cls, chunks: list[bytes]) -> tuple[int, float]:
+    framer = framer_cls()
+    count = 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        for _ in framer.feed(chunk):
+            count += 1
+    return count, time.perf_counter() - start
+
+
+def run_receive_into(chunks: list[bytes]) -> tuple[int, float]:
+    """Simulate a BufferedProtocol transport receiving into the framer's buffer."""
+    framer = FrameReassembler()
+    count = 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        size = len(chunk)
+        framer.get_buffer(size)[:size] = chunk
+        for _ in framer.buffer_updated(size):
+            count += 1
+    return count, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Frame reassembler benchmark')
+    parser.add_argument('--frames', type=int, default=50000)
+    args = parser.parse_args()
+
+    stream = build_stream(args.frames)
+    print(f'{args.frames} frames, {len(stream)} bytes')
+    for label, size in (('whole burst', len(stream)), ('1024-byte reads', 1024), ('7-byte reads', 7)):
+        chunks = chunked(stream, size)
+        for name, cls in (('FrameReassembler', FrameReassembler), ('naive bytes', NaiveReassembler)):
+            count, elapsed = run(cls, chunks)
+            assert count == args.frames
+            print(f'  {label:16} {name:17} {count / elapsed:12,.0f} frames/s')
+        if size <= FrameReassembler.MAX_FRAME_SIZE:
+            count, elapsed = run_receive_into(chunks)
+            assert count == args.frames
+            print(f'  {label:16} {"receive-into":17} {count / elapsed:12,.0f} frames/s')
+
+
+if __name__ == '__main__':
+    main()
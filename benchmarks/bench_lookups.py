@@ -0,0 +1,87 @@
+"""Benchmark StateManager lookups under an HA-style state-write storm.
+
+Every Home Assistant state write of a `SwampMediaPlayer` reads its
+properties (`state`, `volume_level`, `source`, `supported_features` and the
+`media_*` attributes), and each of them looks up the target's zones. This
+writes every entity once per round and compares:
+
+- scan: the previous lookups, a linear search of the config targets and a
+  fresh zone list per call
+- indexed: `StateManager.get_zones_for_target()` and
+  `get_source_by_swamp_id()`, served from the dict indexes
+
+Usage:
+    python -m benchmarks.bench_lookups --rounds 20000
+"""
+import argparse
+import time
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+
+# Zone lookups per state write: state, volume_level, source,
+# supported_features, and the upstream-proxied media_* attributes
+ZONE_LOOKUPS_PER_WRITE = 12
+
+
+def scan_zones(state_manager: StateManager, target_id: str):
+    for target in state_manager.config.targets:
+        if target.id == target_id:
+            return [state_manager.state.zones[(sz.unit, sz.zone)] for sz in target.swamp_zones]
+    raise ValueError(f'Unknown target: {target_id}')
+
+
+def scan_source(state_manager: StateManager, swamp_source_id: int):
+    for source in state_manager.config.sources:
+        if source.swamp_source_id == swamp_source_id:
+            return source
+    return None
+
+
+def scan(state_manager: StateManager, target_ids: list[str], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for target_id in target_ids:
+            for _ in range(ZONE_LOOKUPS_PER_WRITE):
+                zone = scan_zones(state_manager, target_id)[0]
+            scan_source(state_manager, zone.source_id)
+    return time.perf_counter() - start
+
+
+def indexed(state_manager: StateManager, target_ids: list[str], rounds: int) -> float:
+    get_zones = state_manager.get_zones_for_target
+    get_source = state_manager.get_source_by_swamp_id
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for target_id in target_ids:
+            for _ in range(ZONE_LOOKUPS_PER_WRITE):
+                zone = get_zones(target_id)[0]
+            get_source(zone.source_id)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='StateManager lookup benchmark')
+    parser.add_argument('--config', type=Path, default=Path('config/config.yaml'))
+    parser.add_argument('--rounds', type=int, default=20000)
+    args = parser.parse_args()
+
+    state_manager = StateManager(ConfigManager.load(args.config))
+    # Route a source to every zone so the source lookups hit
+    source_id = state_manager.config.sources[-1].swamp_source_id
+    for zone in state_manager.state.zones.values():
+        zone.source_id = source_id
+    target_ids = [target.id for target in state_manager.config.targets]
+    writes = args.rounds * len(target_ids)
+
+    scanned = scan(state_manager, target_ids, args.rounds)
+    lookups = indexed(state_manager, target_ids, args.rounds)
+
+    print(f'{writes} state writes ({len(target_ids)} entities), us per write')
+    print(f'  scan    {scanned / writes * 1e6:8.2f}')
+    print(f'  indexed {lookups / writes * 1e6:8.2f}')
+
+
+if __name__ == '__main__':
+    main()
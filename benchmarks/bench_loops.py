@@ -0,0 +1,104 @@
+"""Benchmark the asyncio event loop against uvloop.
+
+For each loop, starts a `SwampTcpServer` and a device that signs on like
+`tests/mock_swamp.py`, then measures:
+
+- inbound frames/sec: the device writes bursts of SERIAL_BINARY echoes (a
+  state dump's worth each) until the server has decoded and applied them all
+- command latency: single register writes sent one at a time with
+  `send_command()`, from the call until the device has read the frame
+
+uvloop is skipped if it isn't installed (`pip install .[uvloop]`).
+
+Usage:
+    python -m benchmarks.bench_loops --bursts 2000 --commands 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+from swamp.eventloop import LOOPS, loop_factory, run
+from swamp.network.tcp_server import RECEIVE_MODES, SwampTcpServer
+from swamp.protocol.swamp_protocol import SwampProtocol
+from tests.mock_swamp import CLIENT_SIGNON, read_message
+from tests.test_helpers import get_free_port
+
+UNITS = (1, 2)
+ZONES = range(1, 9)
+
+
+async def measure(config_path: Path, receive_mode: str, bursts: int, commands: int) -> tuple[float, list[float]]:
+    protocol = SwampProtocol()
+    port = get_free_port()
+    tcp_server = SwampTcpServer(port, protocol, StateManager(ConfigManager.load(config_path)),
+                                receive_mode=receive_mode)
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.1)
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(CLIENT_SIGNON)
+    await writer.drain()
+    while not tcp_server.magic_packets_sent:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.2)
+    connection = tcp_server.connection
+
+    # Inbound: state dump bursts, as after JOIN UPDATE
+    encode_route = protocol.encode_route_command_sync
+    encode_volume = protocol.encode_volume_command_sync
+    burst = b''.join(encode(unit, zone, zone) for unit in UNITS for zone in ZONES
+                     for encode in (encode_route, encode_volume))
+    frames_per_burst = len(UNITS) * len(ZONES) * 2
+    target = connection.frames_received + bursts * frames_per_burst
+    start = time.perf_counter()
+    for _ in range(bursts):
+        writer.write(burst)
+        await writer.drain()
+    while connection.frames_received < target:
+        await asyncio.sleep(0)
+    frames_per_second = bursts * frames_per_burst / (time.perf_counter() - start)
+
+    # Outbound: one command at a time
+    latencies = []
+    for level in range(commands):
+        frame = encode_volume(1, 1, level % 101)
+        start = time.perf_counter()
+        await tcp_server.send_command(frame)
+        while await read_message(reader) != frame:
+            pass
+        latencies.append(time.perf_counter() - start)
+
+    writer.close()
+    server_task.cancel()
+    await asyncio.gather(server_task, return_exceptions=True)
+    await tcp_server.close()
+    return frames_per_second, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Event loop benchmark')
+    parser.add_argument('--config', type=Path, default=Path('config/config.yaml'))
+    parser.add_argument('--receive-mode', choices=RECEIVE_MODES, default='stream')
+    parser.add_argument('--bursts', type=int, default=2000)
+    parser.add_argument('--commands', type=int, default=500)
+    args = parser.parse_args()
+
+    for name in LOOPS:
+        if name != 'asyncio' and loop_factory(name) is None:
+            print(f'{name:8s} not installed, skipped')
+            continue
+        frames_per_second, latencies = run(
+            measure(args.config, args.receive_mode, args.bursts, args.commands), name
+        )
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f'{name:8s} inbound {frames_per_second:10.0f} frames/s   '
+              f'command latency median {statistics.median(latencies) * 1e6:6.0f} us  p99 {p99 * 1e6:6.0f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark sustained command throughput under the token-bucket pacer.
+
+Starts a `SwampTcpServer` with a `rate-limit`, connects a device that signs on
+like `tests/mock_swamp.py` and counts every SERIAL_BINARY register write it
+receives, then sends rounds of distinct register writes (every zone's source
+and volume on each unit, so nothing is coalesced away) through
+`send_commands()` for the given duration.
+
+Reports the rate the device actually received against the configured ceiling
+and checks that every frame sent arrived.
+
+Usage:
+    python -m benchmarks.bench_pacing --rate 200 --burst 20 --seconds 5
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+from swamp.models.config import RateLimit
+from swamp.network.tcp_server import SwampTcpServer
+from swamp.protocol.swamp_protocol import SwampProtocol
+from tests.mock_swamp import CLIENT_SIGNON, PONG, read_message
+from tests.test_helpers import get_free_port
+
+UNITS = (1, 2, 3)
+ZONES = range(1, 9)
+
+
+async def device(port: int, received: list[float], connected: asyncio.Event) -> None:
+    """Mock amp: sign on, answer PINGs, timestamp every register write"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(CLIENT_SIGNON)
+    await writer.drain()
+    connected.set()
+    try:
+        while True:
+            frame = await read_message(reader)
+            if frame[0] == 0x0d:
+                writer.write(PONG)
+            elif len(frame) == 17 and frame[6] == 0x20:
+                received.append(time.perf_counter())
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def main_async(config_path: Path, rate_limit: RateLimit, seconds: float) -> None:
+    protocol = SwampProtocol()
+    port = get_free_port()
+    tcp_server = SwampTcpServer(port, protocol, StateManager(ConfigManager.load(config_path)),
+                                rate_limit=rate_limit)
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.1)
+
+    received: list[float] = []
+    connected = asyncio.Event()
+    device_task = asyncio.create_task(device(port, received, connected))
+    await connected.wait()
+    while not tcp_server.state_manager.state.conn_accepted_sent:
+        await asyncio.sleep(0.01)
+
+    encode_route = protocol.encode_route_command_sync
+    encode_volume = protocol.encode_volume_command_sync
+    sent = 0
+    level = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        level = (level + 1) % 101
+        frames = [encode(unit, zone, level) for unit in UNITS for zone in ZONES
+                  for encode in (encode_route, encode_volume)]
+        await tcp_server.send_commands(frames)
+        sent += len(frames)
+    await asyncio.sleep(0.2)
+
+    # Skip the initial burst so the rate reflects the sustained ceiling
+    steady = received[rate_limit.burst:]
+    elapsed = steady[-1] - steady[0] if len(steady) > 1 else 0.0
+    rate = (len(steady) - 1) / elapsed if elapsed else 0.0
+    print(f'ceiling      {rate_limit.commands_per_second:10.1f} frames/s (burst {rate_limit.burst})')
+    print(f'sustained    {rate:10.1f} frames/s')
+    print(f'sent         {sent:10d} frames')
+    print(f'received     {len(received):10d} frames')
+    print(f'dropped      {sent - len(received):10d} frames')
+    print(f'elided       {tcp_server.frames_elided:10d} frames')
+    print(f'throttled    {tcp_server.pacer.times_throttled:10d} times')
+
+    device_task.cancel()
+    server_task.cancel()
+    await asyncio.gather(device_task, server_task, return_exceptions=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Rate limiter throughput benchmark')
+    parser.add_argument('--config', type=Path, default=Path('config/config.yaml'))
+    parser.add_argument('--rate', type=float, default=200, help='Global register writes per second')
+    parser.add_argument('--burst', type=int, default=20)
+    parser.add_argument('--unit-rate', type=float, default=0, help='Per-unit register writes per second (0: off)')
+    parser.add_argument('--unit-burst', type=int, default=1)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+    rate_limit = RateLimit(args.rate, args.burst, args.unit_rate, args.unit_burst)
+    asyncio.run(main_async(args.config, rate_limit, args.seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark how quickly a rebooted device is back in service.
+
+Starts a `SwampTcpServer` and a device that signs on like `tests/mock_swamp.py`
+and echoes one register of its unit. Then, for each cycle, the device dials in
+again without closing its previous socket (as after a reboot, when the old
+connection is left half-open) and a register write is sent as soon as the
+server has taken the new session over.
+
+Reports the time from connect until the new session is ready for
+SERIAL_BINARY commands, until the stale session is gone, and until the
+command reached the new socket.
+
+Usage:
+    python -m benchmarks.bench_reconnect --cycles 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+from swamp.network.tcp_server import SwampTcpServer
+from swamp.protocol.swamp_protocol import SwampProtocol
+from tests.mock_swamp import CLIENT_SIGNON, read_message
+from tests.test_helpers import get_free_port
+
+UNIT = 1
+
+
+async def dial_in(port: int, protocol: SwampProtocol):
+    """Mock amp: connect, sign on and echo a register so the unit is known"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(CLIENT_SIGNON)
+    writer.write(protocol.encode_route_command_sync(UNIT, 1, 1))
+    await writer.drain()
+    return reader, writer
+
+
+def summary(label: str, samples: list[float]) -> None:
+    ms = [sample * 1000 for sample in samples]
+    print(f'{label:22s} mean {statistics.mean(ms):7.1f} ms   max {max(ms):7.1f} ms')
+
+
+async def main_async(config_path: Path, cycles: int) -> None:
+    protocol = SwampProtocol()
+    port = get_free_port()
+    tcp_server = SwampTcpServer(port, protocol, StateManager(ConfigManager.load(config_path)))
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.1)
+
+    sockets = [await dial_in(port, protocol)]
+    while tcp_server.connection_for_unit(UNIT) is None:
+        await asyncio.sleep(0.001)
+
+    operational: list[float] = []
+    takeover: list[float] = []
+    first_command: list[float] = []
+    for level in range(cycles):
+        stale = tcp_server.connection_for_unit(UNIT)
+        start = time.perf_counter()
+        reader, writer = await dial_in(port, protocol)
+        sockets.append((reader, writer))
+        while tcp_server.connection_for_unit(UNIT) is stale:
+            await asyncio.sleep(0)
+        session = tcp_server.connection_for_unit(UNIT)
+
+        frame = protocol.encode_volume_command_sync(UNIT, 1, level % 101)
+        await tcp_server.send_command(frame)
+        while await read_message(reader) != frame:
+            pass
+        first_command.append(time.perf_counter() - start)
+        while stale.address in tcp_server.connections:
+            await asyncio.sleep(0.001)
+        takeover.append(time.perf_counter() - start)
+        operational.append(session.time_to_operational)
+
+    print(f'cycles {cycles}, takeovers {tcp_server.takeovers}')
+    summary('ready for commands', operational)
+    summary('first command', first_command)
+    summary('stale session gone', takeover)
+
+    for _, writer in sockets:
+        writer.close()
+    server_task.cancel()
+    await asyncio.gather(server_task, return_exceptions=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Reconnect takeover benchmark')
+    parser.add_argument('--config', type=Path, default=Path('config/config.yaml'))
+    parser.add_argument('--cycles', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.config, args.cycles))
+
+
+if __name__ == '__main__':
+    main()
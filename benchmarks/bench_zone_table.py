@@ -0,0 +1,120 @@
+"""Benchmark zone state memory and bulk reads: dataclass dict against ZoneTable.
+
+Builds the state for `--zones` zones both ways and compares:
+
+- memory: bytes per zone, measured with tracemalloc, for the previous
+  dict of `(unit, zone)` -> dataclass and for a `ZoneTable`, on its own and
+  with a view created for every zone (as the StateManager indexes hold them
+  for configured zones)
+- records: copying every zone's fields out (what `get_status` does)
+- snapshot + diff: copying the state, changing one zone in ten and listing
+  the changed fields
+
+Usage:
+    python -m benchmarks.bench_zone_table --zones 10000
+"""
+import argparse
+import copy
+import dataclasses
+import time
+import tracemalloc
+
+from swamp.models.state import ZoneTable
+
+FIELDS = ('power', 'volume', 'source_id', 'muted', 'source_received')
+
+
+@dataclasses.dataclass
+class DataclassZoneState:
+    """The previous ZoneState"""
+    unit: int
+    zone: int
+    power: bool = False
+    volume: int = 0
+    source_id: int | None = None
+    muted: bool = False
+    source_received: bool = False
+
+
+def keys(count: int) -> list[tuple[int, int]]:
+    return [(unit, zone) for unit in range(count // 200 + 1) for zone in range(200)][:count]
+
+
+def build_dataclasses(count: int) -> dict:
+    return {(unit, zone): DataclassZoneState(unit, zone) for unit, zone in keys(count)}
+
+
+def build_table(count: int) -> ZoneTable:
+    table = ZoneTable()
+    for unit, zone in keys(count):
+        table.add(unit, zone)
+    return table
+
+
+def build_table_with_views(count: int) -> tuple[ZoneTable, list]:
+    table = build_table(count)
+    return table, list(table.values())
+
+
+def measure(build, count: int) -> tuple[object, float]:
+    tracemalloc.start()
+    state = build(count)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return state, size / count
+
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def dataclass_diff(zones: dict, before: dict) -> list:
+    return [
+        (key, name, getattr(before[key], name), getattr(zone, name))
+        for key, zone in zones.items() if key in before
+        for name in FIELDS if getattr(before[key], name) != getattr(zone, name)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Zone state table benchmark')
+    parser.add_argument('--zones', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    zones, dataclass_bytes = measure(build_dataclasses, args.zones)
+    table, table_bytes = measure(build_table, args.zones)
+    _, views_bytes = measure(build_table_with_views, args.zones)
+    for state in (zones, table):
+        for key in list(state)[::10]:
+            state[key].volume = 50
+
+    dataclass_records = timed(lambda: [dataclasses.astuple(z) for z in zones.values()], args.repeat)
+    table_records = timed(lambda: list(table.records()), args.repeat)
+
+    def dataclass_round():
+        before = copy.deepcopy(zones)
+        for key in list(zones)[::10]:
+            zones[key].volume += 1
+        return dataclass_diff(zones, before)
+
+    def table_round():
+        before = table.snapshot()
+        for key in list(table)[::10]:
+            table[key].volume += 1
+        return table.diff(before)
+
+    dataclass_snapshot = timed(dataclass_round, args.repeat)
+    table_snapshot = timed(table_round, args.repeat)
+
+    print(f'{args.zones} zones     dataclass   table')
+    print(f'  bytes per zone   {dataclass_bytes:9.0f} {table_bytes:7.0f} ({views_bytes:.0f} with views)')
+    print(f'  records (ms)     {dataclass_records * 1e3:9.2f} {table_records * 1e3:7.2f}')
+    print(f'  snapshot+diff    {dataclass_snapshot * 1e3:9.2f} {table_snapshot * 1e3:7.2f}')
+
+
+if __name__ == '__main__':
+    main()
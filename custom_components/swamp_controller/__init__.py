@@ -15,16 +15,44 @@ from homeassistant.exceptions import ConfigEntryNotReady
 from swamp.core.config_manager import ConfigManager
 from swamp.core.state_manager import StateManager
 from swamp.core.controller import SwampController
+from swamp.models.config import SocketOptions
 from swamp.protocol.swamp_protocol import SwampProtocol
 from swamp.network.tcp_server import SwampTcpServer
 
-from .const import CONF_CONFIG_FILE, CONF_PORT, DEFAULT_ZONE_VOLUME, DOMAIN
+from .const import (
+    CONF_CONFIG_FILE,
+    CONF_PORT,
+    CONF_TCP_KEEPALIVE_COUNT,
+    CONF_TCP_KEEPALIVE_IDLE,
+    CONF_TCP_KEEPALIVE_INTERVAL,
+    CONF_TCP_NODELAY,
+    CONF_WRITE_BUFFER_HIGH,
+    DEFAULT_TCP_KEEPALIVE_COUNT,
+    DEFAULT_TCP_KEEPALIVE_IDLE,
+    DEFAULT_TCP_KEEPALIVE_INTERVAL,
+    DEFAULT_TCP_NODELAY,
+    DEFAULT_WRITE_BUFFER_HIGH,
+    DEFAULT_ZONE_VOLUME,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.MEDIA_PLAYER]
 
 
+def _socket_options(data) -> SocketOptions:
+    """Device socket tuning from the config entry (entries made before it existed get the defaults)."""
+    write_buffer_high = data.get(CONF_WRITE_BUFFER_HIGH, DEFAULT_WRITE_BUFFER_HIGH)
+    return SocketOptions(
+        nodelay=data.get(CONF_TCP_NODELAY, DEFAULT_TCP_NODELAY),
+        keepalive_idle=data.get(CONF_TCP_KEEPALIVE_IDLE, DEFAULT_TCP_KEEPALIVE_IDLE),
+        keepalive_interval=data.get(CONF_TCP_KEEPALIVE_INTERVAL, DEFAULT_TCP_KEEPALIVE_INTERVAL),
+        keepalive_count=data.get(CONF_TCP_KEEPALIVE_COUNT, DEFAULT_TCP_KEEPALIVE_COUNT),
+        write_buffer_high=write_buffer_high or None,
+    )
+
+
 def _load_raw_yaml(path: Path) -> dict:
     """Load the config YAML as a plain dict (for keys ConfigManager doesn't parse)."""
     with open(path) as f:
@@ -82,7 +110,14 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Create core components
     protocol = SwampProtocol()
     state_manager = StateManager(config)
-    tcp_server = SwampTcpServer(port, protocol, state_manager)
+    tcp_server = SwampTcpServer(
+        port,
+        protocol,
+        state_manager,
+        rate_limit=config.rate_limit,
+        keepalive=config.keepalive,
+        socket_options=_socket_options(entry.data),
+    )
     controller = SwampController(config, tcp_server, state_manager)
 
     # Store controller and components in hass.data
@@ -123,17 +158,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         server_task = data["server_task"]
 
         # Close any active client connections
-        if tcp_server.client_writer and not tcp_server.client_writer.is_closing():
-            try:
-                tcp_server.client_writer.close()
-                await asyncio.wait_for(
-                    tcp_server.client_writer.wait_closed(),
-                    timeout=1.0,
-                )
-            except asyncio.TimeoutError:
-                _LOGGER.warning("Timeout waiting for client connection to close")
-            except Exception as err:
-                _LOGGER.debug("Error closing client connection: %s", err)
+        try:
+            await asyncio.wait_for(tcp_server.close_clients(), timeout=1.0)
+        except asyncio.TimeoutError:
+            _LOGGER.warning("Timeout waiting for client connections to close")
 
         # Cancel server task
         if server_task:
@@ -14,7 +14,23 @@ from homeassistant.exceptions import HomeAssistantError
 
 from swamp.core.config_manager import ConfigManager
 
-from .const import CONF_CONFIG_FILE, CONF_PORT, DEFAULT_CONFIG_FILE, DEFAULT_PORT, DOMAIN
+from .const import (
+    CONF_CONFIG_FILE,
+    CONF_PORT,
+    CONF_TCP_KEEPALIVE_COUNT,
+    CONF_TCP_KEEPALIVE_IDLE,
+    CONF_TCP_KEEPALIVE_INTERVAL,
+    CONF_TCP_NODELAY,
+    CONF_WRITE_BUFFER_HIGH,
+    DEFAULT_CONFIG_FILE,
+    DEFAULT_PORT,
+    DEFAULT_TCP_KEEPALIVE_COUNT,
+    DEFAULT_TCP_KEEPALIVE_IDLE,
+    DEFAULT_TCP_KEEPALIVE_INTERVAL,
+    DEFAULT_TCP_NODELAY,
+    DEFAULT_WRITE_BUFFER_HIGH,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -22,6 +38,11 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Optional(CONF_CONFIG_FILE, default=DEFAULT_CONFIG_FILE): str,
         vol.Optional(CONF_PORT, default=DEFAULT_PORT): int,
+        vol.Optional(CONF_TCP_NODELAY, default=DEFAULT_TCP_NODELAY): bool,
+        vol.Optional(CONF_TCP_KEEPALIVE_IDLE, default=DEFAULT_TCP_KEEPALIVE_IDLE): int,
+        vol.Optional(CONF_TCP_KEEPALIVE_INTERVAL, default=DEFAULT_TCP_KEEPALIVE_INTERVAL): int,
+        vol.Optional(CONF_TCP_KEEPALIVE_COUNT, default=DEFAULT_TCP_KEEPALIVE_COUNT): int,
+        vol.Optional(CONF_WRITE_BUFFER_HIGH, default=DEFAULT_WRITE_BUFFER_HIGH): int,
     }
 )
 
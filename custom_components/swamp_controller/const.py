@@ -5,11 +5,25 @@ DOMAIN = "swamp_controller"
 # Configuration
 CONF_CONFIG_FILE = "config_file"
 CONF_PORT = "port"
+CONF_TCP_NODELAY = "tcp_nodelay"
+CONF_TCP_KEEPALIVE_IDLE = "tcp_keepalive_idle"
+CONF_TCP_KEEPALIVE_INTERVAL = "tcp_keepalive_interval"
+CONF_TCP_KEEPALIVE_COUNT = "tcp_keepalive_count"
+CONF_WRITE_BUFFER_HIGH = "write_buffer_high"
 
 # Defaults
 DEFAULT_PORT = 41794
 DEFAULT_CONFIG_FILE = "/config/swamp_config.yaml"
 
+# Device socket tuning (see swamp.models.config.SocketOptions); a keepalive idle
+# of 0 disables TCP keepalive and a write buffer high-water mark of 0 keeps
+# asyncio's default
+DEFAULT_TCP_NODELAY = True
+DEFAULT_TCP_KEEPALIVE_IDLE = 30
+DEFAULT_TCP_KEEPALIVE_INTERVAL = 10
+DEFAULT_TCP_KEEPALIVE_COUNT = 3
+DEFAULT_WRITE_BUFFER_HIGH = 0
+
 # Volume (0-100) a zone is set to when the player is turned on, so enabling a zone
 # isn't silent. Overridable globally (`default-volume:`) and per-zone (`default-volume:`
 # on a target) in the config file.
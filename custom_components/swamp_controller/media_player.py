@@ -20,7 +20,8 @@ from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.event import async_track_state_change_event
 
-from swamp.models.state import ZoneState
+from swamp.models.state import StateChange, ZoneState
+from swamp.network.outbound import Priority
 
 from .const import DOMAIN
 
@@ -68,15 +69,19 @@ async def async_setup_entry(
             )
         )
 
-    async_add_entities(entities, True)
+    async_add_entities(entities)
     _LOGGER.info("Added %d SWAMP media player entities", len(entities))
 
 
 class SwampMediaPlayer(MediaPlayerEntity):
-    """Representation of a SWAMP target as a media player."""
+    """Representation of a SWAMP target as a media player.
+
+    Not polled: the entity subscribes to StateManager changes for its own zones
+    and to connection changes, and writes its state when one of them fires.
+    """
 
     _attr_has_entity_name = True
-    _attr_should_poll = True
+    _attr_should_poll = False
 
     def __init__(
         self,
@@ -96,6 +101,9 @@ class SwampMediaPlayer(MediaPlayerEntity):
         # that actually renders that source, e.g. Music Assistant). Empty if none.
         self._upstream_players = upstream_players or {}
         self._unsub_upstream = None
+        self._unsub_zones = None
+        self._unsub_connected = None
+        self._write_scheduled = False
 
         # Set unique ID and device info
         self._attr_unique_id = f"{config_entry.entry_id}_{target.id}"
@@ -106,10 +114,6 @@ class SwampMediaPlayer(MediaPlayerEntity):
         self._source_id_map = {
             source.name: source.id for source in controller.config.sources
         }
-        self._swamp_source_to_name = {
-            source.swamp_source_id: source.name
-            for source in controller.config.sources
-        }
 
         # Features the zone always has (independent of source). Transport controls are
         # added dynamically by `supported_features` when on a proxied source.
@@ -134,7 +138,7 @@ class SwampMediaPlayer(MediaPlayerEntity):
             "via_device": (DOMAIN, self._config_entry.entry_id),
         }
 
-    def _get_zones(self) -> list[ZoneState]:
+    def _get_zones(self) -> tuple[ZoneState, ...]:
         """Get all zones for this target."""
         return self._controller.state.get_zones_for_target(self._target.id)
 
@@ -209,8 +213,8 @@ class SwampMediaPlayer(MediaPlayerEntity):
         if not zone or zone.source_id is None or zone.source_id == 0:
             return None
 
-        # Map swamp_source_id to source name
-        return self._swamp_source_to_name.get(zone.source_id)
+        source = self._controller.state.get_source_by_swamp_id(zone.source_id)
+        return source.name if source else None
 
     @property
     def supported_features(self) -> MediaPlayerEntityFeature:
@@ -315,19 +319,16 @@ class SwampMediaPlayer(MediaPlayerEntity):
         """Turn the media player off."""
         self._cancel_ramp()
         await self._controller.set_power(self._target.id, False)
-        self.async_write_ha_state()
 
     async def async_set_volume_level(self, volume: float) -> None:
         """Set volume level, range 0..1."""
         self._cancel_ramp()  # a manual volume change cancels an in-progress ramp
         volume_percent = int(volume * 100)
         await self._controller.set_volume(self._target.id, volume_percent)
-        self.async_write_ha_state()
 
     async def _begin_ramp(self, target_volume: int) -> None:
         """Set the zone to 0 and reflect it now, then ramp up in the background."""
         await self._controller.set_volume(self._target.id, 0)
-        self.async_write_ha_state()
         self._cancel_ramp()
         self._ramp_task = self.hass.async_create_background_task(
             self._ramp_volume(target_volume), name=f"swamp_volume_ramp_{self._target.id}"
@@ -340,21 +341,53 @@ class SwampMediaPlayer(MediaPlayerEntity):
         self._ramp_task = None
 
     async def _ramp_volume(self, target_volume: int) -> None:
-        """Ramp 0 -> target_volume over VOLUME_RAMP_SECONDS, pushing state each step."""
+        """Ramp 0 -> target_volume over VOLUME_RAMP_SECONDS (each step's volume change pushes state)."""
         interval = VOLUME_RAMP_SECONDS / VOLUME_RAMP_STEPS
         try:
             for step in range(1, VOLUME_RAMP_STEPS + 1):
                 level = round(target_volume * step / VOLUME_RAMP_STEPS)
-                await self._controller.set_volume(self._target.id, level)
-                self.async_write_ha_state()
+                await self._controller.set_volume(self._target.id, level, Priority.BACKGROUND)
                 if step < VOLUME_RAMP_STEPS:
                     await asyncio.sleep(interval)
         except asyncio.CancelledError:
             pass
 
+    @callback
+    def _schedule_write(self) -> None:
+        """Write state once, after every change applied in this loop iteration."""
+        if self._write_scheduled:
+            return
+        self._write_scheduled = True
+        self.hass.loop.call_soon(self._write_state)
+
+    @callback
+    def _write_state(self) -> None:
+        self._write_scheduled = False
+        if self.hass is not None and self.platform is not None:
+            self.async_write_ha_state()
+
+    @callback
+    def _zone_changed(self, change: StateChange) -> None:
+        """One of this target's zones changed (device report or optimistic update)."""
+        self._schedule_write()
+
+    @callback
+    def _connection_changed(self, connected: bool) -> None:
+        """The SWAMP came or went: availability and state follow it."""
+        self._schedule_write()
+
     async def async_added_to_hass(self) -> None:
-        """Subscribe to the upstream players so the zone updates the moment they do."""
+        """Subscribe to zone and connection changes, and to the upstream players.
+
+        The zone updates the moment any of them change; nothing is polled.
+        """
         await super().async_added_to_hass()
+        self._unsub_zones = self._controller.state.subscribe(
+            self._zone_changed,
+            zones=[(z.unit, z.zone) for z in self._target.swamp_zones],
+        )
+        self._unsub_connected = self._controller.tcp.subscribe_connected(self._connection_changed)
+
         entity_ids = list(set(self._upstream_players.values()))
         if not entity_ids:
             return
@@ -372,6 +405,11 @@ class SwampMediaPlayer(MediaPlayerEntity):
     async def async_will_remove_from_hass(self) -> None:
         """Cancel any in-progress ramp and unsubscribe when the entity goes away."""
         self._cancel_ramp()
+        for unsub in (self._unsub_zones, self._unsub_connected):
+            if unsub is not None:
+                unsub()
+        self._unsub_zones = None
+        self._unsub_connected = None
         if self._unsub_upstream is not None:
             self._unsub_upstream()
             self._unsub_upstream = None
@@ -445,9 +483,3 @@ class SwampMediaPlayer(MediaPlayerEntity):
 
         if was_off:
             await self._begin_ramp(self._default_volume)
-
-    async def async_update(self) -> None:
-        """Update the entity state."""
-        # State is read directly from state_manager which is updated by the TCP server
-        # No need to do anything here, just trigger a state update
-        pass
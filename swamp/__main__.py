@@ -3,14 +3,17 @@ import asyncio
 import logging
 from pathlib import Path
 
+from swamp.api.control import ControlApiServer
 from swamp.core.config_manager import ConfigManager
 from swamp.core.state_manager import StateManager
 from swamp.core.controller import SwampController
+from swamp.daemon import server_failed, wait_for_shutdown, wait_until_listening
+from swamp.eventloop import LOOPS, run
+from swamp.models.config import SocketOptions
 from swamp.protocol.swamp_protocol import SwampProtocol
-from swamp.network.tcp_server import SwampTcpServer
+from swamp.network.tcp_server import RECEIVE_MODES, SwampTcpServer
 from swamp.shell.parser import CommandParser
 from swamp.shell.commands import CommandHandlers
-from swamp.shell.repl import InteractiveShell
 
 
 def setup_logging(level: str):
@@ -26,20 +29,56 @@ def setup_logging(level: str):
     )
 
 
-async def main_async():
-    """Main async entry point"""
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='SWAMP Media Controller')
     parser.add_argument('--port', type=int, default=41794,
                        help='TCP port to listen on for SWAMP device (default: 41794)')
     parser.add_argument('--config', type=Path,
                        default=Path('config/config.yaml'),
                        help='Path to configuration file (default: config/config.yaml)')
+    parser.add_argument('--receive-mode', choices=RECEIVE_MODES, default='stream',
+                       help='Receive path: StreamReader or zero-copy BufferedProtocol (default: stream)')
+    parser.add_argument('--no-nodelay', dest='nodelay', action='store_false',
+                       help='Leave Nagle\'s algorithm on for device sockets (TCP_NODELAY off)')
+    parser.add_argument('--tcp-keepalive-idle', type=int, default=30,
+                       help='Seconds idle before TCP keepalive probes start, 0 to disable (default: 30)')
+    parser.add_argument('--tcp-keepalive-interval', type=int, default=10,
+                       help='Seconds between TCP keepalive probes (default: 10)')
+    parser.add_argument('--tcp-keepalive-count', type=int, default=3,
+                       help='Unanswered TCP keepalive probes before the socket is dropped (default: 3)')
+    parser.add_argument('--write-buffer-high', type=int,
+                       help='Transport write buffer high-water mark in bytes (default: asyncio\'s)')
+    parser.add_argument('--write-buffer-low', type=int,
+                       help='Transport write buffer low-water mark in bytes (default: asyncio\'s)')
+    parser.add_argument('--control-socket', type=Path,
+                       help='Serve the JSON-RPC control API on this Unix socket path')
+    parser.add_argument('--daemon', action='store_true',
+                       help='Run headless as a service, without the interactive shell; stops on SIGTERM/SIGINT')
+    parser.add_argument('--loop', choices=LOOPS, default='asyncio',
+                       help='Event loop implementation; uvloop must be installed (default: asyncio)')
     parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
                        default='INFO', help='Logging level (default: INFO)')
 
-    args = parser.parse_args()
+    return parser.parse_args()
 
-    setup_logging(args.log_level)
+
+async def run_shell(cmd_parser: CommandParser, handlers: CommandHandlers, port: int):
+    """Run the interactive shell until the user quits"""
+    # prompt_toolkit is only loaded for the shell, so --daemon doesn't pay for it
+    from swamp.shell.repl import InteractiveShell
+
+    shell = InteractiveShell(cmd_parser, handlers)
+
+    print(f"SWAMP Controller v0.1.0")
+    print(f"Listening for SWAMP device on port {port}")
+    print(f"Type 'help' for available commands\n")
+
+    await shell.run()
+
+
+async def main_async(args: argparse.Namespace):
+    """Main async entry point"""
     logger = logging.getLogger(__name__)
 
     logger.info('Starting SWAMP Controller')
@@ -53,7 +92,21 @@ async def main_async():
 
     protocol = SwampProtocol()
     state_manager = StateManager(config)
-    tcp_server = SwampTcpServer(args.port, protocol, state_manager)
+    try:
+        socket_options = SocketOptions(
+            nodelay=args.nodelay,
+            keepalive_idle=args.tcp_keepalive_idle,
+            keepalive_interval=args.tcp_keepalive_interval,
+            keepalive_count=args.tcp_keepalive_count,
+            write_buffer_high=args.write_buffer_high,
+            write_buffer_low=args.write_buffer_low,
+        )
+    except ValueError as e:
+        logger.error(f'Invalid socket options: {e}')
+        return 1
+    tcp_server = SwampTcpServer(args.port, protocol, state_manager, receive_mode=args.receive_mode,
+                                rate_limit=config.rate_limit, keepalive=config.keepalive,
+                                socket_options=socket_options)
     controller = SwampController(config, tcp_server, state_manager)
 
     cmd_parser = CommandParser()
@@ -67,32 +120,40 @@ async def main_async():
     cmd_parser.register('list', handlers.cmd_list)
     cmd_parser.register('help', handlers.cmd_help)
 
-    shell = InteractiveShell(cmd_parser, handlers)
-
-    print(f"SWAMP Controller v0.1.0")
-    print(f"Listening for SWAMP device on port {args.port}")
-    print(f"Type 'help' for available commands\n")
-
     server_task = asyncio.create_task(tcp_server.start())
+    control_api = None
 
     try:
-        await shell.run()
+        if args.control_socket:
+            control_api = ControlApiServer(args.control_socket, controller)
+            try:
+                await control_api.start()
+            except OSError as e:
+                logger.error(f'Failed to start control API on {args.control_socket}: {e}')
+                control_api = None
+                return 1
+
+        if args.daemon:
+            if await wait_until_listening(tcp_server.listening, server_task):
+                logger.info(f'Running headless, listening for SWAMP device on port {args.port}')
+                await wait_for_shutdown(server_task)
+            if server_failed(server_task):
+                logger.error(f'TCP server on port {args.port} failed: {server_task.exception()}')
+                return 1
+        else:
+            await run_shell(cmd_parser, handlers, args.port)
     except KeyboardInterrupt:
         logger.info('Interrupted by user')
     finally:
         logger.info('Shutting down')
+        if control_api is not None:
+            await control_api.close()
+
         # Close any active client connections first
-        if tcp_server.client_writer and not tcp_server.client_writer.is_closing():
-            try:
-                tcp_server.client_writer.close()
-                await asyncio.wait_for(
-                    tcp_server.client_writer.wait_closed(),
-                    timeout=1.0
-                )
-            except asyncio.TimeoutError:
-                logger.warning('Timeout waiting for client connection to close')
-            except Exception as e:
-                logger.debug(f'Error closing client connection: {e}')
+        try:
+            await asyncio.wait_for(tcp_server.close_clients(), timeout=1.0)
+        except asyncio.TimeoutError:
+            logger.warning('Timeout waiting for client connections to close')
 
         # Cancel server task (the async with context will close the server)
         server_task.cancel()
@@ -110,8 +171,10 @@ async def main_async():
 
 def main():
     """Main entry point"""
+    args = parse_args()
+    setup_logging(args.log_level)
     try:
-        return asyncio.run(main_async())
+        return run(main_async(args), args.loop)
     except KeyboardInterrupt:
         return 0
 
@@ -0,0 +1,239 @@
+import asyncio
+import inspect
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from ..core.controller import SwampController
+
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+# Longest request line accepted (a batch of many commands is one line)
+MAX_LINE = 1024 * 1024
+# Requests in flight per client before reading stops until one completes
+MAX_PENDING = 1024
+
+
+class RpcError(Exception):
+    """Error returned to the client as a JSON-RPC error object"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class ControlApiServer:
+    """JSON-RPC 2.0 control API on a Unix domain socket
+
+    Requests and responses are newline-delimited JSON, one object (or one
+    batch array) per line. Each connection is read continuously: every request
+    starts as soon as its line arrives, so clients can pipeline without waiting
+    for responses, which carry the request `id` and are written as requests
+    complete. Requests start in the order they were sent, so the commands they
+    queue go to the SWAMP in that order, and the commands of requests arriving
+    together leave in one batch. Requests without an `id` are notifications
+    and get no response.
+
+    Methods (params by name or by position):
+      route(source, target), volume(target, level=None, delta=None),
+      power(target, on, source=None), whois(), status(target=None),
+      sources(), targets()
+    """
+
+    def __init__(self, path: str | Path, controller: SwampController):
+        self.path = Path(path)
+        self.controller = controller
+        self.server: asyncio.AbstractServer | None = None
+        self.requests_handled = 0
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._closing = False
+        self._methods = {
+            'route': self.route,
+            'volume': self.volume,
+            'power': self.power,
+            'whois': self.whois,
+            'status': self.status,
+            'sources': self.sources,
+            'targets': self.targets,
+        }
+        self._signatures = {name: inspect.signature(method) for name, method in self._methods.items()}
+
+    async def start(self) -> None:
+        """Start listening on the socket path, replacing a stale socket file"""
+        self._closing = False
+        self.server = await asyncio.start_unix_server(self.handle_client, str(self.path), limit=MAX_LINE)
+        logger.info(f'Control API listening on {self.path}')
+
+    async def close(self) -> None:
+        """Stop listening and remove the socket file"""
+        self._closing = True
+        if self.server is not None:
+            self.server.close()
+            for writer in list(self._clients):
+                writer.close()
+            await self.server.wait_closed()
+            self.server = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one API client until it disconnects"""
+        if self._closing:
+            # Accepted just as the API was closed
+            writer.close()
+            return
+        pending: set[asyncio.Task] = set()
+        self._clients.add(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Line longer than MAX_LINE; the stream can't be resynchronised
+                    self._send(writer, self._error(None, INVALID_REQUEST, 'Request too long'))
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(self._handle_line(line, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                if len(pending) >= MAX_PENDING:
+                    await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if pending:
+                await asyncio.gather(*pending)
+            await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            for task in pending:
+                task.cancel()
+        except Exception as e:
+            logger.error(f'Error in control API client: {e}')
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _handle_line(self, line: bytes, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            self._send(writer, self._error(None, PARSE_ERROR, f'Parse error: {e}'))
+            return
+
+        if isinstance(request, list):
+            if not request:
+                self._send(writer, self._error(None, INVALID_REQUEST, 'Empty batch'))
+                return
+            # Start every call before awaiting any, so their commands are queued together
+            responses = await asyncio.gather(*(self._call(item) for item in request))
+            responses = [response for response in responses if response is not None]
+            if responses:
+                self._send(writer, responses)
+        else:
+            response = await self._call(request)
+            if response is not None:
+                self._send(writer, response)
+        await writer.drain()
+
+    async def _call(self, request: Any) -> dict | None:
+        """Run one JSON-RPC request object; returns its response, or None for a notification"""
+        if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' or not isinstance(request.get('method'), str):
+            return self._error(request.get('id') if isinstance(request, dict) else None,
+                               INVALID_REQUEST, 'Invalid request')
+
+        request_id = request.get('id')
+        try:
+            result = await self._dispatch(request['method'], request.get('params', {}))
+        except RpcError as e:
+            response = self._error(request_id, e.code, e.message)
+        except (ValueError, ConnectionError) as e:
+            response = self._error(request_id, SERVER_ERROR, str(e))
+        except Exception as e:
+            logger.error(f'Error in control API method {request["method"]}: {e}')
+            response = self._error(request_id, SERVER_ERROR, f'Internal error: {e}')
+        else:
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+        self.requests_handled += 1
+        return response if 'id' in request else None
+
+    def _dispatch(self, name: str, params: Any):
+        method = self._methods.get(name)
+        if method is None:
+            raise RpcError(METHOD_NOT_FOUND, f'Method not found: {name}')
+        try:
+            if isinstance(params, dict):
+                self._signatures[name].bind(**params)
+                return method(**params)
+            if isinstance(params, list):
+                self._signatures[name].bind(*params)
+                return method(*params)
+        except TypeError as e:
+            raise RpcError(INVALID_PARAMS, f'Invalid params: {e}') from None
+        raise RpcError(INVALID_PARAMS, 'Invalid params: expected an object or array')
+
+    @staticmethod
+    def _error(request_id, code: int, message: str) -> dict:
+        return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+    @staticmethod
+    def _send(writer: asyncio.StreamWriter, response) -> None:
+        writer.write(json.dumps(response, separators=(',', ':')).encode() + b'\n')
+
+    async def route(self, source: str, target: str) -> None:
+        await self.controller.route_source_to_target(source, target)
+
+    async def volume(self, target: str, level: int | None = None, delta: int | None = None) -> int:
+        if (level is None) == (delta is None):
+            raise RpcError(INVALID_PARAMS, 'Invalid params: pass one of level or delta')
+        if delta is not None:
+            if not isinstance(delta, int):
+                raise RpcError(INVALID_PARAMS, 'Invalid params: delta must be an integer')
+            zones = self.controller.state.get_zones_for_target(target)
+            level = max(0, min(100, zones[0].volume + delta))
+        elif not isinstance(level, int) or not 0 <= level <= 100:
+            raise RpcError(INVALID_PARAMS, 'Invalid params: level must be an integer between 0 and 100')
+        await self.controller.set_volume(target, level)
+        return level
+
+    async def power(self, target: str, on: bool, source: str | None = None) -> None:
+        await self.controller.set_power(target, bool(on), source)
+
+    async def whois(self) -> None:
+        await self.controller.send_whois()
+
+    async def status(self, target: str | None = None) -> dict:
+        status = await self.controller.get_status()
+        if target is not None:
+            status['targets'] = [t for t in status['targets'] if t['id'] == target]
+            if not status['targets']:
+                raise ValueError(f'Unknown target: {target}')
+        # Latency counters aren't JSON; the API reports the traffic counters only
+        for connection in status.get('connections', []):
+            connection.pop('latency', None)
+        return status
+
+    async def sources(self) -> list[dict]:
+        return [
+            {'id': source.id, 'name': source.name, 'swamp_source_id': source.swamp_source_id}
+            for source in self.controller.config.sources
+        ]
+
+    async def targets(self) -> list[dict]:
+        return [
+            {'id': target.id, 'name': target.name,
+             'zones': [{'unit': z.unit, 'zone': z.zone} for z in target.swamp_zones]}
+            for target in self.controller.config.targets
+        ]
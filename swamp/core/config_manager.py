@@ -1,6 +1,6 @@
 import yaml
 from pathlib import Path
-from ..models.config import AppConfig, Source, Target, SwampZone
+from ..models.config import AppConfig, Keepalive, RateLimit, Source, Target, SwampZone
 
 
 class ConfigManager:
@@ -33,4 +33,22 @@ class ConfigManager:
             for t in data['targets']
         ]
 
-        return AppConfig(sources=sources, targets=targets)
+        rate_limit = None
+        if data.get('rate-limit'):
+            r = data['rate-limit']
+            rate_limit = RateLimit(
+                commands_per_second=r.get('commands-per-second', 0),
+                burst=r.get('burst', 1),
+                unit_commands_per_second=r.get('unit-commands-per-second', 0),
+                unit_burst=r.get('unit-burst', 1)
+            )
+
+        keepalive = None
+        if data.get('keepalive'):
+            k = data['keepalive']
+            keepalive = Keepalive(
+                ping_interval=k.get('ping-interval', Keepalive.ping_interval),
+                timeout=k.get('timeout', Keepalive.timeout)
+            )
+
+        return AppConfig(sources=sources, targets=targets, rate_limit=rate_limit, keepalive=keepalive)
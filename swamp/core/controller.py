@@ -1,5 +1,7 @@
 import logging
 from ..models.config import AppConfig
+from ..network.outbound import Priority
+from ..protocol.swamp_protocol import VOLUME_MAX
 
 
 logger = logging.getLogger(__name__)
@@ -9,10 +11,14 @@ class SwampController:
     """Main coordinator - orchestrates all layers"""
 
     def __init__(self, config: AppConfig, tcp_server, state_manager):
-        self.config = config
         self.tcp = tcp_server
         self.state = state_manager
 
+    @property
+    def config(self) -> AppConfig:
+        """The StateManager's config, so `StateManager.set_config()` reaches the controller too"""
+        return self.state.config
+
     async def route_source_to_target(self, source_id: str, target_id: str) -> None:
         """High-level routing command"""
         source = self.state.get_source_by_id(source_id)
@@ -20,27 +26,34 @@ class SwampController:
 
         logger.info(f"Routing {source.name} to {target_id} ({len(zones)} zones)")
 
-        for zone_state in zones:
-            command_bytes = await self.tcp.protocol.encode_route_command(
-                zone_state.unit, zone_state.zone, source.swamp_source_id
-            )
-            await self.tcp.send_command(command_bytes)
+        encode_route = self.tcp.protocol.encode_route_command_sync
+        await self.tcp.send_commands([
+            encode_route(zone_state.unit, zone_state.zone, source.swamp_source_id)
+            for zone_state in zones
+        ])
+
+        self.state.set_optimistic(zones, source_id=source.swamp_source_id)
 
-            zone_state.source_id = source.swamp_source_id
+    async def set_volume(self, target_id: str, level: int,
+                         priority: Priority = Priority.INTERACTIVE) -> None:
+        """Set volume for target
 
-    async def set_volume(self, target_id: str, level: int) -> None:
-        """Set volume for target"""
+        Pass `Priority.BACKGROUND` for bulk changes such as ramp steps, so
+        interactive commands overtake them. `level` is rounded and clamped to
+        0-100, the value that is both sent and assumed.
+        """
         zones = self.state.get_zones_for_target(target_id)
+        level = max(0, min(VOLUME_MAX, int(round(level))))
 
         logger.info(f"Setting {target_id} volume to {level} ({len(zones)} zones)")
 
-        for zone_state in zones:
-            command_bytes = await self.tcp.protocol.encode_volume_command(
-                zone_state.unit, zone_state.zone, level
-            )
-            await self.tcp.send_command(command_bytes)
+        encode_volume = self.tcp.protocol.encode_volume_command_sync
+        await self.tcp.send_commands([
+            encode_volume(zone_state.unit, zone_state.zone, level)
+            for zone_state in zones
+        ], priority=priority)
 
-            zone_state.volume = level
+        self.state.set_optimistic(zones, volume=level)
 
     async def set_power(self, target_id: str, power_on: bool, source_id: str | None = None) -> None:
         """Set power for target (really just routes source to zone)
@@ -57,30 +70,30 @@ class SwampController:
             swamp_source_id = source.swamp_source_id
             logger.info(f"Powering on {target_id} with source {source_id} ({len(zones)} zones)")
 
-            for zone_state in zones:
-                # Use route command for power on (sets the actual source)
-                command_bytes = await self.tcp.protocol.encode_route_command(
-                    zone_state.unit, zone_state.zone, swamp_source_id
-                )
-                await self.tcp.send_command(command_bytes)
-                zone_state.power = True
-                zone_state.source_id = swamp_source_id
+            # Use route command for power on (sets the actual source)
+            encode_route = self.tcp.protocol.encode_route_command_sync
+            await self.tcp.send_commands([
+                encode_route(zone_state.unit, zone_state.zone, swamp_source_id)
+                for zone_state in zones
+            ])
+
+            self.state.set_optimistic(zones, power=True, source_id=swamp_source_id)
         else:
             # Power off = route source 0 (no source) to zone
             logger.info(f"Powering off {target_id} ({len(zones)} zones)")
 
-            for zone_state in zones:
-                command_bytes = await self.tcp.protocol.encode_power_command(
-                    zone_state.unit, zone_state.zone, False
-                )
-                await self.tcp.send_command(command_bytes)
-                zone_state.power = False
-                zone_state.source_id = None
+            encode_power = self.tcp.protocol.encode_power_command_sync
+            await self.tcp.send_commands([
+                encode_power(zone_state.unit, zone_state.zone, False)
+                for zone_state in zones
+            ])
+
+            self.state.set_optimistic(zones, power=False, source_id=None)
 
     async def send_whois(self) -> None:
         """Send WHOIS request to connected device"""
         logger.info("Sending WHOIS request")
-        whois_bytes = await self.tcp.protocol.encode_whois()
+        whois_bytes = self.tcp.protocol.encode_whois_sync()
         await self.tcp.send_command(whois_bytes)
 
     async def get_status(self) -> dict:
@@ -88,10 +101,9 @@ class SwampController:
         state = self.state.state
 
         # Calculate time since last message
-        time_since_last = None
-        if state.last_message_received:
-            from datetime import datetime
-            time_since_last = (datetime.now() - state.last_message_received).total_seconds()
+        time_since_last = self.tcp.seconds_since_last_message()
+        # One pass over the zone table rather than a field read per zone view
+        zones = {(z.unit, z.zone): z for z in state.zones.records()}
 
         return {
             'connected': state.connected,
@@ -99,6 +111,7 @@ class SwampController:
             'conn_accepted_sent': state.conn_accepted_sent,
             'client_address': state.client_address,
             'last_message_seconds': time_since_last,
+            'connections': list(self.tcp.connection_stats().values()),
             'targets': [
                 {
                     'id': target.id,
@@ -112,7 +125,7 @@ class SwampController:
                             'source': z.source_id,
                             'source_received': z.source_received
                         }
-                        for z in self.state.get_zones_for_target(target.id)
+                        for z in (zones[(sz.unit, sz.zone)] for sz in target.swamp_zones)
                     ]
                 }
                 for target in self.config.targets
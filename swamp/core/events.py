@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import weakref
+from collections import deque
+from typing import Callable, Iterable
+
+from ..models.state import StateChange, ZoneKey
+
+
+logger = logging.getLogger(__name__)
+
+# Changes a `changes()` iterator holds for a consumer that falls behind
+CHANGES_BACKLOG = 1024
+
+
+class EventBus:
+    """Publish/subscribe for zone state changes
+
+    Subscribers either register a callback, called synchronously for each
+    change as it is applied, or iterate `changes()` from a task. Both can be
+    limited to a set of zones, so a consumer is only woken for the zones it
+    shows. Publishing to a zone nobody watches does nothing.
+    """
+
+    def __init__(self):
+        self._all: list[Callable[[StateChange], None]] = []
+        self._by_zone: dict[ZoneKey, list[Callable[[StateChange], None]]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._all or self._by_zone)
+
+    def subscribe(self, callback: Callable[[StateChange], None],
+                  zones: Iterable[ZoneKey] | None = None) -> Callable[[], None]:
+        """Call `callback(change)` for changes (to `zones`, if given); returns an unsubscribe function"""
+        if zones is None:
+            self._all.append(callback)
+            return lambda: self._all.remove(callback)
+
+        keys = list(dict.fromkeys(zones))
+        for key in keys:
+            self._by_zone.setdefault(key, []).append(callback)
+
+        def unsubscribe() -> None:
+            for key in keys:
+                callbacks = self._by_zone[key]
+                callbacks.remove(callback)
+                if not callbacks:
+                    del self._by_zone[key]
+        return unsubscribe
+
+    def changes(self, zones: Iterable[ZoneKey] | None = None,
+                backlog: int = CHANGES_BACKLOG) -> 'ChangeStream':
+        """Iterate over changes (to `zones`, if given) from now on, until the iterator is closed
+
+        Subscribes at once, so nothing published between this call and the
+        first iteration is missed. Wrap in `contextlib.aclosing()` to
+        unsubscribe as soon as the loop ends. See `ChangeStream` for what
+        happens to a consumer that falls behind.
+        """
+        return ChangeStream(self, zones, backlog)
+
+    def publish(self, change: StateChange) -> None:
+        """Deliver `change` to the subscribers watching its zone"""
+        callbacks = self._by_zone.get(change.key)
+        if callbacks:
+            self._deliver(callbacks, change)
+        if self._all:
+            self._deliver(self._all, change)
+
+    @staticmethod
+    def _deliver(callbacks: list[Callable[[StateChange], None]], change: StateChange) -> None:
+        for callback in list(callbacks):
+            try:
+                callback(change)
+            except Exception as e:
+                logger.error(f'Error in state change subscriber: {e}')
+
+
+class ChangeStream:
+    """Async iterator over the changes an `EventBus` publishes
+
+    Holds at most `backlog` undelivered changes: when a slow consumer lets it
+    fill up, the oldest are dropped (and counted in `dropped`), so the newest
+    value of every field still arrives. `aclose()` unsubscribes, as does
+    garbage collection of a stream that was never closed.
+    """
+
+    def __init__(self, bus: EventBus, zones: Iterable[ZoneKey] | None, backlog: int):
+        self._pending: deque[StateChange] = deque(maxlen=backlog)
+        self._waiter: asyncio.Future | None = None
+        self._closed = False
+        self.dropped = 0
+        # The bus only holds a weak reference, so an abandoned stream is collected
+        ref = weakref.ref(self)
+
+        def put(change: StateChange) -> None:
+            stream = ref()
+            if stream is not None:
+                stream._put(change)
+        self._unsubscribe = weakref.finalize(self, bus.subscribe(put, zones))
+
+    def _put(self, change: StateChange) -> None:
+        pending = self._pending
+        if len(pending) == pending.maxlen:
+            self.dropped += 1
+        pending.append(change)
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def __aiter__(self) -> 'ChangeStream':
+        return self
+
+    async def __anext__(self) -> StateChange:
+        while not self._pending:
+            if self._closed:
+                raise StopAsyncIteration
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._pending.popleft()
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._unsubscribe()
+            self._pending.clear()
+            if self._waiter is not None and not self._waiter.done():
+                self._waiter.set_result(None)
@@ -1,48 +1,97 @@
 from datetime import datetime
+from typing import Callable, Iterable
 from ..models.config import AppConfig, Source
-from ..models.state import DeviceState, ZoneState
+from ..models.state import DeviceState, Origin, StateChange, ZoneState
+from ..protocol.messages import REGISTERS_BY_NAME, Register, SerialBinaryJoin
+from .events import ChangeStream, EventBus, ZoneKey
 
 
 class StateManager:
-    """Manages device state and zone mappings"""
+    """Manages device state and zone mappings
+
+    Zone fields are only changed through this class: from device messages
+    (`update_from_device()`, `apply_batch()`) and, after a command was sent,
+    `set_optimistic()`. Every value that actually changes is published as a
+    `StateChange`; see `subscribe()` and `changes()`.
+
+    Target and source lookups go through dict indexes built from the
+    config; call `set_config()` to swap the config so they're rebuilt.
+    """
 
     def __init__(self, config: AppConfig):
-        self.config = config
         self.state = DeviceState()
+        self.events = EventBus()
+        self.set_config(config)
+
+    def set_config(self, config: AppConfig) -> None:
+        """Use a new config: create its zones, drop unconfigured ones and rebuild the indexes
+
+        Zones present in both configs keep their state.
+        """
+        self.config = config
         self._initialize_zones()
+        self._build_indexes()
+
+    def subscribe(self, callback: Callable[[StateChange], None],
+                  zones: Iterable[ZoneKey] | None = None) -> Callable[[], None]:
+        """Call `callback(change)` on zone changes (to `zones`, if given); returns an unsubscribe function"""
+        return self.events.subscribe(callback, zones)
+
+    def changes(self, zones: Iterable[ZoneKey] | None = None) -> ChangeStream:
+        """Async iterator over zone changes (to `zones`, if given), subscribed from this call"""
+        return self.events.changes(zones)
 
     def _initialize_zones(self) -> None:
         """Create ZoneState for all configured zones"""
+        configured = set()
         for target in self.config.targets:
             for sz in target.swamp_zones:
                 key = (sz.unit, sz.zone)
-                if key not in self.state.zones:
-                    self.state.zones[key] = ZoneState(unit=sz.unit, zone=sz.zone)
+                configured.add(key)
+                self.state.zones.add(sz.unit, sz.zone)
+        for key in self.state.zones.keys() - configured:
+            del self.state.zones[key]
+
+    def _build_indexes(self) -> None:
+        """Index the config by target id, source id and SWAMP source number"""
+        zones = self.state.zones
+        self._zones_by_target: dict[str, tuple[ZoneState, ...]] = {
+            target.id: tuple(zones[(sz.unit, sz.zone)] for sz in target.swamp_zones)
+            for target in self.config.targets
+        }
+        self._sources: dict[str, Source] = {source.id: source for source in self.config.sources}
+        self._sources_by_swamp_id: dict[int, Source] = {
+            source.swamp_source_id: source for source in self.config.sources
+        }
+
+    async def update_from_device(self, message) -> None:
+        """Update state from device message
 
-    async def update_from_device(self, message: dict) -> None:
-        """Update state from device message"""
+        Accepts a decoded message object, or the legacy dict form.
+        """
         self.state.last_update = datetime.now()
 
+        # Handle JOIN SERIAL_BINARY messages
+        if type(message) is SerialBinaryJoin:
+            self._apply_register(message.unit, message.zone, message.register, message.value)
+            return
+
+        if not isinstance(message, dict):
+            return
+
         msg_type = message.get('type')
 
-        # Handle JOIN SERIAL_BINARY messages
+        # Handle legacy dict JOIN SERIAL_BINARY messages
         if msg_type == 'join' and message.get('join_type') == 'serial_binary':
             unit = message.get('unit')
             zone = message.get('zone')
-            register = message.get('register')
+            register = REGISTERS_BY_NAME.get(message.get('register'))
             value = message.get('value')
 
             if unit is None or zone is None or register is None or value is None:
                 return
 
-            key = (unit, zone)
-            if key in self.state.zones:
-                zone_state = self.state.zones[key]
-                if register == 'source':
-                    zone_state.source_id = value
-                    zone_state.source_received = True  # Mark as having received data
-                elif register == 'volume':
-                    zone_state.volume = value
+            self._apply_register(unit, zone, register, value)
 
         # Handle legacy zone_update messages
         elif msg_type == 'zone_update':
@@ -52,36 +101,65 @@ class StateManager:
 
             if key in self.state.zones:
                 zone_state = self.state.zones[key]
-                if 'power' in message:
-                    zone_state.power = message['power']
-                if 'volume' in message:
-                    zone_state.volume = message['volume']
-                if 'source_id' in message:
-                    zone_state.source_id = message['source_id']
-                if 'muted' in message:
-                    zone_state.muted = message['muted']
-
-    def get_zones_for_target(self, target_id: str) -> list[ZoneState]:
-        """Map high-level target to SWAMP zones"""
-        target = self._find_target(target_id)
-        if not target:
-            raise ValueError(f"Unknown target: {target_id}")
+                for name in ('power', 'volume', 'source_id', 'muted'):
+                    if name in message:
+                        self._set(zone_state, name, message[name], Origin.DEVICE)
+
+    async def apply_batch(self, messages) -> None:
+        """Apply a batch of SERIAL_BINARY register messages in order
 
-        return [
-            self.state.zones[(sz.unit, sz.zone)]
-            for sz in target.swamp_zones
-        ]
+        Used for the coalesced bursts the device sends (e.g. the state dump
+        after JOIN UPDATE), so the batch costs one call instead of one per frame.
+        """
+        self.state.last_update = datetime.now()
+        apply_register = self._apply_register
+        for message in messages:
+            apply_register(message.unit, message.zone, message.register, message.value)
+
+    def _apply_register(self, unit: int, zone: int, register: int, value: int) -> None:
+        """Apply a SERIAL_BINARY register value to a zone"""
+        zone_state = self.state.zones.get((unit, zone))
+        if zone_state is None:
+            return
+        if register == Register.SOURCE:
+            if zone_state.source_id != value:
+                self._set(zone_state, 'source_id', value, Origin.DEVICE)
+            if not zone_state.source_received:
+                # Mark as having received data
+                self._set(zone_state, 'source_received', True, Origin.DEVICE)
+        elif register == Register.VOLUME:
+            if zone_state.volume != value:
+                self._set(zone_state, 'volume', value, Origin.DEVICE)
+
+    def set_optimistic(self, zones: Iterable[ZoneState], **fields) -> None:
+        """Assume new field values for zones after sending a command, ahead of the device echo"""
+        for zone_state in zones:
+            for name, value in fields.items():
+                self._set(zone_state, name, value, Origin.OPTIMISTIC)
+
+    def _set(self, zone_state: ZoneState, name: str, value, origin: Origin) -> None:
+        """Set one zone field, publishing the change if the value differs"""
+        old = getattr(zone_state, name)
+        if old == value:
+            return
+        setattr(zone_state, name, value)
+        if self.events:
+            self.events.publish(StateChange(zone_state.unit, zone_state.zone, name, old, value, origin))
+
+    def get_zones_for_target(self, target_id: str) -> tuple[ZoneState, ...]:
+        """Map high-level target to SWAMP zones"""
+        try:
+            return self._zones_by_target[target_id]
+        except KeyError:
+            raise ValueError(f"Unknown target: {target_id}") from None
 
     def get_source_by_id(self, source_id: str) -> Source:
         """Look up source by ID"""
-        for source in self.config.sources:
-            if source.id == source_id:
-                return source
-        raise ValueError(f"Unknown source: {source_id}")
+        try:
+            return self._sources[source_id]
+        except KeyError:
+            raise ValueError(f"Unknown source: {source_id}") from None
 
-    def _find_target(self, target_id: str):
-        """Find target by ID"""
-        for target in self.config.targets:
-            if target.id == target_id:
-                return target
-        return None
+    def get_source_by_swamp_id(self, swamp_source_id: int) -> Source | None:
+        """Look up the source with a SWAMP source number, or None if none is configured"""
+        return self._sources_by_swamp_id.get(swamp_source_id)
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+import signal
+
+
+logger = logging.getLogger(__name__)
+
+SHUTDOWN_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+
+async def wait_until_listening(listening: asyncio.Event, server_task: asyncio.Task) -> bool:
+    """Wait for the server to bind its port; False if the server task ended first"""
+    listening_task = asyncio.create_task(listening.wait())
+    try:
+        await asyncio.wait((server_task, listening_task), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        listening_task.cancel()
+    return listening.is_set()
+
+
+def server_failed(server_task: asyncio.Task) -> bool:
+    """True if the server task ended with an error"""
+    return server_task.done() and not server_task.cancelled() and server_task.exception() is not None
+
+
+async def wait_for_shutdown(server_task: asyncio.Task) -> None:
+    """Run headless until SIGTERM/SIGINT, or until the server task exits
+
+    Shutting down is left to the caller, which closes the device connections
+    and cancels the server task as on leaving the interactive shell, and
+    reports a failed server task (see `server_failed()`).
+    """
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+
+    def on_signal(sig: signal.Signals) -> None:
+        logger.info(f'Received {sig.name}, shutting down')
+        stop.set()
+
+    installed = []
+    for sig in SHUTDOWN_SIGNALS:
+        try:
+            loop.add_signal_handler(sig, on_signal, sig)
+            installed.append(sig)
+        except (NotImplementedError, RuntimeError):
+            # No loop signal handlers here (e.g. Windows); Ctrl+C still raises KeyboardInterrupt
+            pass
+
+    stop_task = asyncio.create_task(stop.wait())
+    try:
+        await asyncio.wait((server_task, stop_task), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        stop_task.cancel()
+        for sig in installed:
+            loop.remove_signal_handler(sig)
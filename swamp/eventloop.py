@@ -0,0 +1,34 @@
+import asyncio
+import logging
+from typing import Callable
+
+
+logger = logging.getLogger(__name__)
+
+# Event loop implementations selectable with --loop
+LOOPS = ('asyncio', 'uvloop')
+
+
+def loop_factory(name: str = 'asyncio') -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """Loop factory for `asyncio.run()`, or None for the default asyncio loop
+
+    uvloop is an optional dependency (`pip install crestron-swamp-controller[uvloop]`);
+    if it isn't installed, this logs a warning and falls back to asyncio.
+    """
+    if name not in LOOPS:
+        raise ValueError(f"Unknown event loop: {name}")
+    if name == 'asyncio':
+        return None
+
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning('uvloop is not installed, using the asyncio event loop')
+        return None
+    return uvloop.new_event_loop
+
+
+def run(main, loop: str = 'asyncio'):
+    """`asyncio.run(main)` on the chosen event loop implementation"""
+    with asyncio.Runner(loop_factory=loop_factory(loop)) as runner:
+        return runner.run(main)
@@ -24,8 +24,57 @@ class Target:
     swamp_zones: list[SwampZone]
 
 
+@dataclass
+class RateLimit:
+    """Command pacing towards the SWAMP processor
+
+    Rates are register writes per second; 0 disables that budget. Bursts are
+    how many writes may go out back to back before the rate applies.
+    """
+    commands_per_second: float = 0
+    burst: int = 1
+    unit_commands_per_second: float = 0
+    unit_burst: int = 1
+
+
+@dataclass
+class Keepalive:
+    """Keepalive policy for the device connection, in seconds"""
+    ping_interval: float = 10
+    timeout: float = 30
+
+
+@dataclass
+class SocketOptions:
+    """TCP options applied to each accepted device socket
+
+    Keepalive times are in seconds; a `keepalive_idle` of 0 leaves SO_KEEPALIVE
+    off. Write buffer limits are in bytes; None keeps the transport's defaults.
+    Limits the transport would refuse raise ValueError here, up front, rather
+    than on every accepted connection.
+    """
+    nodelay: bool = True
+    keepalive_idle: int = 30
+    keepalive_interval: int = 10
+    keepalive_count: int = 3
+    write_buffer_high: int | None = None
+    write_buffer_low: int | None = None
+
+    def __post_init__(self):
+        for name in ('write_buffer_high', 'write_buffer_low'):
+            value = getattr(self, name)
+            if value is not None and value < 0:
+                raise ValueError(f'{name} must not be negative, got {value}')
+        if (self.write_buffer_high is not None and self.write_buffer_low is not None
+                and self.write_buffer_low > self.write_buffer_high):
+            raise ValueError(f'write_buffer_low ({self.write_buffer_low}) must not exceed '
+                             f'write_buffer_high ({self.write_buffer_high})')
+
+
 @dataclass
 class AppConfig:
     """Application configuration"""
     sources: list[Source]
     targets: list[Target]
+    rate_limit: RateLimit | None = None
+    keepalive: Keepalive | None = None
@@ -1,41 +1,324 @@
+from array import array
+from collections.abc import Iterator, MutableMapping
 from dataclasses import dataclass, field
-from datetime import datetime
+from enum import Enum
+from typing import Any, NamedTuple
 
+ZoneKey = tuple[int, int]
 
-@dataclass
-class ZoneState:
-    """State of a single SWAMP zone"""
+# Column name -> array typecode. source_id stores None as -1.
+COLUMNS = {
+    'unit': 'B',
+    'zone': 'B',
+    'power': 'B',
+    'volume': 'H',
+    'source_id': 'i',
+    'muted': 'B',
+    'source_received': 'B',  # True once we've received source data from device
+}
+FIELDS = tuple(COLUMNS)
+NO_SOURCE = -1
+# Values each column type holds; sources are never negative, -1 is taken by None
+LIMITS = {'B': (0, 0xFF), 'H': (0, 0xFFFF), 'i': (0, 2**31 - 1)}
+
+
+def _fit(value, typecode: str) -> int:
+    """Round a value to a whole number and clamp it to what the column type holds"""
+    value = int(round(value))
+    low, high = LIMITS[typecode]
+    return low if value < low else high if value > high else value
+
+
+class ZoneRecord(NamedTuple):
+    """Plain copy of one zone's fields, as returned by bulk reads"""
     unit: int
     zone: int
-    power: bool = False
-    volume: int = 0
-    source_id: int | None = None
-    muted: bool = False
-    source_received: bool = False  # True once we've received source data from device
+    power: bool
+    volume: int
+    source_id: int | None
+    muted: bool
+    source_received: bool
+
+
+class _Column:
+    """ZoneState field stored in the ZoneTable column of the same name
+
+    Values are stored as whole numbers clamped to the column type's range, so
+    out-of-range or float input never raises.
+    """
+    __slots__ = ('name', 'typecode')
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.typecode = COLUMNS[name]
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        return getattr(view._table, self.name)[view._row]
+
+    def __set__(self, view, value):
+        getattr(view._table, self.name)[view._row] = _fit(value, self.typecode)
+
+
+class _FlagColumn(_Column):
+    __slots__ = ()
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        return getattr(view._table, self.name)[view._row] == 1
+
+    def __set__(self, view, value):
+        getattr(view._table, self.name)[view._row] = 1 if value else 0
+
+
+class _SourceColumn(_Column):
+    __slots__ = ()
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        value = view._table.source_id[view._row]
+        return None if value == NO_SOURCE else value
+
+    def __set__(self, view, value):
+        view._table.source_id[view._row] = NO_SOURCE if value is None else _fit(value, 'i')
+
+
+class ZoneState:
+    """State of a single SWAMP zone
+
+    A view of one row of a `ZoneTable`: fields read and write the table's
+    columns. Constructed on its own, a ZoneState gets a one-row table of its
+    own; adding it to another table copies its fields.
+    """
+    __slots__ = ('_table', '_row')
+
+    unit = _Column()
+    zone = _Column()
+    power = _FlagColumn()
+    volume = _Column()
+    source_id = _SourceColumn()
+    muted = _FlagColumn()
+    source_received = _FlagColumn()
+
+    def __init__(self, unit: int, zone: int, power: bool = False, volume: int = 0,
+                 source_id: int | None = None, muted: bool = False, source_received: bool = False):
+        table = ZoneTable()
+        table._append(unit, zone, power, volume, source_id, muted, source_received)
+        table._views[0] = self
+        self._table = table
+        self._row = 0
+
+    @classmethod
+    def _view(cls, table: 'ZoneTable', row: int) -> 'ZoneState':
+        view = cls.__new__(cls)
+        view._table = table
+        view._row = row
+        return view
+
+    def record(self) -> ZoneRecord:
+        """Copy of the zone's fields"""
+        return self._table._record(self._row)
+
+    def __eq__(self, other):
+        if not isinstance(other, ZoneState):
+            return NotImplemented
+        return self.record() == other.record()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={value!r}' for name, value in zip(FIELDS, self.record()))
+        return f'ZoneState({fields})'
+
+
+class ZoneTable(MutableMapping[ZoneKey, ZoneState]):
+    """All zones' state, as one array per field indexed by a dense row number
+
+    Maps (unit, zone) to a `ZoneState` view of its row; the view for a zone is
+    created on first access and then reused, so it can be held on to. Bulk
+    reads (`records()`, `snapshot()`, `diff()`) walk the columns directly.
+    Removing a zone moves the last row into its place; a removed zone's view
+    keeps its last values in a one-row table of its own.
+    """
+
+    def __init__(self):
+        for name, typecode in COLUMNS.items():
+            setattr(self, name, array(typecode))
+        self._index: dict[ZoneKey, int] = {}
+        self._views: list[ZoneState | None] = []
+
+    def add(self, unit: int, zone: int) -> int:
+        """Add a zone with default state if it isn't in the table; returns its row"""
+        row = self._index.get((unit, zone))
+        if row is None:
+            row = len(self._views)
+            self._append(unit, zone, False, 0, None, False, False)
+        return row
+
+    def _append(self, unit, zone, power, volume, source_id, muted, source_received) -> None:
+        self._index[(unit, zone)] = len(self._views)
+        self._views.append(None)
+        self.unit.append(unit)
+        self.zone.append(zone)
+        self.power.append(1 if power else 0)
+        self.volume.append(_fit(volume, 'H'))
+        self.source_id.append(NO_SOURCE if source_id is None else _fit(source_id, 'i'))
+        self.muted.append(1 if muted else 0)
+        self.source_received.append(1 if source_received else 0)
+
+    def _record(self, row: int) -> ZoneRecord:
+        source_id = self.source_id[row]
+        return ZoneRecord(self.unit[row], self.zone[row], self.power[row] == 1, self.volume[row],
+                          None if source_id == NO_SOURCE else source_id,
+                          self.muted[row] == 1, self.source_received[row] == 1)
+
+    def row(self, key: ZoneKey) -> int | None:
+        """Row number of a zone, or None if it isn't in the table"""
+        return self._index.get(key)
+
+    def __getitem__(self, key: ZoneKey) -> ZoneState:
+        row = self._index[key]
+        view = self._views[row]
+        if view is None:
+            view = self._views[row] = ZoneState._view(self, row)
+        return view
+
+    def get(self, key: ZoneKey, default=None):
+        row = self._index.get(key)
+        if row is None:
+            return default
+        view = self._views[row]
+        if view is None:
+            view = self._views[row] = ZoneState._view(self, row)
+        return view
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def __setitem__(self, key: ZoneKey, zone_state: ZoneState) -> None:
+        """Copy a ZoneState's fields into the zone's row, adding it if needed"""
+        values = zone_state.record()
+        row = self._index.get(key)
+        if row is None:
+            self._append(*key, *values[2:])
+            return
+        for name, value in zip(FIELDS[2:], values[2:]):
+            setattr(self[key], name, value)
+
+    def __delitem__(self, key: ZoneKey) -> None:
+        row = self._index.pop(key)
+        view = self._views[row]
+        if view is not None:
+            # Detach the view, keeping its values
+            detached = ZoneState(*self._record(row))
+            view._table, view._row = detached._table, 0
+            detached._table._views[0] = view
+        last = len(self._views) - 1
+        if row != last:
+            self._index[(self.unit[last], self.zone[last])] = row
+            self._views[row] = self._views[last]
+            if self._views[row] is not None:
+                self._views[row]._row = row
+            for name in FIELDS:
+                column = getattr(self, name)
+                column[row] = column[last]
+        self._views.pop()
+        for name in FIELDS:
+            getattr(self, name).pop()
+
+    def __iter__(self) -> Iterator[ZoneKey]:
+        return iter(list(zip(self.unit, self.zone)))
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def records(self) -> Iterator[ZoneRecord]:
+        """Copy of every zone's fields, in row order"""
+        for unit, zone, power, volume, source_id, muted, received in zip(
+                self.unit, self.zone, self.power, self.volume, self.source_id, self.muted,
+                self.source_received):
+            yield ZoneRecord(unit, zone, power == 1, volume,
+                             None if source_id == NO_SOURCE else source_id, muted == 1, received == 1)
+
+    def snapshot(self) -> 'ZoneTable':
+        """Detached copy of the table, for history or a later `diff()`"""
+        copy = ZoneTable()
+        for name in FIELDS:
+            setattr(copy, name, getattr(self, name)[:])
+        copy._index = self._index.copy()
+        copy._views = [None] * len(self._views)
+        return copy
+
+    def diff(self, older: 'ZoneTable') -> list[tuple[ZoneKey, str, Any, Any]]:
+        """(key, field, old, new) for every field that differs from `older`
+
+        Only zones present in both tables are compared.
+        """
+        changes = []
+        if self.unit == older.unit and self.zone == older.zone:
+            for name in FIELDS[2:]:
+                old_column = getattr(older, name)
+                new_column = getattr(self, name)
+                if old_column == new_column:
+                    continue
+                for row, (old, new) in enumerate(zip(old_column, new_column)):
+                    if old != new:
+                        changes.append(((self.unit[row], self.zone[row]), name, old, new))
+            changes.sort(key=lambda change: self._index[change[0]])
+        else:
+            for key, row in self._index.items():
+                old_row = older._index.get(key)
+                if old_row is None:
+                    continue
+                for name in FIELDS[2:]:
+                    old = getattr(older, name)[old_row]
+                    new = getattr(self, name)[row]
+                    if old != new:
+                        changes.append((key, name, old, new))
+        return [(key, name, *_decode(name, old, new)) for key, name, old, new in changes]
+
+
+def _decode(name: str, old: int, new: int) -> tuple[Any, Any]:
+    if name == 'source_id':
+        return (None if old == NO_SOURCE else old, None if new == NO_SOURCE else new)
+    if COLUMNS[name] == 'B':
+        return (old == 1, new == 1)
+    return (old, new)
 
 
 @dataclass
 class DeviceState:
     """Complete SWAMP device state"""
-    zones: dict[tuple[int, int], ZoneState] = field(default_factory=dict)
+    zones: ZoneTable = field(default_factory=ZoneTable)
     socket_connected: bool = False
     conn_accepted_sent: bool = False
-    last_message_received: datetime | None = None
+    last_message_at: float | None = None  # Event loop (monotonic) time of the last frame
     client_address: str | None = None
+    # Device is considered connected while the socket is open, CONN_ACCEPTED was
+    # sent and a message arrived within the keepalive timeout. Maintained by
+    # the server's LivenessTracker, so reading it is just an attribute access.
+    connected: bool = False
 
-    @property
-    def connected(self) -> bool:
-        """Device is considered connected if:
-        - Socket is connected
-        - CONN_ACCEPTED was sent
-        - Message received in last 30 seconds
-        """
-        if not self.socket_connected or not self.conn_accepted_sent:
-            return False
 
-        if self.last_message_received is None:
-            return False
+class Origin(str, Enum):
+    """Where a state change came from"""
+    DEVICE = 'device'          # Reported by the SWAMP
+    OPTIMISTIC = 'optimistic'  # Assumed after a command was sent, before the device confirms it
 
-        # Check if message received in last 30 seconds
-        time_since_last = (datetime.now() - self.last_message_received).total_seconds()
-        return time_since_last <= 30
+
+@dataclass(frozen=True, slots=True)
+class StateChange:
+    """One ZoneState field taking a new value"""
+    unit: int
+    zone: int
+    field: str
+    old: Any
+    new: Any
+    origin: Origin
+
+    @property
+    def key(self) -> tuple[int, int]:
+        return (self.unit, self.zone)
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from collections import deque
+
+from ..protocol.framer import FrameReassembler
+from ..protocol.messages import Message
+from .sockets import apply_socket_options
+
+
+logger = logging.getLogger(__name__)
+
+# Decoded batches queued for the handler task before reading from the socket
+# pauses, and the backlog at which it resumes
+QUEUE_HIGH_WATER = 64
+QUEUE_LOW_WATER = 16
+
+
+class SwampBufferedProtocol(asyncio.BufferedProtocol):
+    """Zero-copy receive path for one SWAMP device connection
+
+    The transport receives directly into the FrameReassembler's preallocated
+    buffer. Complete frames are batch decoded in place from memoryviews inside
+    `buffer_updated()`, and only the decoded messages are queued, one list per
+    receive, for the server's connection handler task, which runs the same
+    message handling as the StreamReader path.
+
+    The queue is bounded by flow control: once `queue_high` batches are
+    waiting, reading from the socket is paused (leaving the backlog in the
+    kernel and on the device) until the handler has worked it down to
+    `queue_low`.
+    """
+
+    def __init__(self, server, buffer_size: int = 2 * FrameReassembler.MAX_FRAME_SIZE,
+                 queue_high: int = QUEUE_HIGH_WATER, queue_low: int = QUEUE_LOW_WATER):
+        self._server = server
+        self._framer = FrameReassembler(buffer_size)
+        self._messages: asyncio.Queue = asyncio.Queue()
+        self._queue_high = queue_high
+        self._queue_low = queue_low
+        self._reading_paused = False
+        self._loop = asyncio.get_running_loop()
+        self._closed = self._loop.create_future()
+        self._paused = False
+        self._drain_waiters: deque[asyncio.Future] = deque()
+        self._exception: Exception | None = None
+        self.transport: asyncio.Transport | None = None
+        self.writer: BufferedTransportWriter | None = None
+        self.connection = None  # DeviceConnection, registered with the server on connect
+        self.handler_task: asyncio.Task | None = None
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.transport = transport
+        apply_socket_options(transport, self._server.socket_options)
+        self.writer = BufferedTransportWriter(transport, self)
+        self.connection = self._server._add_connection(self.writer)
+        self.handler_task = self._loop.create_task(self._server.handle_buffered_client(self))
+        self.connection.handler_task = self.handler_task
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._framer.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self._server._mark_received(self.connection, nbytes)
+        self._framer.commit(nbytes)
+        messages = self._framer.decode_batch(self._server.protocol.decode_batch)
+        if messages:
+            self._messages.put_nowait(messages)
+            if not self._reading_paused and self._messages.qsize() >= self._queue_high:
+                self._reading_paused = True
+                self.transport.pause_reading()
+
+    def eof_received(self) -> bool:
+        self._messages.put_nowait(None)
+        return False  # Let the transport close itself
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self._exception = exc
+        self._messages.put_nowait(None)
+        if not self._closed.done():
+            self._closed.set_result(None)
+        while self._drain_waiters:
+            waiter = self._drain_waiters.popleft()
+            if not waiter.done():
+                if exc is None:
+                    waiter.set_result(None)
+                else:
+                    waiter.set_exception(exc)
+
+    def pause_writing(self) -> None:
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        self._paused = False
+        while self._drain_waiters:
+            waiter = self._drain_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def receive(self) -> list[Message] | None:
+        """Next batch of decoded messages, or None once the connection closes"""
+        messages = await self._messages.get()
+        if self._reading_paused and self._messages.qsize() <= self._queue_low:
+            self._reading_paused = False
+            if not self.transport.is_closing():
+                self.transport.resume_reading()
+        return messages
+
+    async def _drain_helper(self) -> None:
+        if self._exception is not None:
+            raise self._exception
+        if not self._paused:
+            return
+        waiter = self._loop.create_future()
+        self._drain_waiters.append(waiter)
+        await waiter
+
+    async def _wait_closed(self) -> None:
+        await self._closed
+
+
+class BufferedTransportWriter:
+    """Minimal asyncio.StreamWriter stand-in for SwampBufferedProtocol
+
+    Provides the writer methods SwampTcpServer and its callers use
+    (write, drain, close, is_closing, wait_closed, get_extra_info).
+    """
+
+    def __init__(self, transport: asyncio.Transport, protocol: SwampBufferedProtocol):
+        self.transport = transport
+        self._protocol = protocol
+
+    def write(self, data: bytes) -> None:
+        self.transport.write(data)
+
+    def writelines(self, data) -> None:
+        self.transport.writelines(data)
+
+    async def drain(self) -> None:
+        if self.transport.is_closing():
+            # Match StreamWriter: give connection_lost a chance to run
+            await asyncio.sleep(0)
+        await self._protocol._drain_helper()
+
+    def close(self) -> None:
+        self.transport.close()
+
+    def is_closing(self) -> bool:
+        return self.transport.is_closing()
+
+    async def wait_closed(self) -> None:
+        await self._protocol._wait_closed()
+
+    def get_extra_info(self, name: str, default=None):
+        return self.transport.get_extra_info(name, default)
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+
+from ..models.config import Keepalive
+from .liveness import LivenessTracker
+from .outbound import LatencyStats, OutboundQueue, Priority
+from .pacer import CommandPacer
+
+
+logger = logging.getLogger(__name__)
+
+# Handshake timing: JOIN UPDATE follows CONN_ACCEPTED after this delay, and
+# SERIAL_BINARY commands must wait this long after the magic DIGITAL JOIN packets
+JOIN_UPDATE_DELAY = 0.1
+MAGIC_SETTLE_DELAY = 0.1
+
+
+def _is_serial_binary(data: bytes) -> bool:
+    """Check if this is a SERIAL_BINARY message (JOIN type 0x05, join type 0x20)"""
+    return len(data) >= 7 and data[0] == 0x05 and data[6] == 0x20
+
+
+def _magic_end(frames: list[bytes], magic: tuple[bytes, ...]) -> int:
+    """Index just past the magic packet pair in a batch, or 0 if it isn't there"""
+    for i in range(len(frames) - len(magic) + 1):
+        if tuple(frames[i:i + len(magic)]) == magic:
+            return i + len(magic)
+    return 0
+
+
+class DeviceConnection:
+    """One SWAMP processor or expander dialled in to the server
+
+    Owns everything that is per link: the writer and its outbound queue,
+    handshake progress (CONN_ACCEPTED, magic packets, JOIN UPDATE), the
+    keepalive and liveness state, the unit numbers seen on it and traffic
+    counters. Everything written to the device goes through `outbound`, so
+    replies keep its ordering, priorities and pacing and never interleave
+    with a batch being written.
+
+    `generation` numbers connections in the order they were accepted, so a
+    device that dials in again can be told apart from its stale session.
+    `pacer` is the server's CommandPacer, shared by every connection.
+    """
+
+    def __init__(self, writer, protocol, address=None, generation: int = 0,
+                 keepalive: Keepalive | None = None, pacer: CommandPacer | None = None):
+        self.writer = writer
+        self.protocol = protocol
+        self.address = address if address is not None else writer.get_extra_info('peername')
+        self.host = self.address[0] if isinstance(self.address, tuple) else self.address
+        self.generation = generation
+        self.signon: bytes | None = None  # CLIENT_SIGNON payload, identifies the device
+        self.superseded = False
+        self.handler_task: asyncio.Task | None = None
+        self.units: set[int] = set()  # Units whose register echoes arrived here
+        self.conn_accepted_sent = False
+        self.connected = False
+        self.last_message_at: float | None = None
+        self.magic_packets_sent = False  # On the wire; the settle time runs from then
+        self._magic_pending = False  # Queued or being written, so nobody sends another pair
+        self.frames_received = 0
+        self.bytes_received = 0
+        self._magic_ready_at = 0.0  # Loop time after which SERIAL_BINARY may follow the magic packets
+        self._join_update_timer: asyncio.TimerHandle | None = None
+        self.opened_at = asyncio.get_running_loop().time()
+        self.time_to_operational: float | None = None  # Accept to ready for SERIAL_BINARY, seconds
+        self.outbound = OutboundQueue(writer, self.before_write, protocol.coalesce_key, pacer=pacer)
+        self.liveness = LivenessTracker(self, keepalive)
+
+    def __repr__(self) -> str:
+        return f'<DeviceConnection #{self.generation} {self.address} units={sorted(self.units)}>'
+
+    def start(self) -> None:
+        """Start the writer task and the keepalive"""
+        self.outbound.start()
+        self.liveness.start(self.send_ping)
+
+    def abort(self) -> None:
+        """Drop the socket at once, without flushing what is still buffered for it"""
+        self.writer.transport.abort()
+
+    async def close(self) -> None:
+        """Stop timers and the writer task; anything still queued fails"""
+        self._cancel_join_update()
+        self.liveness.stop()
+        await self.outbound.close()
+
+    def send_ping(self) -> None:
+        """Queue a keepalive PING (LivenessTracker timer callback)"""
+        self.outbound.submit((self.protocol.encode_ping_sync(),), wait=False, priority=Priority.CONTROL)
+
+    def accept(self, signon: bytes = b'') -> None:
+        """Answer CLIENT_SIGNON without waiting
+
+        CONN_ACCEPTED is followed at once by the magic DIGITAL JOIN packets,
+        whose settle time then overlaps the timer that sends JOIN UPDATE, so
+        the first user command isn't held up and the read loop carries on.
+        """
+        self.signon = bytes(signon)
+        outbound = self.outbound
+        outbound.submit((self.protocol.encode_conn_accepted_sync(),), wait=False, priority=Priority.CONTROL)
+        self.conn_accepted_sent = True
+        self.liveness.handshake_complete()
+        logger.info(f'Sent CONN_ACCEPTED to {self.address} - connection established')
+
+        if not self._magic_pending:
+            self._magic_pending = True
+            logger.info('Sending magic DIGITAL JOIN packets')
+            written = outbound.submit(self.protocol.encode_join_digital_magic(), priority=Priority.CONTROL)
+            written.add_done_callback(self._on_magic_written)
+
+        # Send JOIN UPDATE 100ms later
+        self._cancel_join_update()
+        self._join_update_timer = asyncio.get_running_loop().call_later(
+            JOIN_UPDATE_DELAY, self._send_join_update
+        )
+
+    def _on_magic_written(self, written: asyncio.Future) -> None:
+        """Start the magic packets' settle time once they are on the wire"""
+        if written.cancelled() or written.exception() is not None:
+            self._magic_pending = False
+            return
+        if not self.magic_packets_sent:
+            self._magic_sent()
+
+    def _magic_sent(self) -> None:
+        self.magic_packets_sent = True
+        self._magic_ready_at = asyncio.get_running_loop().time() + MAGIC_SETTLE_DELAY
+        self._set_operational(self._magic_ready_at)
+        logger.debug('Magic packets sent')
+
+    def _set_operational(self, ready_at: float) -> None:
+        if self.time_to_operational is None:
+            self.time_to_operational = ready_at - self.opened_at
+            logger.info(f'{self.address} ready for commands {self.time_to_operational * 1000:.0f}ms after connecting')
+
+    def _send_join_update(self) -> None:
+        """JOIN UPDATE timer callback"""
+        self._join_update_timer = None
+        join_update_bytes = self.protocol.encode_join_update_sync()
+        self.outbound.submit((join_update_bytes,), wait=False, priority=Priority.CONTROL)
+        logger.info(f'Sent JOIN UPDATE to {self.address}')
+
+    def _cancel_join_update(self) -> None:
+        """Cancel a pending JOIN UPDATE timer"""
+        if self._join_update_timer is not None:
+            self._join_update_timer.cancel()
+            self._join_update_timer = None
+
+    async def before_write(self, writer, frames: list[bytes]) -> None:
+        """Make sure the magic DIGITAL JOIN packets precede SERIAL_BINARY messages
+
+        Runs in the outbound writer task ahead of each batch, so it cannot race
+        with other senders, and any wait here holds up only the writer, never
+        the read loop. The packets normally go out right after CONN_ACCEPTED;
+        a batch that arrives within their settle time waits out the rest of it.
+        When the queued pair shares this batch with SERIAL_BINARY frames, the
+        frames up to the pair are written first and removed from `frames`.
+        If a command is sent before the device signed on, the pair is sent here.
+        """
+        if not any(_is_serial_binary(data) for data in frames):
+            return
+
+        if not self.magic_packets_sent:
+            magic = self.protocol.encode_join_digital_magic()
+            end = _magic_end(frames, magic)
+            if end:
+                writer.writelines(frames[:end])
+                del frames[:end]
+                await writer.drain()
+            elif not self._magic_pending:
+                self._magic_pending = True
+                logger.info('Sending magic DIGITAL JOIN packets')
+                msg1, msg2 = magic
+
+                writer.write(msg1)
+                await writer.drain()
+                logger.debug('Sent magic packet 1')
+
+                writer.write(msg2)
+                await writer.drain()
+                logger.debug('Sent magic packet 2')
+            # Otherwise an earlier batch carried the pair and has been drained
+            self._magic_sent()
+            logger.info('Magic packets sent, ready for SERIAL_BINARY commands')
+
+        delay = self._magic_ready_at - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        """Traffic and queue counters for this connection"""
+        outbound = self.outbound
+        return {
+            'address': str(self.address),
+            'generation': self.generation,
+            'units': sorted(self.units),
+            'connected': self.connected,
+            'time_to_operational': self.time_to_operational,
+            'frames_received': self.frames_received,
+            'bytes_received': self.bytes_received,
+            'frames_sent': outbound.frames_sent,
+            'batches_sent': outbound.batches_sent,
+            'frames_elided': outbound.frames_elided,
+            'outbound_depth': outbound.depth,
+            'latency': {priority.name.lower(): stats for priority, stats in outbound.latency.items()},
+        }
+
+
+def merge_latency(connections) -> dict[Priority, LatencyStats]:
+    """Per-class latency across several connections"""
+    merged = {priority: LatencyStats() for priority in Priority}
+    for connection in connections:
+        for priority, stats in connection.outbound.latency.items():
+            total = merged[priority]
+            total.count += stats.count
+            total.total += stats.total
+            total.max = max(total.max, stats.max)
+    return merged
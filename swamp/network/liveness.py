@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from typing import Callable
+
+from ..models.config import Keepalive
+
+
+logger = logging.getLogger(__name__)
+
+
+class LivenessTracker:
+    """Keepalive and liveness state machine for one device connection
+
+    `state` is the `DeviceConnection` being tracked. Its `connected` flag is
+    kept up to date from loop timers rather than clock reads on access: the
+    flag turns on when the handshake is complete
+    and a frame has been received, and off when no frame arrives for
+    `keepalive.timeout` seconds or the socket closes. Receiving a frame only
+    records the loop time; the single deadline timer re-arms itself for the
+    remaining time when it fires early.
+
+    While a socket is open a PING is sent every `keepalive.ping_interval`
+    seconds. Subscribers are called with the new value on every transition.
+    """
+
+    def __init__(self, state, keepalive: Keepalive | None = None):
+        self.state = state
+        self.keepalive = keepalive or Keepalive()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._send_ping: Callable[[], None] | None = None
+        self._ping_timer: asyncio.TimerHandle | None = None
+        self._deadline_timer: asyncio.TimerHandle | None = None
+        self._subscribers: list[Callable[[bool], None]] = []
+
+    def subscribe(self, callback: Callable[[bool], None]) -> Callable[[], None]:
+        """Call `callback(connected)` on every transition; returns an unsubscribe function"""
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
+
+    def start(self, send_ping: Callable[[], None]) -> None:
+        """Socket opened: start sending PINGs"""
+        self._loop = asyncio.get_running_loop()
+        self._send_ping = send_ping
+        self._ping_timer = self._loop.call_later(self.keepalive.ping_interval, self._on_ping_timer)
+
+    def stop(self) -> None:
+        """Socket closed: stop the timers and mark the device disconnected"""
+        for timer in (self._ping_timer, self._deadline_timer):
+            if timer is not None:
+                timer.cancel()
+        self._ping_timer = None
+        self._deadline_timer = None
+        self._send_ping = None
+        self._set_connected(False)
+
+    def mark_received(self) -> None:
+        """A frame arrived from the device"""
+        state = self.state
+        state.last_message_at = self._loop.time()
+        if not state.connected and state.conn_accepted_sent:
+            self._set_connected(True)
+
+    def handshake_complete(self) -> None:
+        """CONN_ACCEPTED has been sent"""
+        if not self.state.connected and self.state.last_message_at is not None:
+            self._set_connected(True)
+
+    def seconds_since_last_message(self) -> float | None:
+        """Seconds since the last frame from the device, or None if there was none"""
+        last = self.state.last_message_at
+        if last is None or self._loop is None:
+            return None
+        return self._loop.time() - last
+
+    def _set_connected(self, connected: bool) -> None:
+        if self.state.connected == connected:
+            return
+        self.state.connected = connected
+        if connected:
+            self._arm_deadline(self.keepalive.timeout)
+        elif self._deadline_timer is not None:
+            self._deadline_timer.cancel()
+            self._deadline_timer = None
+        for callback in list(self._subscribers):
+            try:
+                callback(connected)
+            except Exception as e:
+                logger.error(f'Error in liveness subscriber: {e}')
+
+    def _arm_deadline(self, delay: float) -> None:
+        self._deadline_timer = self._loop.call_later(delay, self._on_deadline)
+
+    def _on_deadline(self) -> None:
+        self._deadline_timer = None
+        remaining = self.state.last_message_at + self.keepalive.timeout - self._loop.time()
+        if remaining > 0:
+            self._arm_deadline(remaining)
+            return
+        logger.warning(f'No message from SWAMP for {self.keepalive.timeout:.0f}s, marking disconnected')
+        self._set_connected(False)
+
+    def _on_ping_timer(self) -> None:
+        self._ping_timer = self._loop.call_later(self.keepalive.ping_interval, self._on_ping_timer)
+        try:
+            self._send_ping()
+            logger.debug('Sent periodic PING')
+        except Exception as e:
+            logger.error(f'Error sending periodic PING: {e}')
@@ -0,0 +1,305 @@
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Awaitable, Callable, Hashable, Sequence
+
+from .pacer import CommandPacer
+
+
+logger = logging.getLogger(__name__)
+
+# Background frames written per batch, so a long ramp or scene fan-out can only
+# hold up a newly queued control or interactive frame for one bounded write
+BACKGROUND_BATCH_SIZE = 16
+
+
+class Priority(IntEnum):
+    """Outbound traffic classes, most urgent first"""
+    CONTROL = 0      # Keepalive and session handshake (PING, PONG, WHOIS, CONN_ACCEPTED)
+    INTERACTIVE = 1  # User commands (route, power, volume set)
+    BACKGROUND = 2   # Bulk traffic (volume ramp steps)
+
+
+@dataclass(slots=True)
+class _Outbound:
+    """One queued frame; `waiters` are resolved once it has been written and drained"""
+    frame: bytes
+    priority: Priority
+    queued_at: float
+    key: Hashable | None = None
+    waiters: list['asyncio.Future | _Countdown'] | None = None
+    superseded: bool = False
+
+
+class _Countdown:
+    """Waiter shared by the frames of one multi-frame submit
+
+    Resolves `future` once each of `remaining` frames (or the frames that
+    superseded them) has been written, or fails it on the first write error.
+    """
+    __slots__ = ('future', 'remaining')
+
+    def __init__(self, future: asyncio.Future, remaining: int):
+        self.future = future
+        self.remaining = remaining
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def set_result(self, result) -> None:
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.future.set_result(result)
+
+    def set_exception(self, error: BaseException) -> None:
+        self.future.set_exception(error)
+
+
+@dataclass(slots=True)
+class LatencyStats:
+    """Queue-to-drained latency of the frames sent in one traffic class, in seconds"""
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, latency: float) -> None:
+        self.count += 1
+        self.total += latency
+        if latency > self.max:
+            self.max = latency
+
+
+class OutboundQueue:
+    """Outbound frame queue for one device connection
+
+    Every write to the device goes through `submit()`. A single writer task
+    takes whatever is pending, writes it with one `writelines()` and drains
+    once, so concurrent callers (shell, HA entities, volume ramps) never
+    interleave writes or race on drain.
+
+    Frames are queued per `Priority` class. Each batch carries every pending
+    CONTROL frame, then every INTERACTIVE frame, then at most
+    `background_batch_size` BACKGROUND frames, so a PING or a power off never
+    waits behind more than one bounded slice of ramp traffic. Within a class
+    frames leave in submission order. `latency` records, per class, how long
+    frames spent between `submit()` and the end of their drain.
+
+    `before_write(writer, frames)` is awaited by the writer task ahead of each
+    batch; the server uses it to send the magic DIGITAL JOIN packets exactly once.
+    It may write a leading part of the batch itself and remove it from `frames`.
+
+    Writes are coalesced latest-value-wins: `coalesce_key(frame)` names the
+    register a frame sets (or None), and a queued frame is dropped when a newer
+    one for the same register is submitted before it was sent. The newer frame
+    takes the queue position of the latest submission and inherits the older
+    frame's waiters, ahead of its own, so everybody is told once the final
+    value is on the wire and callers resume in the order they submitted.
+
+    With a `pacer`, frames that have a coalesce key (register writes; the key's
+    first item is the unit) only leave when the pacer grants a token. The
+    writer stops the batch when the global bucket runs dry; a unit that is
+    out of its own tokens only has its frames held back (in order), so other
+    units aren't delayed by it. With nothing left to send the writer sleeps
+    until a token is due, or until a new frame is submitted, so unpaced
+    CONTROL frames still go out immediately. Nothing is dropped by pacing.
+    """
+
+    def __init__(self, writer, before_write: Callable[..., Awaitable] | None = None,
+                 coalesce_key: Callable[[bytes], Hashable | None] | None = None,
+                 background_batch_size: int = BACKGROUND_BATCH_SIZE,
+                 pacer: CommandPacer | None = None):
+        self._writer = writer
+        self._before_write = before_write
+        self._coalesce_key = coalesce_key
+        self._background_batch_size = background_batch_size
+        self.pacer = pacer
+        self._pace_delay: float | None = None  # Set when the last batch stopped for a token
+        self._pending: tuple[deque[_Outbound], ...] = tuple(deque() for _ in Priority)
+        self._latest: dict[Hashable, _Outbound] = {}  # Queued frame per register
+        self._superseded = 0  # Superseded entries still sitting in _pending
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        self.frames_sent = 0
+        self.batches_sent = 0
+        self.frames_elided = 0
+        self.latency: dict[Priority, LatencyStats] = {priority: LatencyStats() for priority in Priority}
+
+    @property
+    def depth(self) -> int:
+        """Number of frames waiting for the writer task"""
+        return sum(len(pending) for pending in self._pending) - self._superseded
+
+    def start(self) -> None:
+        """Start the writer task"""
+        self._task = asyncio.create_task(self._run())
+
+    def submit(self, frames: Sequence[bytes], wait: bool = True,
+               priority: Priority = Priority.INTERACTIVE) -> asyncio.Future | None:
+        """Queue frames for sending, in order, in the given traffic class
+
+        With `wait`, returns a future resolved once every frame has been written
+        and drained (or failed with the write error); otherwise returns None
+        and the frames are sent fire-and-forget.
+        """
+        if self._closed:
+            raise ConnectionError("No SWAMP device connected")
+        if not frames:
+            return None
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future() if wait else None
+        queued_at = loop.time()
+        # Every frame carries the waiter, so it follows any frame that is
+        # superseded; with several frames it only resolves after the last one
+        shared = None
+        if waiter is not None:
+            shared = waiter if len(frames) == 1 else _Countdown(waiter, len(frames))
+        for frame in frames:
+            self._enqueue(frame, priority, queued_at, [shared] if shared is not None else None)
+        self._wakeup.set()
+        return waiter
+
+    def _enqueue(self, frame: bytes, priority: Priority, queued_at: float,
+                 waiters: list['asyncio.Future | _Countdown'] | None) -> None:
+        key = self._coalesce_key(frame) if self._coalesce_key is not None else None
+        entry = _Outbound(frame, priority, queued_at, key, waiters)
+        if key is not None:
+            previous = self._latest.get(key)
+            if previous is not None:
+                # Superseded before it was sent: skip it, hand its waiters on
+                previous.superseded = True
+                self._superseded += 1
+                self.frames_elided += 1
+                if previous.waiters:
+                    # Older waiters first, so callers resume in submission order.
+                    # A countdown may appear twice (a submit setting one register
+                    # twice); it then counts both frames down when this one is sent.
+                    entry.waiters = previous.waiters + (entry.waiters or [])
+                    previous.waiters = None
+            self._latest[key] = entry
+        self._pending[priority].append(entry)
+
+    def _take_batch(self) -> list[_Outbound]:
+        """Pop the next batch: all CONTROL and INTERACTIVE frames, then a slice of BACKGROUND
+
+        With a pacer, an empty global bucket ends the batch. A unit whose own
+        bucket is empty only has its frames set aside, in order, so writes to
+        other units still go out.
+        """
+        batch = []
+        latest = self._latest
+        pacer = self.pacer
+        self._pace_delay = None
+        throttled: set[Hashable] = set()  # Units out of tokens for this batch
+        for priority, pending in enumerate(self._pending):
+            limit = self._background_batch_size if priority == Priority.BACKGROUND else None
+            taken = 0
+            held: list[_Outbound] = []  # Frames of throttled units, put back in order
+            while pending and (limit is None or taken < limit):
+                entry = pending.popleft()
+                if entry.superseded:
+                    self._superseded -= 1
+                    continue
+                if entry.key is not None:
+                    if pacer is not None:
+                        unit = entry.key[0]
+                        if unit in throttled:
+                            held.append(entry)
+                            continue
+                        delay = pacer.acquire(unit)
+                        if delay > 0:
+                            self._pace(delay)
+                            if pacer.global_delay() > 0:
+                                pending.appendleft(entry)
+                                pending.extendleft(reversed(held))
+                                return batch
+                            throttled.add(unit)
+                            held.append(entry)
+                            continue
+                    if latest.get(entry.key) is entry:
+                        del latest[entry.key]
+                batch.append(entry)
+                taken += 1
+            pending.extendleft(reversed(held))
+        return batch
+
+    def _pace(self, delay: float) -> None:
+        """Note that a frame waits `delay` seconds for a token; the writer sleeps the shortest wait"""
+        if self._pace_delay is None or delay < self._pace_delay:
+            self._pace_delay = delay
+
+    async def close(self) -> None:
+        """Stop the writer task and fail anything still queued"""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        error = ConnectionError("SWAMP device disconnected")
+        for pending in self._pending:
+            self._fail(list(pending), error)
+            pending.clear()
+        self._latest.clear()
+        self._superseded = 0
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    if self._pace_delay is None:
+                        break
+                    await self._wait_for_token(self._pace_delay)
+                    continue
+                frames = [entry.frame for entry in batch]
+                try:
+                    if self._before_write is not None:
+                        await self._before_write(self._writer, frames)
+                    self._writer.writelines(frames)
+                    await self._writer.drain()
+                except asyncio.CancelledError:
+                    self._fail(batch, ConnectionError("SWAMP device disconnected"))
+                    raise
+                except Exception as e:
+                    logger.error(f'Error sending command: {e}')
+                    self._fail(batch, e)
+                    continue
+                self.frames_sent += len(batch)
+                self.batches_sent += 1
+                logger.debug(f'Sent {len(frames)} frames ({sum(len(frame) for frame in frames)} bytes) to SWAMP')
+                now = loop.time()
+                latency = self.latency
+                for entry in batch:
+                    latency[entry.priority].add(now - entry.queued_at)
+                    if entry.waiters:
+                        for waiter in entry.waiters:
+                            if not waiter.done():
+                                waiter.set_result(None)
+
+    async def _wait_for_token(self, delay: float) -> None:
+        """Sleep until the pacer has a token, waking early for newly submitted frames"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    @staticmethod
+    def _fail(batch: list[_Outbound], error: Exception) -> None:
+        for entry in batch:
+            if entry.waiters:
+                for waiter in entry.waiters:
+                    if not waiter.done():
+                        waiter.set_exception(error)
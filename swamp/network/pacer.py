@@ -0,0 +1,90 @@
+import time
+from typing import Callable, Hashable
+
+from ..models.config import RateLimit
+
+
+class TokenBucket:
+    """Token bucket: `rate` tokens per second, holding at most `burst`"""
+
+    __slots__ = ('rate', 'burst', '_tokens', '_updated')
+
+    def __init__(self, rate: float, burst: float, now: float):
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        if burst < 1:
+            raise ValueError(f"Burst must be at least 1, got {burst}")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = now
+
+    def _refill(self, now: float) -> float:
+        tokens = self._tokens + (now - self._updated) * self.rate
+        if tokens > self.burst:
+            tokens = self.burst
+        self._tokens = tokens
+        self._updated = now
+        return tokens
+
+    def delay(self, now: float) -> float:
+        """Seconds until one token is available (0 if one is available now)"""
+        tokens = self._refill(now)
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def take(self) -> None:
+        """Consume one token; call `delay()` first to check one is available"""
+        self._tokens -= 1
+
+
+class CommandPacer:
+    """Paces register writes with a global and a per-unit token bucket
+
+    A frame may go out only when both the global bucket and the bucket of the
+    unit it addresses hold a token. Frames that address no unit (keepalive,
+    handshake) are never paced.
+    """
+
+    def __init__(self, rate_limit: RateLimit, clock: Callable[[], float] = time.monotonic):
+        self.rate_limit = rate_limit
+        self._clock = clock
+        now = clock()
+        self._global = TokenBucket(rate_limit.commands_per_second, rate_limit.burst, now) \
+            if rate_limit.commands_per_second else None
+        self._units: dict[Hashable, TokenBucket] = {}
+        self.times_throttled = 0  # Acquires that had to wait for a token
+
+    def _unit_bucket(self, unit: Hashable, now: float) -> TokenBucket | None:
+        rate_limit = self.rate_limit
+        if not rate_limit.unit_commands_per_second:
+            return None
+        bucket = self._units.get(unit)
+        if bucket is None:
+            bucket = self._units[unit] = TokenBucket(
+                rate_limit.unit_commands_per_second, rate_limit.unit_burst, now
+            )
+        return bucket
+
+    def global_delay(self) -> float:
+        """Seconds until the global bucket holds a token (0 if it does, or there is none)"""
+        return self._global.delay(self._clock()) if self._global is not None else 0.0
+
+    def acquire(self, unit: Hashable) -> float:
+        """Take a token for a frame to `unit`
+
+        Returns 0 when the frame may be sent now (tokens consumed), otherwise
+        the seconds to wait before trying again (nothing consumed).
+        """
+        now = self._clock()
+        unit_bucket = self._unit_bucket(unit, now)
+        wait = self._global.delay(now) if self._global is not None else 0.0
+        if unit_bucket is not None:
+            wait = max(wait, unit_bucket.delay(now))
+        if wait > 0:
+            self.times_throttled += 1
+            return wait
+        if self._global is not None:
+            self._global.take()
+        if unit_bucket is not None:
+            unit_bucket.take()
+        return 0.0
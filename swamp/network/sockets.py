@@ -0,0 +1,38 @@
+import logging
+import socket
+
+from ..models.config import SocketOptions
+
+
+logger = logging.getLogger(__name__)
+
+
+def apply_socket_options(transport, options: SocketOptions) -> None:
+    """Apply `options` to an accepted connection's transport and socket
+
+    Options the platform doesn't support (e.g. TCP_KEEPIDLE on macOS) are
+    skipped; a failing setsockopt is logged and doesn't drop the connection.
+    """
+    if options.write_buffer_high is not None or options.write_buffer_low is not None:
+        transport.set_write_buffer_limits(options.write_buffer_high, options.write_buffer_low)
+
+    sock = transport.get_extra_info('socket')
+    if sock is None or sock.family not in (socket.AF_INET, socket.AF_INET6):
+        return
+
+    settings = [(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(options.nodelay))]
+    if options.keepalive_idle > 0:
+        settings.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        for name, value in (('TCP_KEEPIDLE', options.keepalive_idle),
+                            ('TCP_KEEPINTVL', options.keepalive_interval),
+                            ('TCP_KEEPCNT', options.keepalive_count)):
+            if hasattr(socket, name):
+                settings.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    else:
+        settings.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 0))
+
+    for level, option, value in settings:
+        try:
+            sock.setsockopt(level, option, value)
+        except OSError as e:
+            logger.warning(f'Could not set socket option {option}={value}: {e}')
@@ -1,32 +1,89 @@
 import asyncio
 import logging
-from datetime import datetime
+from typing import Awaitable, Callable, Sequence
+
+from ..models.config import Keepalive, RateLimit, SocketOptions
+from ..protocol.framer import FrameReassembler
+from ..protocol.messages import ClientSignon, Message, Ping, Pong, SerialBinaryJoin, UnknownFrame
+from .buffered import SwampBufferedProtocol
+from .connection import DeviceConnection, merge_latency
+from .outbound import LatencyStats, OutboundQueue, Priority
+from .pacer import CommandPacer
+from .sockets import apply_socket_options
 
 
 logger = logging.getLogger(__name__)
 
+# Receive paths selectable at construction time:
+# - 'stream': asyncio.start_server with StreamReader reads
+# - 'buffered': asyncio.BufferedProtocol receiving into a preallocated buffer
+RECEIVE_MODES = ('stream', 'buffered')
 
-class SwampTcpServer:
-    """Manages TCP server accepting connections from SWAMP device"""
 
-    def __init__(self, port: int, protocol_handler, state_manager):
+class SwampTcpServer:
+    """Manages TCP server accepting connections from SWAMP devices
+
+    Several processors and expanders may be connected at once. Each link is a
+    `DeviceConnection` in `connections`, keyed by peer address; unit numbers
+    are learned from the register echoes each link sends, and outbound
+    register writes are routed to the connection that owns their unit.
+    `client_writer`, `client_address`, `outbound` and `magic_packets_sent`
+    refer to the most recently connected device.
+
+    A device that reboots dials in again while its old socket may still be
+    half-open. The new connection takes over as soon as it is recognised (same
+    host and CLIENT_SIGNON payload, or the same host reporting a unit the old
+    session owned): it inherits the old session's units and the stale one is
+    aborted and its handler cancelled, without touching the new session.
+    """
+
+    def __init__(self, port: int, protocol_handler, state_manager, receive_mode: str = 'stream',
+                 rate_limit: RateLimit | None = None, keepalive: Keepalive | None = None,
+                 socket_options: SocketOptions | None = None):
+        if receive_mode not in RECEIVE_MODES:
+            raise ValueError(f"Unknown receive mode: {receive_mode}")
         self.port = port
         self.protocol = protocol_handler
         self.state_manager = state_manager
+        self.receive_mode = receive_mode
+        self.rate_limit = rate_limit
+        # One pacer for every connection: the global budget covers all units,
+        # and a reconnect doesn't start with a fresh burst
+        self.pacer = CommandPacer(rate_limit) if rate_limit is not None else None
+        self.keepalive = keepalive
+        self.socket_options = socket_options or SocketOptions()
         self.server = None
-        self.client_writer = None
-        self.client_address = None
-        self.client_handler_task = None
-        self.magic_packets_sent = False
+        self.listening = asyncio.Event()  # Set once the listening socket is bound
+        self.connections: dict[object, DeviceConnection] = {}  # By peer address
+        self._units: dict[int, DeviceConnection] = {}  # By unit number
+        self._generation = 0
+        self.takeovers = 0
+        self._connected_subscribers: list[Callable[[bool], None]] = []
+
+        # Message handlers keyed by decoded message class: (message, connection) -> awaitable
+        self._handlers: dict[type, Callable[..., Awaitable]] = {
+            SerialBinaryJoin: self._handle_serial_binary,
+            Ping: self._handle_ping,
+            Pong: self._handle_pong,
+            ClientSignon: self._handle_client_signon,
+            UnknownFrame: self._handle_unknown_frame,
+        }
 
     async def start(self):
         """Start TCP server listening on port"""
-        self.server = await asyncio.start_server(
-            self.handle_client, '0.0.0.0', self.port
-        )
+        if self.receive_mode == 'buffered':
+            loop = asyncio.get_running_loop()
+            self.server = await loop.create_server(
+                lambda: SwampBufferedProtocol(self), '0.0.0.0', self.port
+            )
+        else:
+            self.server = await asyncio.start_server(
+                self.handle_client, '0.0.0.0', self.port
+            )
 
         addrs = ', '.join(str(sock.getsockname()) for sock in self.server.sockets)
         logger.info(f'TCP server listening on {addrs}')
+        self.listening.set()
 
         try:
             async with self.server:
@@ -35,200 +92,400 @@ class SwampTcpServer:
             logger.info('Server task cancelled, shutting down')
             raise
 
-    async def _periodic_ping(self, writer: asyncio.StreamWriter):
-        """Send PING every 10 seconds"""
-        try:
-            while True:
-                await asyncio.sleep(10)
-                if self.state_manager.state.socket_connected:
-                    try:
-                        ping_bytes = await self.protocol.encode_pong()  # PONG structure is same as PING
-                        # Actually encode PING (0x0d)
-                        ping_bytes = bytes([0x0d, 0x00, 0x02, 0x00, 0x00])
-                        writer.write(ping_bytes)
-                        await writer.drain()
-                        logger.debug('Sent periodic PING')
-                    except Exception as e:
-                        logger.error(f'Error sending periodic PING: {e}')
-                        break
-        except asyncio.CancelledError:
-            logger.debug('Periodic PING task cancelled')
+    @property
+    def connection(self) -> DeviceConnection | None:
+        """The most recently connected device, if any"""
+        return next(reversed(self.connections.values()), None)
+
+    @property
+    def client_writer(self):
+        connection = self.connection
+        return connection.writer if connection is not None else None
+
+    @property
+    def client_address(self):
+        connection = self.connection
+        return connection.address if connection is not None else None
+
+    @property
+    def outbound(self) -> OutboundQueue | None:
+        connection = self.connection
+        return connection.outbound if connection is not None else None
+
+    @property
+    def magic_packets_sent(self) -> bool:
+        connection = self.connection
+        return connection.magic_packets_sent if connection is not None else False
+
+    @magic_packets_sent.setter
+    def magic_packets_sent(self, value: bool):
+        connection = self.connection
+        if connection is None:
+            raise ConnectionError("No SWAMP device connected")
+        connection.magic_packets_sent = value
 
-    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
-        """Handle incoming SWAMP device connection"""
-        self.client_address = writer.get_extra_info('peername')
-        logger.info(f'SWAMP device connected from {self.client_address}')
+    def connection_for_unit(self, unit: int) -> DeviceConnection | None:
+        """The connection whose device reported `unit`, if any"""
+        return self._units.get(unit)
 
-        self.client_writer = writer
+    def connection_stats(self) -> dict[str, dict]:
+        """Per-connection traffic and queue counters, keyed by peer address"""
+        return {str(address): connection.stats() for address, connection in self.connections.items()}
 
-        # Update state
-        self.state_manager.state.socket_connected = True
-        self.state_manager.state.client_address = str(self.client_address)
-        self.state_manager.state.conn_accepted_sent = False
-        self.magic_packets_sent = False  # Reset for new connection
+    def subscribe_connected(self, callback: Callable[[bool], None]) -> Callable[[], None]:
+        """Call `callback(connected)` whenever DeviceState.connected changes; returns an unsubscribe function"""
+        self._connected_subscribers.append(callback)
+        return lambda: self._connected_subscribers.remove(callback)
 
-        # Send WHOIS automatically on connection
-        try:
-            whois_bytes = await self.protocol.encode_whois()
-            writer.write(whois_bytes)
-            await writer.drain()
-            logger.info(f'Sent WHOIS to {self.client_address}')
-        except Exception as e:
-            logger.error(f'Error sending WHOIS: {e}')
+    def seconds_since_last_message(self) -> float | None:
+        """Seconds since the last frame from any device, or None if there was none"""
+        last = self.state_manager.state.last_message_at
+        return None if last is None else asyncio.get_running_loop().time() - last
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle incoming SWAMP device connection"""
+        apply_socket_options(writer.transport, self.socket_options)
+        connection = self._add_connection(writer)
+        connection.handler_task = asyncio.current_task()
+        await self._send_whois(connection)
 
-        # Start periodic PING task
-        ping_task = asyncio.create_task(self._periodic_ping(writer))
+        # One device write may carry several frames, or only part of one
+        framer = FrameReassembler()
 
         try:
             while True:
                 data = await reader.read(1024)
                 if not data:
-                    logger.info(f'Connection closed by {self.client_address}')
+                    logger.info(f'Connection closed by {connection.address}')
                     break
 
                 logger.debug(f'Received {len(data)} bytes from SWAMP')
+                self._mark_received(connection, len(data))
 
-                # Update last message received time
-                self.state_manager.state.last_message_received = datetime.now()
-
-                try:
-                    message = await self.protocol.decode_message(data)
-                    if message:
-                        msg_type = message.get('type')
-
-                        # Handle PING with automatic PONG response
-                        if msg_type == 'ping':
-                            logger.debug('Received PING, sending PONG')
-                            pong_bytes = await self.protocol.encode_pong()
-                            writer.write(pong_bytes)
-                            await writer.drain()
-                        # Handle PONG (response to our periodic PING)
-                        elif msg_type == 'pong':
-                            logger.debug('Received PONG')
-                        # Handle JOIN messages from device
-                        elif msg_type == 'join':
-                            join_type = message.get('join_type', 'unknown')
-                            if join_type == 'serial_binary':
-                                # Update state from SERIAL_BINARY register data
-                                unit = message.get('unit')
-                                zone = message.get('zone')
-                                register = message.get('register')
-                                value = message.get('value')
-
-                                if unit is not None and zone is not None and register and value is not None:
-                                    logger.info(f'Unit {unit} Zone {zone}: {register} = {value}')
-                                    await self.state_manager.update_from_device(message)
-                                else:
-                                    logger.debug(f'Received JOIN (serial_binary) - incomplete data')
-                            else:
-                                logger.debug(f'Received JOIN ({join_type})')
-                        # Handle CLIENT_SIGNON with automatic CONN_ACCEPTED response
-                        elif msg_type == 'client_signon':
-                            logger.info(f'Received CLIENT_SIGNON: {message.get("payload")}')
-                            conn_accepted_bytes = await self.protocol.encode_conn_accepted()
-                            writer.write(conn_accepted_bytes)
-                            await writer.drain()
-                            self.state_manager.state.conn_accepted_sent = True
-                            logger.info('Sent CONN_ACCEPTED - connection established')
-
-                            # Send JOIN UPDATE 100ms later
-                            await asyncio.sleep(0.1)
-                            join_update_bytes = await self.protocol.encode_join_update()
-                            writer.write(join_update_bytes)
-                            await writer.drain()
-                            logger.info('Sent JOIN UPDATE')
-                        # Handle recognized but not-yet-implemented message types
-                        elif msg_type and msg_type.startswith('unknown_'):
-                            hex_str = ' '.join(f'{b:02x}' for b in data)
-                            print(f'Recognized but unimplemented message type {data[0]:02x} ({len(data)} bytes): {hex_str}')
-                            logger.info(f'Message type {data[0]:02x}: {hex_str}')
-                        else:
-                            # Update state for other messages
-                            await self.state_manager.update_from_device(message)
-                    else:
-                        # Message not recognized at all - print raw bytes
-                        hex_str = ' '.join(f'{b:02x}' for b in data)
-                        print(f'Unknown message type {data[0]:02x} ({len(data)} bytes): {hex_str}')
-                        logger.warning(f'Unknown message type {data[0]:02x}: {hex_str}')
-                except Exception as e:
-                    # Error during decoding - print raw bytes
-                    hex_str = ' '.join(f'{b:02x}' for b in data)
-                    print(f'Failed to decode message ({len(data)} bytes): {hex_str}')
-                    logger.error(f'Error decoding message: {e} - Raw data: {hex_str}')
+                framer.write(data)
+                await self._handle_batch(framer.decode_batch(self.protocol.decode_batch), connection)
 
         except asyncio.CancelledError:
             logger.info('Connection handler cancelled')
         except Exception as e:
             logger.error(f'Error in connection handler: {e}')
         finally:
-            # Cancel periodic PING
-            ping_task.cancel()
-            try:
-                await ping_task
-            except asyncio.CancelledError:
-                pass
-
-            # Reset connection state
-            self.state_manager.state.socket_connected = False
-            self.state_manager.state.conn_accepted_sent = False
-            self.state_manager.state.client_address = None
-            self.client_writer = None
-            self.client_address = None
-            writer.close()
-            await writer.wait_closed()
-
-    async def send_command(self, data: bytes):
-        """Send command to connected SWAMP device
+            await self._remove_connection(connection)
 
-        Automatically sends magic DIGITAL JOIN packets before first SERIAL_BINARY message.
+    async def handle_buffered_client(self, protocol: SwampBufferedProtocol):
+        """Handle incoming SWAMP device connection on the buffered receive path
+
+        Frames are already decoded by the protocol, a batch per receive; this
+        task applies them in order.
         """
-        if not self.client_writer:
-            raise ConnectionError("No SWAMP device connected")
+        connection = protocol.connection
+        await self._send_whois(connection)
 
-        # Check if this is a SERIAL_BINARY message (JOIN type 0x05, join type 0x20)
-        is_serial_binary = (
-            len(data) >= 7 and
-            data[0] == 0x05 and  # JOIN message
-            data[6] == 0x20       # SERIAL_BINARY join type
-        )
+        try:
+            while True:
+                messages = await protocol.receive()
+                if messages is None:
+                    logger.info(f'Connection closed by {connection.address}')
+                    break
 
-        # Send magic packets before first SERIAL_BINARY message
-        if is_serial_binary and not self.magic_packets_sent:
-            logger.info('Sending magic DIGITAL JOIN packets')
-            msg1, msg2 = self.protocol.encode_join_digital_magic()
+                await self._handle_batch(messages, connection)
 
-            self.client_writer.write(msg1)
-            await self.client_writer.drain()
-            logger.debug('Sent magic packet 1')
+        except asyncio.CancelledError:
+            logger.info('Connection handler cancelled')
+        except Exception as e:
+            logger.error(f'Error in connection handler: {e}')
+        finally:
+            await self._remove_connection(connection)
+
+    def _add_connection(self, writer, address=None) -> DeviceConnection:
+        """Register a new device connection and start its writer and keepalive"""
+        self._generation += 1
+        connection = DeviceConnection(writer, self.protocol, address, self._generation,
+                                      keepalive=self.keepalive, pacer=self.pacer)
+        logger.info(f'SWAMP device connected from {connection.address} ({len(self.connections) + 1} connected)')
+        self.connections[connection.address] = connection
+        connection.liveness.subscribe(self._on_liveness_change)
+        connection.start()
+        self._refresh_state()
+        return connection
+
+    async def _send_whois(self, connection: DeviceConnection):
+        """Send WHOIS automatically on connection"""
+        try:
+            whois_bytes = self.protocol.encode_whois_sync()
+            await connection.outbound.submit((whois_bytes,), priority=Priority.CONTROL)
+            logger.info(f'Sent WHOIS to {connection.address}')
+        except Exception as e:
+            logger.error(f'Error sending WHOIS: {e}')
 
-            self.client_writer.write(msg2)
-            await self.client_writer.drain()
-            logger.debug('Sent magic packet 2')
+    async def _remove_connection(self, connection: DeviceConnection):
+        """Stop the connection's keepalive and writer task and forget it"""
+        # Anything still queued fails with ConnectionError
+        await connection.close()
+
+        if self.connections.get(connection.address) is connection:
+            del self.connections[connection.address]
+        units = self._units
+        for unit in connection.units:
+            if units.get(unit) is connection:
+                del units[unit]
+        self._refresh_state()
+
+        writer = connection.writer
+        writer.close()
+        await writer.wait_closed()
+
+    def _claim_unit(self, unit: int, connection: DeviceConnection):
+        """Route `unit` to `connection` from now on"""
+        previous = self._units.get(unit)
+        if previous is not None:
+            if previous.host == connection.host and previous.generation < connection.generation:
+                self._take_over(previous, connection)
+            previous.units.discard(unit)
+        self._units[unit] = connection
+        connection.units.add(unit)
+        logger.info(f'Unit {unit} is on {connection.address}')
+
+    def _take_over(self, stale: DeviceConnection, connection: DeviceConnection):
+        """Replace a stale session of the same device with `connection`"""
+        if stale.superseded:
+            return
+        stale.superseded = True
+        self.takeovers += 1
+        logger.info(f'{connection.address} (session {connection.generation}) supersedes '
+                    f'{stale.address} (session {stale.generation})')
+
+        # Route the device's units to the new session straight away
+        units = self._units
+        for unit in stale.units:
+            if units.get(unit) is stale:
+                units[unit] = connection
+                connection.units.add(unit)
+        stale.units.clear()
+
+        # A half-open socket would never finish flushing, so don't wait for it
+        try:
+            stale.abort()
+        except Exception as e:
+            logger.debug(f'Error aborting stale connection: {e}')
+        if stale.handler_task is not None and stale.handler_task is not asyncio.current_task():
+            stale.handler_task.cancel()
+
+    def _on_liveness_change(self, connected: bool):
+        self._refresh_state()
+
+    def _refresh_state(self):
+        """Recompute the aggregate connection fields of DeviceState"""
+        state = self.state_manager.state
+        connections = self.connections.values()
+        primary = self.connection
+        state.socket_connected = primary is not None
+        state.conn_accepted_sent = any(connection.conn_accepted_sent for connection in connections)
+        state.client_address = str(primary.address) if primary is not None else None
+        connected = any(connection.connected for connection in connections)
+        if connected == state.connected:
+            return
+        state.connected = connected
+        for callback in list(self._connected_subscribers):
+            try:
+                callback(connected)
+            except Exception as e:
+                logger.error(f'Error in connection subscriber: {e}')
+
+    def _mark_received(self, connection: DeviceConnection, nbytes: int):
+        """Update last message received time"""
+        connection.bytes_received += nbytes
+        connection.liveness.mark_received()
+        self.state_manager.state.last_message_at = connection.last_message_at
+
+    def _report_undecodable(self, frame, error: Exception):
+        """Error during decoding - print raw bytes"""
+        hex_str = ' '.join(f'{b:02x}' for b in frame)
+        print(f'Failed to decode message ({len(frame)} bytes): {hex_str}')
+        logger.error(f'Error decoding message: {error} - Raw data: {hex_str}')
+
+    def register_handler(self, message_cls: type, handler: Callable[..., Awaitable]) -> None:
+        """Register (or replace) the handler for a decoded message class
+
+        `handler(message, connection)` is awaited for every message of exactly
+        that class, with the `DeviceConnection` it arrived on; replies go through
+        `connection.outbound.submit()`. Pair with `SwampProtocol.register_decoder()`
+        to support new message types without touching the read loop.
+        """
+        self._handlers[message_cls] = handler
 
-            # Wait 100ms after sending magic packets
-            await asyncio.sleep(0.1)
+    async def _handle_batch(self, messages: list[Message], connection: DeviceConnection):
+        """Act on a batch of decoded messages in stream order
 
-            self.magic_packets_sent = True
-            logger.info('Magic packets sent, ready for SERIAL_BINARY commands')
+        Runs of consecutive SERIAL_BINARY register messages are applied to the
+        state with a single `StateManager.apply_batch()` call, unless their
+        handler has been replaced with `register_handler()`.
+        """
+        connection.frames_received += len(messages)
+        batch_registers = self._handlers.get(SerialBinaryJoin) == self._handle_serial_binary
+        run = []
+        for message in messages:
+            if batch_registers and type(message) is SerialBinaryJoin:
+                run.append(message)
+                continue
+            if run:
+                await self._apply_registers(run, connection)
+                run = []
+            await self._handle_message(message, connection)
+        if run:
+            await self._apply_registers(run, connection)
+
+    async def _apply_registers(self, messages: list[SerialBinaryJoin], connection: DeviceConnection):
+        """Update state from a run of SERIAL_BINARY register messages"""
+        units = self._units
+        for message in messages:
+            if units.get(message.unit) is not connection:
+                self._claim_unit(message.unit, connection)
+        try:
+            if logger.isEnabledFor(logging.INFO):
+                for message in messages:
+                    logger.info(f'Unit {message.unit} Zone {message.zone}: {message.register_name} = {message.value}')
+            await self.state_manager.apply_batch(messages)
+        except Exception as e:
+            logger.error(f'Error handling message: {e}')
 
+    async def _handle_message(self, message: Message, connection: DeviceConnection):
+        """Act on one decoded message from the device"""
         try:
-            self.client_writer.write(data)
-            await self.client_writer.drain()
-            logger.debug(f'Sent {len(data)} bytes to SWAMP')
+            handler = self._handlers.get(type(message))
+            if handler is not None:
+                await handler(message, connection)
+            else:
+                # Other JOINs (UPDATE, unknown join or register types)
+                logger.debug(f'Received JOIN ({message.as_dict().get("join_type")})')
         except Exception as e:
-            logger.error(f'Error sending command: {e}')
-            raise
+            logger.error(f'Error handling message: {e}')
+
+    async def _handle_unknown_frame(self, message: UnknownFrame, connection: DeviceConnection):
+        """Report a frame that could not be decoded - print raw bytes"""
+        frame = message.frame
+        if message.error is not None:
+            self._report_undecodable(frame, message.error)
+            return
+        # Message not recognized at all
+        hex_str = ' '.join(f'{b:02x}' for b in frame)
+        print(f'Unknown message type {frame[0]:02x} ({len(frame)} bytes): {hex_str}')
+        logger.warning(f'Unknown message type {frame[0]:02x}: {hex_str}')
+
+    async def _handle_serial_binary(self, message: SerialBinaryJoin, connection: DeviceConnection):
+        """Update state from SERIAL_BINARY register data"""
+        if self._units.get(message.unit) is not connection:
+            self._claim_unit(message.unit, connection)
+        logger.info(f'Unit {message.unit} Zone {message.zone}: {message.register_name} = {message.value}')
+        await self.state_manager.update_from_device(message)
+
+    async def _handle_ping(self, message: Ping, connection: DeviceConnection):
+        """Handle PING with automatic PONG response"""
+        logger.debug('Received PING, sending PONG')
+        pong_bytes = self.protocol.encode_pong_sync()
+        connection.outbound.submit((pong_bytes,), wait=False, priority=Priority.CONTROL)
+
+    async def _handle_pong(self, message: Pong, connection: DeviceConnection):
+        """Handle PONG (response to our periodic PING)"""
+        logger.debug('Received PONG')
+
+    async def _handle_client_signon(self, message: ClientSignon, connection: DeviceConnection):
+        """Handle CLIENT_SIGNON with automatic CONN_ACCEPTED response
+
+        Nothing here waits, so the read loop carries straight on with the
+        device's state dump and PINGs; see `DeviceConnection.accept()`.
+        """
+        logger.info(f'Received CLIENT_SIGNON: {message.payload.hex()}')
+        connection.accept(message.payload)
+        for other in list(self.connections.values()):
+            if (other is not connection and other.host == connection.host
+                    and other.signon == connection.signon and other.generation < connection.generation):
+                self._take_over(other, connection)
+        self._refresh_state()
+
+    @property
+    def outbound_depth(self) -> int:
+        """Number of frames queued for the connected devices"""
+        return sum(connection.outbound.depth for connection in self.connections.values())
+
+    @property
+    def frames_elided(self) -> int:
+        """Register writes dropped on current connections because a newer value superseded them"""
+        return sum(connection.outbound.frames_elided for connection in self.connections.values())
+
+    @property
+    def outbound_latency(self) -> dict[Priority, LatencyStats]:
+        """Submit-to-drained latency per traffic class across current connections"""
+        return merge_latency(self.connections.values())
+
+    async def send_command(self, data: bytes, wait: bool = True,
+                           priority: Priority = Priority.INTERACTIVE):
+        """Send command to connected SWAMP device
 
-    async def close(self):
-        """Close the server"""
-        # Close any active client connection
-        if self.client_writer:
+        Automatically sends magic DIGITAL JOIN packets before first SERIAL_BINARY message.
+        """
+        await self.send_commands((data,), wait, priority)
+
+    async def send_commands(self, frames: Sequence[bytes], wait: bool = True,
+                            priority: Priority = Priority.INTERACTIVE):
+        """Send several commands to the connected SWAMP devices at once
+
+        Frames are queued on the connection's outbound queue, whose writer task
+        sends everything pending with a single `writelines()` and one drain, so
+        a multi-zone command leaves in one TCP segment and the zones change
+        together. A queued register write is dropped if a newer value for the
+        same (unit, zone, register) is sent before it went out. With `wait` (the
+        default) this returns once the frames (or the values superseding them)
+        have been written and drained and raises if the write failed; otherwise
+        the frames are sent fire-and-forget.
+
+        `priority` picks the traffic class: CONTROL and INTERACTIVE frames are
+        written ahead of queued BACKGROUND (bulk, e.g. volume ramp) frames.
+        Register writes are paced by the server's `rate_limit`, if any, with
+        one budget shared by all connections.
+
+        With several devices connected, register writes go to the connection
+        that owns their unit. Frames without a unit (e.g. WHOIS), and writes to
+        a unit no device has reported yet, go to every connection.
+        """
+        connections = self.connections
+        if not connections:
+            raise ConnectionError("No SWAMP device connected")
+
+        if len(connections) == 1:
+            connection = next(iter(connections.values()))
+            waiter = connection.outbound.submit(frames, wait, priority)
+            if waiter is not None:
+                await waiter
+            return
+
+        units = self._units
+        coalesce_key = self.protocol.coalesce_key
+        routed: dict[DeviceConnection, list[bytes]] = {}
+        for frame in frames:
+            key = coalesce_key(frame)
+            owner = units.get(key[0]) if key is not None else None
+            for connection in (owner,) if owner is not None else connections.values():
+                routed.setdefault(connection, []).append(frame)
+        waiters = [connection.outbound.submit(routed_frames, wait, priority)
+                   for connection, routed_frames in routed.items()]
+        if wait:
+            await asyncio.gather(*waiters)
+
+    async def close_clients(self):
+        """Close every device connection"""
+        for connection in list(self.connections.values()):
             try:
-                self.client_writer.close()
-                await self.client_writer.wait_closed()
+                connection.writer.close()
+                await connection.writer.wait_closed()
             except Exception as e:
                 logger.debug(f'Error closing client connection: {e}')
 
+    async def close(self):
+        """Close the server"""
+        # Close any active client connections
+        await self.close_clients()
+
         # Close the server
         if self.server:
             self.server.close()
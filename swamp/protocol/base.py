@@ -1,45 +1,130 @@
 from abc import ABC, abstractmethod
 
+from .framer import FrameReassembler
+from .messages import Message, UnknownFrame
+
 
 class ProtocolHandler(ABC):
-    """Abstract base for SWAMP protocol implementations"""
+    """Abstract base for SWAMP protocol implementations
+
+    Implementations provide the synchronous codec methods (`*_sync` and
+    `decode_frame`), which are what the server read loop and controller
+    fan-out call. `decode_frame` returns typed message objects; the dict
+    returned by `decode_message_sync` and the async methods are thin
+    compatibility wrappers around it.
+    """
 
     @abstractmethod
-    async def encode_route_command(self, unit: int, zone: int, source_id: int) -> bytes:
+    def encode_route_command_sync(self, unit: int, zone: int, source_id: int) -> bytes:
         """Convert routing command to wire format"""
         pass
 
     @abstractmethod
-    async def encode_volume_command(self, unit: int, zone: int, volume: int) -> bytes:
+    def encode_volume_command_sync(self, unit: int, zone: int, volume: int) -> bytes:
         """Convert volume command to wire format"""
         pass
 
     @abstractmethod
-    async def encode_power_command(self, unit: int, zone: int, power_on: bool) -> bytes:
+    def encode_power_command_sync(self, unit: int, zone: int, power_on: bool) -> bytes:
         """Convert power command to wire format"""
         pass
 
     @abstractmethod
-    async def decode_message(self, data: bytes) -> dict | None:
-        """Parse incoming message into structured data"""
+    def decode_frame(self, data: bytes | memoryview) -> Message | None:
+        """Parse one incoming frame into a typed message"""
         pass
 
     @abstractmethod
-    async def encode_query_state(self, unit: int) -> bytes:
+    def encode_query_state_sync(self, unit: int) -> bytes:
         """Request full state from device"""
         pass
 
     @abstractmethod
-    async def encode_whois(self) -> bytes:
+    def encode_whois_sync(self) -> bytes:
         """Encode WHOIS request"""
         pass
 
     @abstractmethod
-    async def encode_pong(self) -> bytes:
+    def encode_pong_sync(self) -> bytes:
         """Encode PONG response"""
         pass
 
     @abstractmethod
-    async def encode_conn_accepted(self) -> bytes:
+    def encode_conn_accepted_sync(self) -> bytes:
         """Encode CONN_ACCEPTED response"""
         pass
+
+    def coalesce_key(self, frame: bytes):
+        """Identify the register a command frame sets, for latest-value-wins sending
+
+        Frames with the same key overwrite each other, so a queued one can be
+        dropped when a newer one arrives. None (the default) never coalesces.
+        """
+        return None
+
+    def decode_message_sync(self, data: bytes | memoryview) -> dict | None:
+        """Parse incoming message into its legacy dict form"""
+        message = self.decode_frame(data)
+        return message.as_dict() if message is not None else None
+
+    def decode_batch(self, buffer: bytes | memoryview) -> tuple[list[Message], int]:
+        """Decode every complete frame in a buffer with one call
+
+        Returns (messages, leftover): the decoded messages in order, and the
+        number of trailing bytes that do not yet form a complete frame.
+        Frames that do not decode are returned as `UnknownFrame` so the batch
+        keeps stream order and nothing is dropped silently.
+        """
+        header_size = FrameReassembler.HEADER_SIZE
+        decode = self.decode_frame
+        messages = []
+        end = len(buffer)
+        pos = 0
+        with memoryview(buffer) as view:
+            while end - pos >= header_size:
+                frame_end = pos + header_size + ((view[pos + 1] << 8) | view[pos + 2])
+                if frame_end > end:
+                    break  # Incomplete frame
+                with view[pos:frame_end] as frame:
+                    try:
+                        message = decode(frame)
+                    except Exception as e:
+                        message = UnknownFrame(bytes(frame), e)
+                    else:
+                        if message is None:
+                            message = UnknownFrame(bytes(frame))
+                messages.append(message)
+                pos = frame_end
+        return messages, end - pos
+
+    async def encode_route_command(self, unit: int, zone: int, source_id: int) -> bytes:
+        """Convert routing command to wire format"""
+        return self.encode_route_command_sync(unit, zone, source_id)
+
+    async def encode_volume_command(self, unit: int, zone: int, volume: int) -> bytes:
+        """Convert volume command to wire format"""
+        return self.encode_volume_command_sync(unit, zone, volume)
+
+    async def encode_power_command(self, unit: int, zone: int, power_on: bool) -> bytes:
+        """Convert power command to wire format"""
+        return self.encode_power_command_sync(unit, zone, power_on)
+
+    async def decode_message(self, data: bytes | memoryview) -> dict | None:
+        """Parse incoming message into structured data"""
+        return self.decode_message_sync(data)
+
+    async def encode_query_state(self, unit: int) -> bytes:
+        """Request full state from device"""
+        return self.encode_query_state_sync(unit)
+
+    async def encode_whois(self) -> bytes:
+        """Encode WHOIS request"""
+        return self.encode_whois_sync()
+
+    async def encode_pong(self) -> bytes:
+        """Encode PONG response"""
+        return self.encode_pong_sync()
+
+    async def encode_conn_accepted(self) -> bytes:
+        """Encode CONN_ACCEPTED response"""
+        return self.encode_conn_accepted_sync()
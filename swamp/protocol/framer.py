@@ -0,0 +1,118 @@
+from typing import Callable, Iterator
+
+
+class FrameReassembler:
+    """Incremental CIP frame reassembler for a TCP byte stream
+
+    TCP gives no message boundaries: one read may contain several frames, or
+    only part of one. Incoming bytes are collected in a preallocated buffer and
+    every complete `[type][len:2][payload:len]` frame is yielded as a
+    memoryview slice of that buffer, so no frame is copied. Incomplete trailing
+    bytes are kept until more data completes them.
+
+    Data can be pushed with `feed()` (one copy into the buffer), or received
+    directly into the buffer with `get_buffer()` / `buffer_updated()`, which
+    mirror the `asyncio.BufferedProtocol` callbacks. To decode a whole burst
+    in one call, add data with `write()` / `commit()` and hand every buffered
+    frame to a batch decoder with `decode_batch()`.
+
+    Yielded views are only valid until the generator advances; decode (or copy)
+    each frame before asking for the next one.
+    """
+
+    HEADER_SIZE = 3
+    MAX_FRAME_SIZE = HEADER_SIZE + 0xFFFF
+
+    def __init__(self, capacity: int = 2 * MAX_FRAME_SIZE):
+        # Always room for one maximum-size frame, so receiving never has to
+        # resize the buffer while a view of it is exported.
+        self._buffer = bytearray(max(capacity, self.MAX_FRAME_SIZE))
+        self._start = 0
+        self._end = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered bytes not yet forming a complete frame"""
+        return self._end - self._start
+
+    def feed(self, data: bytes) -> Iterator[memoryview]:
+        """Copy a received chunk into the buffer and yield every complete frame"""
+        self.write(data)
+        return self._frames()
+
+    def write(self, data: bytes) -> None:
+        """Copy a received chunk into the buffer without framing it"""
+        size = len(data)
+        if self._end + size > len(self._buffer):
+            self._compact()
+            if self._end + size > len(self._buffer):
+                self._buffer.extend(bytes(self._end + size - len(self._buffer)))
+        self._buffer[self._end:self._end + size] = data
+        self._end += size
+
+    def get_buffer(self, sizehint: int = -1) -> memoryview:
+        """Return the free tail of the buffer for the transport to receive into"""
+        free = len(self._buffer) - self._end
+        if self._start and (free < sizehint or free < self.MAX_FRAME_SIZE // 2):
+            self._compact()
+        return memoryview(self._buffer)[self._end:]
+
+    def buffer_updated(self, nbytes: int) -> Iterator[memoryview]:
+        """Record `nbytes` written into `get_buffer()` and yield every complete frame"""
+        self._end += nbytes
+        return self._frames()
+
+    def commit(self, nbytes: int) -> None:
+        """Record `nbytes` written into `get_buffer()` without framing them"""
+        self._end += nbytes
+
+    def decode_batch(self, decode_batch: Callable[[memoryview], tuple[list, int]]) -> list:
+        """Decode every complete buffered frame with one `decode_batch` call
+
+        `decode_batch(view)` returns (messages, leftover bytes), as
+        `ProtocolHandler.decode_batch()` does. Consumed frames are dropped and
+        the leftover partial frame stays buffered.
+        """
+        with memoryview(self._buffer)[self._start:self._end] as view:
+            messages, leftover = decode_batch(view)
+        self._start = self._end - leftover
+        if self._start == self._end:
+            self._start = self._end = 0
+        return messages
+
+    def reset(self) -> None:
+        """Discard any buffered partial frame"""
+        self._start = self._end = 0
+
+    def _frames(self) -> Iterator[memoryview]:
+        buffer = self._buffer
+        end = self._end
+        pos = self._start
+        view = memoryview(buffer)
+        try:
+            while end - pos >= self.HEADER_SIZE:
+                frame_end = pos + self.HEADER_SIZE + ((buffer[pos + 1] << 8) | buffer[pos + 2])
+                if frame_end > end:
+                    break  # Incomplete frame, wait for more data
+                frame = view[pos:frame_end]
+                pos = self._start = frame_end
+                try:
+                    yield frame
+                finally:
+                    frame.release()
+        finally:
+            view.release()
+            if self._start == self._end:
+                self._start = self._end = 0
+
+    def _compact(self) -> None:
+        """Move a buffered partial frame to the front of the buffer
+
+        Uses same-size slice assignment, which is allowed even while a view
+        returned by `get_buffer()` is still alive.
+        """
+        remaining = self._end - self._start
+        if remaining:
+            self._buffer[:remaining] = self._buffer[self._start:self._end]
+        self._start = 0
+        self._end = remaining
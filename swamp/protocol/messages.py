@@ -0,0 +1,169 @@
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import ClassVar
+
+
+class MessageType(IntEnum):
+    """CIP message type (byte 0 of every frame)"""
+    CONN_ACCEPTED = 0x02
+    JOIN = 0x05
+    CLIENT_SIGNON = 0x0a
+    PING = 0x0d
+    PONG = 0x0e
+    WHOIS = 0x0f
+
+
+class JoinType(IntEnum):
+    """JOIN message join type (byte 6 of a JOIN frame)"""
+    DIGITAL = 0x00
+    UPDATE = 0x03
+    SERIAL_BINARY = 0x20
+
+
+class Register(IntEnum):
+    """SERIAL_BINARY register ID"""
+    SOURCE = 0x01
+    VOLUME = 0x02
+
+
+# SERIAL_BINARY register message type (the only one we know how to decode)
+REGISTER_MESSAGE = 0x14
+
+REGISTER_NAMES = {
+    Register.SOURCE: 'source',
+    Register.VOLUME: 'volume',
+}
+REGISTERS_BY_NAME = {name: register for register, name in REGISTER_NAMES.items()}
+
+
+def register_name(register_id: int) -> str:
+    """Name used for a register ID in the dict view ('source', 'volume', 'unknown_xx')"""
+    return REGISTER_NAMES.get(register_id) or f'unknown_{register_id:02x}'
+
+
+# Decoded messages. Plain slotted dataclasses rather than frozen ones: frozen
+# dataclass construction goes through object.__setattr__ and costs roughly
+# three times as much, which matters on the receive path. Treat them as
+# immutable. `as_dict()` gives the legacy dict form returned by decode_message().
+
+@dataclass(slots=True)
+class Ping:
+    """PING from the device"""
+    message_type: ClassVar[MessageType] = MessageType.PING
+
+    def as_dict(self) -> dict:
+        return {'type': 'ping'}
+
+
+@dataclass(slots=True)
+class Pong:
+    """PONG from the device (reply to our periodic PING)"""
+    message_type: ClassVar[MessageType] = MessageType.PONG
+
+    def as_dict(self) -> dict:
+        return {'type': 'pong'}
+
+
+@dataclass(slots=True)
+class ClientSignon:
+    """CLIENT_SIGNON sent by the device when it connects"""
+    message_type: ClassVar[MessageType] = MessageType.CLIENT_SIGNON
+    payload: bytes
+
+    def as_dict(self) -> dict:
+        return {'type': 'client_signon', 'payload': self.payload.hex()}
+
+
+@dataclass(slots=True)
+class JoinUpdate:
+    """JOIN UPDATE (join type 0x03)"""
+    message_type: ClassVar[MessageType] = MessageType.JOIN
+    join_type: ClassVar[int] = JoinType.UPDATE
+    join_data: bytes
+
+    def as_dict(self) -> dict:
+        return {'type': 'join', 'join_type': 'update', 'join_data': self.join_data.hex()}
+
+
+@dataclass(slots=True)
+class UnknownJoin:
+    """JOIN with a join type we don't decode yet"""
+    message_type: ClassVar[MessageType] = MessageType.JOIN
+    join_type: int
+    join_data: bytes
+
+    def as_dict(self) -> dict:
+        return {
+            'type': 'join',
+            'join_type': f'unknown_{self.join_type:02x}',
+            'join_data': self.join_data.hex()
+        }
+
+
+@dataclass(slots=True)
+class SerialBinaryJoin:
+    """SERIAL_BINARY register value for one zone
+
+    `register` is the raw register ID (compare with `Register`); volume values
+    are already converted to 0-100.
+    """
+    message_type: ClassVar[MessageType] = MessageType.JOIN
+    join_type: ClassVar[int] = JoinType.SERIAL_BINARY
+    unit: int
+    zone: int
+    register: int
+    value: int
+
+    @property
+    def register_name(self) -> str:
+        return register_name(self.register)
+
+    def as_dict(self) -> dict:
+        return {
+            'type': 'join',
+            'join_type': 'serial_binary',
+            'unit': self.unit,
+            'zone': self.zone,
+            'register': register_name(self.register),
+            'value': self.value
+        }
+
+
+@dataclass(slots=True)
+class UnknownSerialBinaryJoin:
+    """SERIAL_BINARY JOIN with a register message type other than 0x14"""
+    message_type: ClassVar[MessageType] = MessageType.JOIN
+    join_type: ClassVar[int] = JoinType.SERIAL_BINARY
+    unit: int
+    zone: int
+    register_msg_type: int
+
+    def as_dict(self) -> dict:
+        return {
+            'type': 'join',
+            'join_type': 'serial_binary',
+            'unit': self.unit,
+            'zone': self.zone,
+            'register_msg_type': f'unknown_{self.register_msg_type:02x}'
+        }
+
+
+@dataclass(slots=True)
+class UnknownFrame:
+    """Complete frame that could not be decoded, as returned by decode_batch()
+
+    `error` is None when no decoder recognised the frame, or the exception
+    raised while decoding it.
+    """
+    frame: bytes
+    error: Exception | None = None
+
+    @property
+    def message_type(self) -> int:
+        return self.frame[0]
+
+    def as_dict(self) -> dict:
+        return {'type': f'unknown_{self.frame[0]:02x}', 'data': self.frame.hex()}
+
+
+Message = Ping | Pong | ClientSignon | JoinUpdate | UnknownJoin | SerialBinaryJoin | UnknownSerialBinaryJoin | UnknownFrame
@@ -1,4 +1,105 @@
+import struct
+from functools import lru_cache
+from typing import Callable
+
 from .base import ProtocolHandler
+from .messages import (
+    REGISTER_MESSAGE,
+    ClientSignon,
+    JoinType,
+    JoinUpdate,
+    Message,
+    MessageType,
+    Ping,
+    Pong,
+    Register,
+    SerialBinaryJoin,
+    UnknownJoin,
+    UnknownSerialBinaryJoin,
+)
+
+
+# Fixed frames, built once
+PING = bytes([0x0d, 0x00, 0x02, 0x00, 0x00])
+PONG = bytes([0x0e, 0x00, 0x02, 0x00, 0x00])
+WHOIS = bytes([0x0f, 0x00, 0x01, 0x02])
+CONN_ACCEPTED = bytes([0x02, 0x00, 0x04, 0x00, 0x00, 0x00, 0x03])
+
+JOIN_DIGITAL_MAGIC = (
+    bytes([
+        0x05,              # Message type: JOIN
+        0x00, 0x06,        # Remaining length: 6 bytes
+        0x00, 0x00, 0x03,  # Inner length: 3 bytes
+        0x00,              # Join type: DIGITAL
+        0x70, 0x49         # Magic payload
+    ]),
+    bytes([
+        0x05,              # Message type: JOIN
+        0x00, 0x06,        # Remaining length: 6 bytes
+        0x00, 0x00, 0x03,  # Inner length: 3 bytes
+        0x00,              # Join type: DIGITAL
+        0x70, 0xc9         # Magic payload
+    ]),
+)
+
+# Messages without fields are shared rather than allocated per frame
+_PING_MESSAGE = Ping()
+_PONG_MESSAGE = Pong()
+
+# JOIN UPDATE for every possible join data byte
+_JOIN_UPDATE = tuple(
+    bytes([
+        0x05,              # Message type: JOIN
+        0x00, 0x05,        # Remaining length: 5 bytes
+        0x00, 0x00, 0x02,  # Inner length: 2 bytes
+        0x03,              # Join type: UPDATE
+        payload_byte       # Join data
+    ])
+    for payload_byte in range(0x100)
+)
+
+# SERIAL_BINARY register write template:
+# 05 00 0e 00 00 0b 20 [unit] 08 20 [zone] 05 14 00 [reg] [val_hi] [val_lo]
+_SERIAL_BINARY_REGISTER = struct.Struct('>7sB2sB3sBH')
+_SERIAL_BINARY_HEADER = bytes([
+    0x05,              # Message type: JOIN
+    0x00, 0x0e,        # Remaining length: 14 bytes
+    0x00, 0x00, 0x0b,  # Inner length: 11 bytes
+    0x20,              # Join type: SERIAL_BINARY
+])
+_SERIAL_BINARY_ZONE_PREFIX = bytes([
+    0x08,              # Remaining length
+    0x20,              # Join type repeated
+])
+_SERIAL_BINARY_REGISTER_PREFIX = bytes([
+    0x05,              # Remaining length
+    0x14,              # Register message type
+    0x00,              # 0x00
+])
+
+# Volume conversion tables, 0-100 <-> 0x0000-0xFFFF, built once.
+# Encoding truncates (as the float conversion did, so the wire values are
+# unchanged) and decoding rounds to nearest, so every 0-100 level survives an
+# encode/decode round trip exactly.
+VOLUME_MAX = 100
+VOLUME_TO_RAW = tuple(volume * 0xFFFF // VOLUME_MAX for volume in range(VOLUME_MAX + 1))
+RAW_TO_VOLUME = bytes((raw * VOLUME_MAX + 0xFFFF // 2) // 0xFFFF for raw in range(0x10000))
+
+# Default number of fully encoded register frames kept per SwampProtocol
+ENCODE_CACHE_SIZE = 1024
+
+
+def _pack_serial_binary_register(unit: int, zone: int, register_id: int, value: int) -> bytes:
+    """Fill the SERIAL_BINARY template; value must already fit in 2 bytes"""
+    try:
+        return _SERIAL_BINARY_REGISTER.pack(
+            _SERIAL_BINARY_HEADER, unit,
+            _SERIAL_BINARY_ZONE_PREFIX, zone,
+            _SERIAL_BINARY_REGISTER_PREFIX, register_id,
+            value
+        )
+    except struct.error as e:
+        raise ValueError(f"Cannot encode unit {unit} zone {zone} register {register_id}: {e}") from e
 
 
 class SwampProtocol(ProtocolHandler):
@@ -22,24 +123,74 @@ class SwampProtocol(ProtocolHandler):
     - Bytes 0-2: Inner length (3 bytes big-endian) - size after these 3 bytes
     - Byte 3: Join type (0x03 = UPDATE)
     - Bytes 4+: Join payload
+
+    Frames are encoded from templates compiled once at import. Register
+    writes are additionally memoised in a bounded LRU keyed by
+    (unit, zone, register, value), so repeated commands during volume ramps
+    and scene recalls are a cache hit.
     """
 
-    async def encode_route_command(self, unit: int, zone: int, source_id: int) -> bytes:
+    def __init__(self, encode_cache_size: int = ENCODE_CACHE_SIZE):
+        self._serial_binary_frame = lru_cache(maxsize=encode_cache_size)(_pack_serial_binary_register)
+
+        # Decoders keyed by raw message type byte: (frame, payload) -> message
+        self._decoders: dict[int, Callable] = {
+            MessageType.JOIN: self._decode_join,
+            MessageType.PING: self._decode_ping,
+            MessageType.PONG: self._decode_pong,
+            MessageType.CLIENT_SIGNON: self._decode_client_signon,
+        }
+        # JOIN decoders keyed by raw join type byte: (join data) -> message
+        self._join_decoders: dict[int, Callable] = {
+            JoinType.SERIAL_BINARY: self._decode_serial_binary,
+            JoinType.UPDATE: self._decode_join_update,
+        }
+
+    def register_decoder(self, message_type: int, decoder: Callable) -> None:
+        """Register (or replace) the decoder for a message type byte
+
+        `decoder(frame, payload)` returns a message object or None. Lets message
+        types discovered in the field be plugged in without touching the read loop.
+
+        `frame` and `payload` may be memoryviews into the receive buffer, which
+        is reused for the next frames: they are only valid during the call.
+        Copy whatever the message keeps (`bytes(payload)`), as the built-in
+        decoders do, and don't hold on to the views themselves.
+        """
+        self._decoders[message_type] = decoder
+
+    def register_join_decoder(self, join_type: int, decoder: Callable) -> None:
+        """Register (or replace) the decoder for a JOIN join type byte
+
+        `decoder(join_data)` returns a message object or None. Like
+        `register_decoder()`, `join_data` may be a memoryview that is only
+        valid during the call; copy what the message keeps.
+        """
+        self._join_decoders[join_type] = decoder
+
+    def encode_cache_info(self):
+        """Hit/miss statistics of the encoded register frame cache"""
+        return self._serial_binary_frame.cache_info()
+
+    def encode_route_command_sync(self, unit: int, zone: int, source_id: int) -> bytes:
         """Convert routing command to wire format
 
         Uses SERIAL_BINARY JOIN to set source register (0x01)
         """
         return self._encode_serial_binary_register(unit, zone, 0x01, source_id)
 
-    async def encode_volume_command(self, unit: int, zone: int, volume: int) -> bytes:
+    def encode_volume_command_sync(self, unit: int, zone: int, volume: int) -> bytes:
         """Convert volume command to wire format
 
         Uses SERIAL_BINARY JOIN to set volume register (0x02)
-        Volume range: 0-100 maps to 0x0000-0xFFFF
+        Volume range: 0-100 maps to 0x0000-0xFFFF (values outside are clamped,
+        fractional levels rounded to the nearest whole level)
         """
-        # Convert volume from 0-100 to 0x0000-0xFFFF
-        volume_value = int((volume / 100) * 0xFFFF)
-        return self._encode_serial_binary_register(unit, zone, 0x02, volume_value)
+        if volume < 0:
+            volume = 0
+        elif volume > VOLUME_MAX:
+            volume = VOLUME_MAX
+        return self._encode_serial_binary_register(unit, zone, 0x02, VOLUME_TO_RAW[int(round(volume))])
 
     def _encode_serial_binary_register(self, unit: int, zone: int, register_id: int, value: int) -> bytes:
         """Encode SERIAL_BINARY JOIN message to set a register
@@ -53,28 +204,23 @@ class SwampProtocol(ProtocolHandler):
             value: Register value (2-byte integer)
         """
         # Ensure value fits in 2 bytes
-        value = max(0, min(0xFFFF, value))
-        value_hi = (value >> 8) & 0xFF
-        value_lo = value & 0xFF
-
-        return bytes([
-            0x05,              # Message type: JOIN
-            0x00, 0x0e,        # Remaining length: 14 bytes
-            0x00, 0x00, 0x0b,  # Inner length: 11 bytes
-            0x20,              # Join type: SERIAL_BINARY
-            unit,              # Unit number
-            0x08,              # Remaining length
-            0x20,              # Join type repeated
-            zone,              # Zone number
-            0x05,              # Remaining length
-            0x14,              # Register message type
-            0x00,              # 0x00
-            register_id,       # Register ID
-            value_hi,          # Value high byte
-            value_lo           # Value low byte
-        ])
-
-    async def encode_power_command(self, unit: int, zone: int, power_on: bool) -> bytes:
+        if value < 0:
+            value = 0
+        elif value > 0xFFFF:
+            value = 0xFFFF
+        return self._serial_binary_frame(unit, zone, register_id, value)
+
+    def coalesce_key(self, frame: bytes) -> tuple[int, int, int] | None:
+        """(unit, zone, register) of a SERIAL_BINARY register write, else None
+
+        Reads bytes 7, 10 and 14 of the template documented above.
+        """
+        if (len(frame) == _SERIAL_BINARY_REGISTER.size and frame[0] == MessageType.JOIN
+                and frame[6] == JoinType.SERIAL_BINARY and frame[12] == REGISTER_MESSAGE):
+            return (frame[7], frame[10], frame[14])
+        return None
+
+    def encode_power_command_sync(self, unit: int, zone: int, power_on: bool) -> bytes:
         """Convert power command to wire format
 
         Power on/off is handled by setting source register:
@@ -87,17 +233,20 @@ class SwampProtocol(ProtocolHandler):
         source_id = 0 if not power_on else 1  # Default to source 1 if on
         return self._encode_serial_binary_register(unit, zone, 0x01, source_id)
 
-    async def decode_message(self, data: bytes) -> dict | None:
-        """Parse incoming message into structured data
+    def decode_frame(self, data: bytes | memoryview) -> Message | None:
+        """Parse one incoming frame into a typed message
 
         Format: [type (1), length (2), payload (length)]
         Length is remaining bytes (total - 3) in big-endian
+
+        Accepts a memoryview (e.g. a frame from FrameReassembler), in which
+        case the payload is sliced in place rather than copied.
         """
         if not data or len(data) < 3:
             return None
 
         message_type = data[0]
-        remaining_length = int.from_bytes(data[1:3], 'big')
+        remaining_length = (data[1] << 8) | data[2]
 
         # Verify message is complete
         expected_total = 3 + remaining_length
@@ -107,35 +256,28 @@ class SwampProtocol(ProtocolHandler):
         payload = data[3:3 + remaining_length]
 
         # Dispatch based on message type
-        if message_type == 0x0d:
-            return self._decode_ping(data, payload)
-        elif message_type == 0x0e:
-            return self._decode_pong(data, payload)
-        elif message_type == 0x0a:
-            return self._decode_client_signon(data, payload)
-        elif message_type == 0x05:
-            return self._decode_join(data, payload)
-        # Add more message types here as we discover them
-
-        return None
+        decoder = self._decoders.get(message_type)
+        if decoder is None:
+            return None
+        return decoder(data, payload)
 
-    def _decode_ping(self, data: bytes, payload: bytes) -> dict | None:
+    def _decode_ping(self, data: bytes, payload: bytes) -> Ping | None:
         """Decode PING message (0x0d)"""
         # PING: 0d 00 02 00 00
         # Type: 0x0d, Length: 2, Payload: 00 00
-        if data == bytes([0x0d, 0x00, 0x02, 0x00, 0x00]):
-            return {'type': 'ping'}
+        if data == PING:
+            return _PING_MESSAGE
         return None
 
-    def _decode_pong(self, data: bytes, payload: bytes) -> dict | None:
+    def _decode_pong(self, data: bytes, payload: bytes) -> Pong | None:
         """Decode PONG message (0x0e)"""
         # PONG: 0e 00 02 00 00
         # Type: 0x0e, Length: 2, Payload: 00 00
-        if data == bytes([0x0e, 0x00, 0x02, 0x00, 0x00]):
-            return {'type': 'pong'}
+        if data == PONG:
+            return _PONG_MESSAGE
         return None
 
-    def _decode_client_signon(self, data: bytes, payload: bytes) -> dict | None:
+    def _decode_client_signon(self, data: bytes, payload: bytes) -> ClientSignon:
         """Decode CLIENT_SIGNON message (0x0a)
 
         Sent by device when it connects. We should respond with CONN_ACCEPTED.
@@ -143,12 +285,9 @@ class SwampProtocol(ProtocolHandler):
         """
         # Example: 0a 00 0a 00 51 a3 42 40 02 00 00 00 00
         # Type: 0x0a, Length: 10 (0x00 0x0a), Payload: 00 51 a3 42 40 02 00 00 00 00
-        return {
-            'type': 'client_signon',
-            'payload': payload.hex()
-        }
+        return ClientSignon(bytes(payload))
 
-    def _decode_join(self, data: bytes, payload: bytes) -> dict | None:
+    def _decode_join(self, data: bytes, payload: bytes) -> Message | None:
         """Decode JOIN message (0x05)
 
         JOIN payload format:
@@ -159,29 +298,22 @@ class SwampProtocol(ProtocolHandler):
         if len(payload) < 4:
             return None
 
-        inner_length = int.from_bytes(payload[0:3], 'big')
+        inner_length = (payload[0] << 16) | (payload[1] << 8) | payload[2]
         join_type = payload[3]
 
         # Extract join data based on inner length
         join_data = payload[4:4 + inner_length - 1] if inner_length > 1 else b''
 
-        if join_type == 0x03:
-            return {
-                'type': 'join',
-                'join_type': 'update',
-                'join_data': join_data.hex() if join_data else ''
-            }
-        elif join_type == 0x20:
-            # SERIAL_BINARY - decode register data
-            return self._decode_serial_binary(join_data)
-        else:
-            return {
-                'type': 'join',
-                'join_type': f'unknown_{join_type:02x}',
-                'join_data': join_data.hex() if join_data else ''
-            }
-
-    def _decode_serial_binary(self, data: bytes) -> dict | None:
+        decoder = self._join_decoders.get(join_type)
+        if decoder is None:
+            return UnknownJoin(join_type, bytes(join_data))
+        return decoder(join_data)
+
+    def _decode_join_update(self, data: bytes) -> JoinUpdate:
+        """Decode JOIN UPDATE payload (0x03)"""
+        return JoinUpdate(bytes(data))
+
+    def _decode_serial_binary(self, data: bytes) -> SerialBinaryJoin | UnknownSerialBinaryJoin | None:
         """Decode SERIAL_BINARY JOIN payload (0x20)
 
         Format:
@@ -206,63 +338,56 @@ class SwampProtocol(ProtocolHandler):
         msg_type = data[5]
         # data[6] should be 0x00
         register_id = data[7]
-        register_value = int.from_bytes(data[8:10], 'big')
+        register_value = (data[8] << 8) | data[9]
 
-        if msg_type != 0x14:
+        if msg_type != REGISTER_MESSAGE:
             # Unknown register message type
-            return {
-                'type': 'join',
-                'join_type': 'serial_binary',
-                'unit': unit,
-                'zone': zone,
-                'register_msg_type': f'unknown_{msg_type:02x}'
-            }
-
-        # Map register ID to name
-        if register_id == 0x01:
-            register_name = 'source'
-        elif register_id == 0x02:
-            register_name = 'volume'
+            return UnknownSerialBinaryJoin(unit, zone, msg_type)
+
+        if register_id == Register.VOLUME:
             # Convert from 0-0xffff to 0-100
-            register_value = int((register_value / 0xffff) * 100)
-        else:
-            register_name = f'unknown_{register_id:02x}'
-
-        return {
-            'type': 'join',
-            'join_type': 'serial_binary',
-            'unit': unit,
-            'zone': zone,
-            'register': register_name,
-            'value': register_value
-        }
+            register_value = RAW_TO_VOLUME[register_value]
+
+        return SerialBinaryJoin(unit, zone, register_id, register_value)
 
-    async def encode_query_state(self, unit: int) -> bytes:
+    def encode_query_state_sync(self, unit: int) -> bytes:
         """Request full state from device"""
         raise NotImplementedError("SWAMP protocol documentation needed")
 
-    async def encode_whois(self) -> bytes:
+    def encode_whois_sync(self) -> bytes:
         """Encode WHOIS request"""
-        return bytes([0x0f, 0x00, 0x01, 0x02])
+        return WHOIS
 
-    async def encode_pong(self) -> bytes:
+    def encode_ping_sync(self) -> bytes:
+        """Encode keepalive PING
+
+        Format: 0d 00 02 00 00
+        Type: 0x0d, Length: 2, Payload: 00 00
+        """
+        return PING
+
+    def encode_pong_sync(self) -> bytes:
         """Encode PONG response
 
         Format: 0e 00 02 00 00
         Type: 0x0e, Length: 2, Payload: 00 00
         """
-        return bytes([0x0e, 0x00, 0x02, 0x00, 0x00])
+        return PONG
 
-    async def encode_conn_accepted(self) -> bytes:
+    def encode_conn_accepted_sync(self) -> bytes:
         """Encode CONN_ACCEPTED response
 
         Sent in response to CLIENT_SIGNON.
         Format: 02 00 04 00 00 00 03
         Type: 0x02, Length: 4, Payload: 00 00 00 03
         """
-        return bytes([0x02, 0x00, 0x04, 0x00, 0x00, 0x00, 0x03])
+        return CONN_ACCEPTED
 
     async def encode_join_update(self, payload_byte: int = 0x00) -> bytes:
+        """Encode JOIN UPDATE message"""
+        return self.encode_join_update_sync(payload_byte)
+
+    def encode_join_update_sync(self, payload_byte: int = 0x00) -> bytes:
         """Encode JOIN UPDATE message
 
         Sent 100ms after CONN_ACCEPTED.
@@ -273,13 +398,9 @@ class SwampProtocol(ProtocolHandler):
           - Join type: 03 (UPDATE)
           - Join data: 00 (configurable)
         """
-        return bytes([
-            0x05,        # Message type: JOIN
-            0x00, 0x05,  # Remaining length: 5 bytes
-            0x00, 0x00, 0x02,  # Inner length: 2 bytes
-            0x03,        # Join type: UPDATE
-            payload_byte # Join data
-        ])
+        if not 0 <= payload_byte <= 0xFF:
+            raise ValueError(f"JOIN UPDATE payload must be a byte: {payload_byte}")
+        return _JOIN_UPDATE[payload_byte]
 
     def encode_join_digital_magic(self) -> tuple[bytes, bytes]:
         """Encode magic DIGITAL JOIN messages
@@ -293,20 +414,4 @@ class SwampProtocol(ProtocolHandler):
 
         Purpose: Unknown initialization for SERIAL_BINARY communication
         """
-        message1 = bytes([
-            0x05,              # Message type: JOIN
-            0x00, 0x06,        # Remaining length: 6 bytes
-            0x00, 0x00, 0x03,  # Inner length: 3 bytes
-            0x00,              # Join type: DIGITAL
-            0x70, 0x49         # Magic payload
-        ])
-
-        message2 = bytes([
-            0x05,              # Message type: JOIN
-            0x00, 0x06,        # Remaining length: 6 bytes
-            0x00, 0x00, 0x03,  # Inner length: 3 bytes
-            0x00,              # Join type: DIGITAL
-            0x70, 0xc9         # Magic payload
-        ])
-
-        return (message1, message2)
+        return JOIN_DIGITAL_MAGIC
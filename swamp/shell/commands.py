@@ -80,7 +80,12 @@ class CommandHandlers:
             # Connection status
             if status['connected']:
                 output.append("Connection: Connected")
-                if status['client_address']:
+                connections = status.get('connections', [])
+                if len(connections) > 1:
+                    for connection in connections:
+                        units = ', '.join(str(unit) for unit in connection['units']) or 'none yet'
+                        output.append(f"  Client: {connection['address']} (units: {units})")
+                elif status['client_address']:
                     output.append(f"  Client: {status['client_address']}")
                 if status['last_message_seconds'] is not None:
                     output.append(f"  Last message: {status['last_message_seconds']:.1f}s ago")
@@ -0,0 +1,141 @@
+"""Test batch decoding of coalesced frames"""
+
+import asyncio
+import pytest
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+from swamp.protocol.framer import FrameReassembler
+from swamp.protocol.messages import Ping, SerialBinaryJoin, UnknownFrame
+from swamp.protocol.swamp_protocol import SwampProtocol
+from swamp.network.tcp_server import SwampTcpServer
+from tests.test_helpers import PING, get_free_port, serial_binary
+
+
+def state_dump(config_zones) -> bytes:
+    """Source and volume echoes for every zone, as sent after JOIN UPDATE"""
+    return b''.join(
+        serial_binary(unit, zone, 0x01, zone) + serial_binary(unit, zone, 0x02, 0x7fff)
+        for unit, zone in config_zones
+    )
+
+
+def test_decode_batch_returns_all_frames_and_leftover():
+    """Test that every complete frame is decoded and the partial tail counted"""
+    protocol = SwampProtocol()
+    trailing = serial_binary(4, 1, 0x01, 5)
+
+    messages, leftover = protocol.decode_batch(PING + serial_binary(3, 1, 0x01, 4) + trailing[:9])
+
+    assert messages == [Ping(), SerialBinaryJoin(3, 1, 0x01, 4)]
+    assert leftover == 9
+
+
+def test_decode_batch_empty_and_partial():
+    """Test buffers without a complete frame"""
+    protocol = SwampProtocol()
+
+    assert protocol.decode_batch(b'') == ([], 0)
+    assert protocol.decode_batch(PING[:2]) == ([], 2)
+
+
+def test_decode_batch_keeps_unknown_frames_in_order():
+    """Test that unrecognised and undecodable frames are returned as UnknownFrame"""
+    protocol = SwampProtocol()
+    unknown = bytes([0x1b, 0x00, 0x01, 0xff])
+    broken = bytes([0x1c, 0x00, 0x00])
+    error = RuntimeError('bad frame')
+
+    def fail(frame, payload):
+        raise error
+    protocol.register_decoder(0x1c, fail)
+
+    messages, leftover = protocol.decode_batch(unknown + PING + broken)
+
+    assert messages == [UnknownFrame(unknown), Ping(), UnknownFrame(broken, error)]
+    assert messages[0].as_dict() == {'type': 'unknown_1b', 'data': '1b0001ff'}
+    assert leftover == 0
+
+
+def test_framer_decode_batch_keeps_partial_frame():
+    """Test that the reassembler drops consumed frames and keeps the tail"""
+    protocol = SwampProtocol()
+    framer = FrameReassembler()
+    trailing = serial_binary(4, 1, 0x01, 5)
+
+    framer.write(PING + trailing[:7])
+    assert framer.decode_batch(protocol.decode_batch) == [Ping()]
+    assert framer.pending == 7
+
+    framer.write(trailing[7:])
+    assert framer.decode_batch(protocol.decode_batch) == [SerialBinaryJoin(4, 1, 0x01, 5)]
+    assert framer.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_apply_batch():
+    """Test that a batch of register messages updates every zone"""
+    config = ConfigManager.load(Path('config/config.yaml'))
+    state_manager = StateManager(config)
+
+    await state_manager.apply_batch([
+        SerialBinaryJoin(3, 1, 0x01, 4),
+        SerialBinaryJoin(3, 1, 0x02, 50),
+        SerialBinaryJoin(9, 9, 0x01, 1),  # Unconfigured zone is ignored
+    ])
+
+    assert state_manager.state.zones[(3, 1)].source_id == 4
+    assert state_manager.state.zones[(3, 1)].source_received
+    assert state_manager.state.zones[(3, 1)].volume == 50
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('receive_mode', ['stream', 'buffered'])
+async def test_state_dump_applied_as_one_batch(receive_mode):
+    """Test that a coalesced state dump reaches the state in a single batch"""
+    test_port = get_free_port()
+
+    config = ConfigManager.load(Path('config/config.yaml'))
+    protocol = SwampProtocol()
+    state_manager = StateManager(config)
+    tcp_server = SwampTcpServer(test_port, protocol, state_manager, receive_mode=receive_mode)
+
+    batch_sizes = []
+    apply_batch = state_manager.apply_batch
+
+    async def record_batch(messages):
+        batch_sizes.append(len(messages))
+        await apply_batch(messages)
+    state_manager.apply_batch = record_batch
+
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.3)
+
+    try:
+        reader, writer = await asyncio.open_connection('localhost', test_port)
+        await asyncio.wait_for(reader.read(4), timeout=1.0)  # WHOIS
+
+        zones = sorted(state_manager.state.zones)
+        writer.write(state_dump(zones) + PING)
+        await writer.drain()
+
+        pong = await asyncio.wait_for(reader.read(5), timeout=1.0)
+        await asyncio.sleep(0.1)
+
+        assert pong == bytes([0x0e, 0x00, 0x02, 0x00, 0x00])
+        assert batch_sizes == [2 * len(zones)]
+        for unit, zone in zones:
+            assert state_manager.state.zones[(unit, zone)].source_id == zone
+            assert state_manager.state.zones[(unit, zone)].volume == 50
+
+        writer.close()
+        await writer.wait_closed()
+
+    finally:
+        server_task.cancel()
+        try:
+            await server_task
+        except asyncio.CancelledError:
+            pass
+        await tcp_server.close()
@@ -0,0 +1,162 @@
+"""Test the BufferedProtocol receive path"""
+
+import asyncio
+import pytest
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+from swamp.core.controller import SwampController
+from swamp.protocol.swamp_protocol import SwampProtocol
+from swamp.network.buffered import SwampBufferedProtocol
+from swamp.network.tcp_server import SwampTcpServer
+from tests.test_helpers import CLIENT_SIGNON, RecordingWriter, get_free_port, serial_binary
+
+
+def test_unknown_receive_mode_rejected():
+    """Test that an unknown receive mode is rejected at construction"""
+    config = ConfigManager.load(Path('config/config.yaml'))
+    with pytest.raises(ValueError):
+        SwampTcpServer(get_free_port(), SwampProtocol(), StateManager(config), receive_mode='bogus')
+
+
+@pytest.mark.asyncio
+async def test_buffered_handshake_and_state_updates():
+    """Test handshake, PING/PONG and coalesced register echoes in buffered mode"""
+    test_port = get_free_port()
+
+    config = ConfigManager.load(Path('config/config.yaml'))
+    protocol = SwampProtocol()
+    state_manager = StateManager(config)
+    tcp_server = SwampTcpServer(test_port, protocol, state_manager, receive_mode='buffered')
+
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.3)
+
+    try:
+        reader, writer = await asyncio.open_connection('localhost', test_port)
+
+        whois = await asyncio.wait_for(reader.read(4), timeout=1.0)
+        assert whois == bytes([0x0f, 0x00, 0x01, 0x02])
+        assert state_manager.state.socket_connected
+
+        writer.write(CLIENT_SIGNON)
+        await writer.drain()
+        conn_accepted = await asyncio.wait_for(reader.read(7), timeout=1.0)
+        assert conn_accepted == bytes([0x02, 0x00, 0x04, 0x00, 0x00, 0x00, 0x03])
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
+        join_update = await asyncio.wait_for(reader.read(8), timeout=1.0)
+        assert join_update == bytes([0x05, 0x00, 0x05, 0x00, 0x00, 0x02, 0x03, 0x00])
+        assert state_manager.state.connected
+
+        writer.write(bytes([0x0d, 0x00, 0x02, 0x00, 0x00]))
+        await writer.drain()
+        pong = await asyncio.wait_for(reader.read(5), timeout=1.0)
+        assert pong == bytes([0x0e, 0x00, 0x02, 0x00, 0x00])
+
+        # Volume echoes for every loggia zone in one segment, the last one split
+        burst = b''.join(serial_binary(5, zone, 0x02, 0xffff) for zone in range(1, 6))
+        writer.write(burst[:-3])
+        await writer.drain()
+        await asyncio.sleep(0.05)
+        writer.write(burst[-3:])
+        await writer.drain()
+        await asyncio.sleep(0.2)
+
+        for zone in range(1, 6):
+            assert state_manager.state.zones[(5, zone)].volume == 100
+
+        writer.close()
+        await writer.wait_closed()
+        await asyncio.sleep(0.2)
+        assert not state_manager.state.socket_connected
+        assert tcp_server.client_writer is None
+
+    finally:
+        server_task.cancel()
+        try:
+            await server_task
+        except asyncio.CancelledError:
+            pass
+        await tcp_server.close()
+
+
+@pytest.mark.asyncio
+async def test_buffered_commands_reach_device():
+    """Test that controller commands are written on the buffered transport"""
+    test_port = get_free_port()
+
+    config = ConfigManager.load(Path('config/config.yaml'))
+    protocol = SwampProtocol()
+    state_manager = StateManager(config)
+    tcp_server = SwampTcpServer(test_port, protocol, state_manager, receive_mode='buffered')
+    controller = SwampController(config, tcp_server, state_manager)
+
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.3)
+
+    try:
+        reader, writer = await asyncio.open_connection('localhost', test_port)
+        await asyncio.wait_for(reader.read(4), timeout=1.0)  # WHOIS
+        writer.write(CLIENT_SIGNON)
+        await writer.drain()
+        await asyncio.wait_for(reader.read(7), timeout=1.0)  # CONN_ACCEPTED
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
+        await asyncio.wait_for(reader.read(8), timeout=1.0)  # JOIN UPDATE
+
+        await controller.set_volume('office', 50)
+
+        msg = await asyncio.wait_for(reader.read(17), timeout=1.0)
+        assert msg == serial_binary(4, 1, 0x02, 0x7fff)
+
+        writer.close()
+        await writer.wait_closed()
+
+    finally:
+        server_task.cancel()
+        try:
+            await server_task
+        except asyncio.CancelledError:
+            pass
+        await tcp_server.close()
+
+
+class FlowControlTransport:
+    """Transport stand-in recording pause_reading()/resume_reading() calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def pause_reading(self):
+        self.calls.append('pause')
+
+    def resume_reading(self):
+        self.calls.append('resume')
+
+    def is_closing(self):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_buffered_reading_paused_while_handler_lags():
+    """Test that reading pauses at the queue high-water mark and resumes at the low one"""
+    config = ConfigManager.load(Path('config/config.yaml'))
+    tcp_server = SwampTcpServer(get_free_port(), SwampProtocol(), StateManager(config), receive_mode='buffered')
+    protocol = SwampBufferedProtocol(tcp_server, queue_high=3, queue_low=1)
+    protocol.transport = FlowControlTransport()
+    protocol.connection = tcp_server._add_connection(RecordingWriter(), ('127.0.0.1', 0))
+
+    for volume in range(4):
+        frame = serial_binary(1, 1, 0x02, volume)
+        protocol.get_buffer(len(frame))[:len(frame)] = frame
+        protocol.buffer_updated(len(frame))
+    assert protocol.transport.calls == ['pause']
+
+    await protocol.receive()
+    await protocol.receive()
+    assert protocol.transport.calls == ['pause']
+    await protocol.receive()
+    assert protocol.transport.calls == ['pause', 'resume']
+    await tcp_server.close_clients()
@@ -43,6 +43,8 @@ async def test_client_signon_conn_accepted():
         # Type: 0x02, Length: 4, Payload: 00 00 00 03
         conn_accepted = await asyncio.wait_for(reader.read(7), timeout=1.0)
         assert conn_accepted == bytes([0x02, 0x00, 0x04, 0x00, 0x00, 0x00, 0x03])
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
 
         # Should also receive JOIN UPDATE (100ms after CONN_ACCEPTED)
         # 05 00 05 00 00 02 03 00
@@ -3,10 +3,10 @@
 import asyncio
 import pytest
 from pathlib import Path
-from datetime import datetime
 
 from swamp.core.config_manager import ConfigManager
 from swamp.core.state_manager import StateManager
+from swamp.models.config import Keepalive
 from swamp.protocol.swamp_protocol import SwampProtocol
 from swamp.network.tcp_server import SwampTcpServer
 from tests.test_helpers import get_free_port
@@ -48,6 +48,8 @@ async def test_connection_status_tracking():
 
         # Read CONN_ACCEPTED
         conn_accepted = await asyncio.wait_for(reader.read(7), timeout=1.0)
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
 
         # Read JOIN UPDATE (sent 100ms after CONN_ACCEPTED)
         join_update = await asyncio.wait_for(reader.read(8), timeout=1.0)
@@ -55,7 +57,7 @@ async def test_connection_status_tracking():
         # Now fully connected
         assert state_manager.state.socket_connected
         assert state_manager.state.conn_accepted_sent
-        assert state_manager.state.last_message_received is not None
+        assert state_manager.state.last_message_at is not None
         assert state_manager.state.connected  # Fully connected!
 
         writer.close()
@@ -101,6 +103,8 @@ async def test_periodic_ping():
 
         # Read CONN_ACCEPTED
         conn_accepted = await asyncio.wait_for(reader.read(7), timeout=1.0)
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
 
         # Read JOIN UPDATE (sent 100ms after CONN_ACCEPTED)
         join_update = await asyncio.wait_for(reader.read(8), timeout=1.0)
@@ -127,13 +131,16 @@ async def test_periodic_ping():
 
 @pytest.mark.asyncio
 async def test_connection_timeout():
-    """Test that connection is considered disconnected if no message for 30s"""
+    """Test that connection is considered disconnected if no message within the timeout"""
     test_port = get_free_port()
 
     config = ConfigManager.load(Path('config/config.yaml'))
     protocol = SwampProtocol()
     state_manager = StateManager(config)
-    tcp_server = SwampTcpServer(test_port, protocol, state_manager)
+    tcp_server = SwampTcpServer(test_port, protocol, state_manager,
+                                keepalive=Keepalive(ping_interval=10, timeout=0.5))
+    transitions = []
+    tcp_server.subscribe_connected(transitions.append)
 
     server_task = asyncio.create_task(tcp_server.start())
     await asyncio.sleep(0.3)
@@ -149,6 +156,8 @@ async def test_connection_timeout():
         await writer.drain()
 
         conn_accepted = await asyncio.wait_for(reader.read(7), timeout=1.0)
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
 
         # Read JOIN UPDATE (sent 100ms after CONN_ACCEPTED)
         join_update = await asyncio.wait_for(reader.read(8), timeout=1.0)
@@ -156,13 +165,24 @@ async def test_connection_timeout():
         # Should be connected now
         assert state_manager.state.connected
 
-        # Manually set last message to 31 seconds ago
-        from datetime import timedelta
-        state_manager.state.last_message_received = datetime.now() - timedelta(seconds=31)
+        # Still connected while messages keep arriving
+        await asyncio.sleep(0.3)
+        writer.write(bytes([0x0d, 0x00, 0x02, 0x00, 0x00]))  # PING
+        await writer.drain()
+        await asyncio.sleep(0.3)
+        assert state_manager.state.connected
 
-        # Check connection status - should be disconnected now
+        # Silence beyond the timeout - should be disconnected now
+        await asyncio.sleep(0.4)
         assert not state_manager.state.connected
 
+        # Any message brings it back
+        writer.write(bytes([0x0d, 0x00, 0x02, 0x00, 0x00]))  # PING
+        await writer.drain()
+        await asyncio.sleep(0.1)
+        assert state_manager.state.connected
+        assert transitions == [True, False, True]
+
         writer.close()
         await writer.wait_closed()
 
@@ -0,0 +1,165 @@
+"""Test the JSON-RPC control API on a Unix socket"""
+
+import asyncio
+import json
+import pytest
+from pathlib import Path
+
+from swamp.api.control import INVALID_PARAMS, INVALID_REQUEST, METHOD_NOT_FOUND, PARSE_ERROR, SERVER_ERROR, ControlApiServer
+from swamp.core.config_manager import ConfigManager
+from swamp.core.controller import SwampController
+from swamp.core.state_manager import StateManager
+from swamp.protocol.swamp_protocol import SwampProtocol
+from swamp.network.tcp_server import SwampTcpServer
+from tests.mock_swamp import CLIENT_SIGNON, read_message
+from tests.test_helpers import get_free_port
+
+
+@pytest.fixture
+async def api(tmp_path):
+    """Server with a signed-on device and the control API; yields (api, device reader, socket path)"""
+    config = ConfigManager.load(Path('config/config.yaml'))
+    state_manager = StateManager(config)
+    tcp_server = SwampTcpServer(get_free_port(), SwampProtocol(), state_manager)
+    controller = SwampController(config, tcp_server, state_manager)
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.1)
+
+    reader, writer = await asyncio.open_connection('localhost', tcp_server.port)
+    writer.write(CLIENT_SIGNON)
+    await writer.drain()
+    while not tcp_server.magic_packets_sent:
+        await asyncio.sleep(0.01)
+
+    control_api = ControlApiServer(tmp_path / 'swamp.sock', controller)
+    await control_api.start()
+    try:
+        yield control_api, reader, tmp_path / 'swamp.sock'
+    finally:
+        await control_api.close()
+        writer.close()
+        server_task.cancel()
+        await asyncio.gather(server_task, return_exceptions=True)
+        await tcp_server.close()
+
+
+async def call(writer, reader, request):
+    writer.write(json.dumps(request).encode() + b'\n')
+    await writer.drain()
+    return json.loads(await asyncio.wait_for(reader.readline(), timeout=1.0))
+
+
+async def test_route(api):
+    """Test that a request runs the command and answers with its id"""
+    control_api, device, path = api
+    reader, writer = await asyncio.open_unix_connection(str(path))
+
+    response = await call(writer, reader, {'jsonrpc': '2.0', 'id': 1, 'method': 'route',
+                                           'params': {'source': 'music-a', 'target': 'office-terrace'}})
+    assert response == {'jsonrpc': '2.0', 'id': 1, 'result': None}
+
+    frame = control_api.controller.tcp.protocol.encode_route_command_sync(3, 1, 4)
+    while await asyncio.wait_for(read_message(device), timeout=1.0) != frame:
+        pass
+
+    response = await call(writer, reader, {'jsonrpc': '2.0', 'id': 2, 'method': 'volume',
+                                           'params': ['office-terrace', 40]})
+    assert response['result'] == 40
+    writer.close()
+
+
+async def test_pipelined_requests(api):
+    """Test that requests sent without waiting are all answered and applied in order"""
+    control_api, device, path = api
+    reader, writer = await asyncio.open_unix_connection(str(path))
+
+    writer.write(b''.join(
+        json.dumps({'jsonrpc': '2.0', 'id': level, 'method': 'volume',
+                    'params': {'target': 'office-terrace', 'level': level}}).encode() + b'\n'
+        for level in range(100)
+    ))
+    await writer.drain()
+    responses = [json.loads(await asyncio.wait_for(reader.readline(), timeout=1.0)) for _ in range(100)]
+
+    assert sorted(response['id'] for response in responses) == list(range(100))
+    assert all(response['result'] == response['id'] for response in responses)
+    zones = control_api.controller.state.get_zones_for_target('office-terrace')
+    assert zones[0].volume == 99
+    writer.close()
+
+
+async def test_batch(api):
+    """Test that a batch gets one array response, without notifications"""
+    control_api, device, path = api
+    reader, writer = await asyncio.open_unix_connection(str(path))
+
+    batch = [
+        {'jsonrpc': '2.0', 'id': 'a', 'method': 'volume', 'params': {'target': 'office-terrace', 'level': 20}},
+        {'jsonrpc': '2.0', 'id': 'b', 'method': 'volume', 'params': {'target': 'outdoor-shower', 'level': 30}},
+        {'jsonrpc': '2.0', 'method': 'route', 'params': ['music-b', 'library']},
+        {'jsonrpc': '2.0', 'id': 'c', 'method': 'route', 'params': ['no-such-source', 'library']},
+    ]
+    responses = await call(writer, reader, batch)
+
+    assert [response['id'] for response in responses] == ['a', 'b', 'c']
+    assert responses[0]['result'] == 20
+    assert responses[1]['result'] == 30
+    assert responses[2]['error']['code'] == SERVER_ERROR
+    writer.close()
+
+
+async def test_errors(api):
+    """Test JSON-RPC error responses"""
+    control_api, device, path = api
+    reader, writer = await asyncio.open_unix_connection(str(path))
+
+    writer.write(b'{not json\n')
+    await writer.drain()
+    response = json.loads(await asyncio.wait_for(reader.readline(), timeout=1.0))
+    assert response['error']['code'] == PARSE_ERROR
+
+    response = await call(writer, reader, {'id': 1, 'method': 'route'})
+    assert response['error']['code'] == INVALID_REQUEST
+
+    response = await call(writer, reader, {'jsonrpc': '2.0', 'id': 2, 'method': 'reboot'})
+    assert response['error']['code'] == METHOD_NOT_FOUND
+
+    response = await call(writer, reader, {'jsonrpc': '2.0', 'id': 3, 'method': 'route', 'params': ['music-a']})
+    assert response['error']['code'] == INVALID_PARAMS
+
+    response = await call(writer, reader, {'jsonrpc': '2.0', 'id': 4, 'method': 'volume',
+                                           'params': {'target': 'office-terrace', 'level': 101}})
+    assert response['error']['code'] == INVALID_PARAMS
+
+    response = await call(writer, reader, {'jsonrpc': '2.0', 'id': 5, 'method': 'status',
+                                           'params': {'target': 'nowhere'}})
+    assert response['error'] == {'code': SERVER_ERROR, 'message': 'Unknown target: nowhere'}
+    writer.close()
+
+
+async def test_concurrent_clients(api):
+    """Test that several clients are served at once"""
+    control_api, device, path = api
+    clients = [await asyncio.open_unix_connection(str(path)) for _ in range(5)]
+
+    responses = await asyncio.gather(*(
+        call(writer, reader, {'jsonrpc': '2.0', 'id': index, 'method': 'status'})
+        for index, (reader, writer) in enumerate(clients)
+    ))
+
+    assert [response['id'] for response in responses] == list(range(5))
+    assert all(response['result']['connected'] for response in responses)
+    for _, writer in clients:
+        writer.close()
+
+
+async def test_close_removes_socket(api):
+    """Test that closing the API disconnects clients and removes the socket file"""
+    control_api, device, path = api
+    reader, writer = await asyncio.open_unix_connection(str(path))
+
+    await asyncio.wait_for(control_api.close(), timeout=1.0)
+
+    assert not path.exists()
+    assert await asyncio.wait_for(reader.read(), timeout=1.0) == b''
+    writer.close()
@@ -0,0 +1,60 @@
+"""Test headless daemon mode"""
+
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import pytest
+
+from swamp.daemon import wait_for_shutdown
+from tests.test_helpers import get_free_port
+
+
+@pytest.mark.asyncio
+async def test_shutdown_on_sigterm():
+    """Test that SIGTERM ends the daemon wait and its handlers are removed"""
+    server_task = asyncio.create_task(asyncio.sleep(60))
+    loop = asyncio.get_running_loop()
+    loop.call_later(0.05, os.kill, os.getpid(), signal.SIGTERM)
+    try:
+        await asyncio.wait_for(wait_for_shutdown(server_task), timeout=1.0)
+        assert not server_task.done()
+        assert not loop.remove_signal_handler(signal.SIGTERM)
+    finally:
+        server_task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_when_server_stops():
+    """Test that the daemon wait ends if the TCP server task fails"""
+    async def failing_server():
+        raise OSError('address in use')
+
+    server_task = asyncio.create_task(failing_server())
+    await asyncio.wait_for(wait_for_shutdown(server_task), timeout=1.0)
+    assert isinstance(server_task.exception(), OSError)
+
+
+def test_entry_point_skips_prompt_toolkit():
+    """Test that loading the entry point doesn't import prompt_toolkit"""
+    code = 'import sys, swamp.__main__; print("prompt_toolkit" in sys.modules)'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
+
+
+def test_daemon_exits_nonzero_when_port_in_use():
+    """Test that a failed bind ends the daemon with a non-zero exit code"""
+    port = get_free_port()
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as taken:
+        taken.bind(('0.0.0.0', port))
+        taken.listen(1)
+        result = subprocess.run(
+            [sys.executable, '-m', 'swamp', '--daemon', '--port', str(port)],
+            capture_output=True, text=True, timeout=10,
+        )
+
+    assert result.returncode == 1
+    assert 'Running headless' not in result.stderr
+    assert f'TCP server on port {port} failed' in result.stderr
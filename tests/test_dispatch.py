@@ -0,0 +1,124 @@
+"""Test the table-driven decoder and handler registries"""
+
+import asyncio
+import pytest
+from dataclasses import dataclass
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+from swamp.protocol.messages import JoinType, MessageType, SerialBinaryJoin, UnknownJoin
+from swamp.protocol.swamp_protocol import SwampProtocol
+from swamp.network.tcp_server import SwampTcpServer
+from tests.test_helpers import get_free_port
+
+
+# A message type the protocol doesn't know about
+VENDOR_TYPE = 0x1b
+VENDOR_FRAME = bytes([VENDOR_TYPE, 0x00, 0x02, 0xab, 0xcd])
+JOIN_ANALOG = bytes([0x05, 0x00, 0x06, 0x00, 0x00, 0x03, 0x14, 0x12, 0x34])
+
+
+@dataclass(slots=True)
+class VendorMessage:
+    payload: bytes
+
+    def as_dict(self) -> dict:
+        return {'type': 'vendor', 'payload': self.payload.hex()}
+
+
+def test_unregistered_type_is_unknown():
+    """Test that a type byte without a decoder decodes to None"""
+    protocol = SwampProtocol()
+
+    assert protocol.decode_frame(VENDOR_FRAME) is None
+
+
+def test_register_decoder():
+    """Test that a decoder registered at runtime is used for its type byte"""
+    protocol = SwampProtocol()
+    protocol.register_decoder(VENDOR_TYPE, lambda frame, payload: VendorMessage(bytes(payload)))
+
+    assert protocol.decode_frame(VENDOR_FRAME) == VendorMessage(b'\xab\xcd')
+    assert protocol.decode_message_sync(VENDOR_FRAME) == {'type': 'vendor', 'payload': 'abcd'}
+
+
+def test_register_join_decoder():
+    """Test that a join decoder registered at runtime replaces UnknownJoin"""
+    protocol = SwampProtocol()
+    assert protocol.decode_frame(JOIN_ANALOG) == UnknownJoin(0x14, b'\x12\x34')
+
+    protocol.register_join_decoder(0x14, lambda join_data: VendorMessage(bytes(join_data)))
+
+    assert protocol.decode_frame(JOIN_ANALOG) == VendorMessage(b'\x12\x34')
+
+
+def test_registries_are_per_instance():
+    """Test that registering on one protocol leaves others untouched"""
+    extended = SwampProtocol()
+    extended.register_decoder(VENDOR_TYPE, lambda frame, payload: VendorMessage(bytes(payload)))
+    extended.register_join_decoder(JoinType.SERIAL_BINARY, lambda join_data: None)
+
+    protocol = SwampProtocol()
+    register_echo = protocol.encode_route_command_sync(3, 4, 6)
+
+    assert protocol.decode_frame(VENDOR_FRAME) is None
+    assert protocol.decode_frame(register_echo) == SerialBinaryJoin(3, 4, 0x01, 6)
+    assert extended.decode_frame(register_echo) is None
+
+
+def test_replace_builtin_decoder():
+    """Test that a built-in decoder can be replaced"""
+    protocol = SwampProtocol()
+    protocol.register_decoder(MessageType.PING, lambda frame, payload: VendorMessage(bytes(payload)))
+
+    assert protocol.decode_frame(bytes([0x0d, 0x00, 0x02, 0x00, 0x00])) == VendorMessage(b'\x00\x00')
+
+
+@pytest.mark.asyncio
+async def test_registered_handler_receives_message():
+    """Test that a new message type reaches its handler through the read loop"""
+    test_port = get_free_port()
+
+    config = ConfigManager.load(Path('config/config.yaml'))
+    protocol = SwampProtocol()
+    protocol.register_decoder(VENDOR_TYPE, lambda frame, payload: VendorMessage(bytes(payload)))
+    state_manager = StateManager(config)
+    tcp_server = SwampTcpServer(test_port, protocol, state_manager)
+
+    received = []
+
+    async def handle_vendor(message, connection):
+        received.append(message)
+        await connection.outbound.submit([b'\x1b\x00\x00'])
+
+    tcp_server.register_handler(VendorMessage, handle_vendor)
+
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.3)
+
+    try:
+        reader, writer = await asyncio.open_connection('localhost', test_port)
+        await asyncio.wait_for(reader.read(4), timeout=1.0)  # WHOIS
+
+        writer.write(VENDOR_FRAME + protocol.encode_route_command_sync(3, 4, 6))
+        await writer.drain()
+
+        reply = await asyncio.wait_for(reader.read(3), timeout=1.0)
+        await asyncio.sleep(0.1)
+
+        assert reply == b'\x1b\x00\x00'
+        assert received == [VendorMessage(b'\xab\xcd')]
+        # Built-in handlers still apply alongside the new one
+        assert state_manager.state.zones[(3, 4)].source_id == 6
+
+        writer.close()
+        await writer.wait_closed()
+
+    finally:
+        server_task.cancel()
+        try:
+            await server_task
+        except asyncio.CancelledError:
+            pass
+        await tcp_server.close()
@@ -0,0 +1,68 @@
+"""Test event loop selection"""
+
+import asyncio
+import sys
+import pytest
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+from swamp.eventloop import loop_factory, run
+from swamp.protocol.swamp_protocol import SwampProtocol
+from swamp.network.tcp_server import SwampTcpServer
+from tests.mock_swamp import CLIENT_SIGNON, read_message
+from tests.test_helpers import get_free_port
+
+
+def test_default_loop():
+    """Test that the asyncio loop needs no factory"""
+    assert loop_factory('asyncio') is None
+
+
+def test_unknown_loop():
+    """Test that an unknown loop name is rejected"""
+    with pytest.raises(ValueError):
+        loop_factory('trio')
+
+
+def test_uvloop_missing_falls_back(monkeypatch):
+    """Test that a missing uvloop falls back to the asyncio loop"""
+    monkeypatch.setitem(sys.modules, 'uvloop', None)  # Makes `import uvloop` raise ImportError
+    assert loop_factory('uvloop') is None
+
+    async def loop_type():
+        return type(asyncio.get_running_loop())
+
+    assert issubclass(run(loop_type(), 'uvloop'), asyncio.BaseEventLoop)
+
+
+async def round_trip() -> tuple[type, bytes]:
+    """Sign on to a server and send it one command"""
+    test_port = get_free_port()
+    config = ConfigManager.load(Path('config/config.yaml'))
+    protocol = SwampProtocol()
+    tcp_server = SwampTcpServer(test_port, protocol, StateManager(config))
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.1)
+    try:
+        reader, writer = await asyncio.open_connection('localhost', test_port)
+        writer.write(CLIENT_SIGNON)
+        await writer.drain()
+        frame = protocol.encode_volume_command_sync(1, 1, 50)
+        await tcp_server.send_command(frame)
+        while (received := await asyncio.wait_for(read_message(reader), timeout=1.0)) != frame:
+            pass
+        writer.close()
+        return type(asyncio.get_running_loop()), received
+    finally:
+        server_task.cancel()
+        await asyncio.gather(server_task, return_exceptions=True)
+        await tcp_server.close()
+
+
+def test_server_on_uvloop():
+    """Test the server on uvloop, if it is installed"""
+    uvloop = pytest.importorskip('uvloop')
+    loop_type, received = run(round_trip(), 'uvloop')
+    assert loop_type is uvloop.Loop
+    assert received[6] == 0x20  # SERIAL_BINARY
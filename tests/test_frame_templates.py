@@ -0,0 +1,92 @@
+"""Test precompiled frame templates and the encoded frame cache"""
+
+import pytest
+
+from swamp.protocol.swamp_protocol import SwampProtocol
+from tests.test_helpers import serial_binary
+
+
+def test_template_matches_reference_layout():
+    """Test that templated register frames are byte-identical to the documented layout"""
+    protocol = SwampProtocol()
+
+    for unit in (0, 3, 4, 5, 255):
+        for zone in (0, 1, 8, 255):
+            for source_id in (0, 1, 6, 0x1234, 0xffff):
+                assert protocol.encode_route_command_sync(unit, zone, source_id) == \
+                    serial_binary(unit, zone, 0x01, source_id)
+
+
+def test_register_value_clamped():
+    """Test that out-of-range register values are clamped to 2 bytes"""
+    protocol = SwampProtocol()
+
+    assert protocol.encode_route_command_sync(3, 1, -5) == serial_binary(3, 1, 0x01, 0)
+    assert protocol.encode_route_command_sync(3, 1, 0x12345) == serial_binary(3, 1, 0x01, 0xffff)
+
+
+def test_out_of_range_unit_rejected():
+    """Test that a unit or zone outside a byte raises ValueError"""
+    protocol = SwampProtocol()
+
+    with pytest.raises(ValueError):
+        protocol.encode_route_command_sync(256, 1, 1)
+    with pytest.raises(ValueError):
+        protocol.encode_volume_command_sync(3, -1, 50)
+
+
+def test_repeated_commands_hit_cache():
+    """Test that repeated register writes are served from the cache"""
+    protocol = SwampProtocol()
+
+    first = protocol.encode_volume_command_sync(5, 1, 40)
+    for _ in range(10):
+        assert protocol.encode_volume_command_sync(5, 1, 40) is first
+
+    info = protocol.encode_cache_info()
+    assert info.misses == 1
+    assert info.hits == 10
+
+
+def test_cache_is_bounded():
+    """Test that the frame cache never grows past its configured size"""
+    protocol = SwampProtocol(encode_cache_size=16)
+
+    for zone in range(1, 9):
+        for volume in range(0, 101):
+            protocol.encode_volume_command_sync(4, zone, volume)
+
+    info = protocol.encode_cache_info()
+    assert info.maxsize == 16
+    assert info.currsize == 16
+
+
+def test_fixed_frames_are_prebuilt():
+    """Test that fixed frames are returned without being rebuilt"""
+    protocol = SwampProtocol()
+
+    assert protocol.encode_ping_sync() == bytes([0x0d, 0x00, 0x02, 0x00, 0x00])
+    assert protocol.encode_ping_sync() is protocol.encode_ping_sync()
+    assert protocol.encode_pong_sync() is protocol.encode_pong_sync()
+    assert protocol.encode_whois_sync() is protocol.encode_whois_sync()
+    assert protocol.encode_conn_accepted_sync() is protocol.encode_conn_accepted_sync()
+    assert protocol.encode_join_digital_magic() is protocol.encode_join_digital_magic()
+
+
+def test_join_update_payload():
+    """Test JOIN UPDATE with a non-default payload and an invalid one"""
+    protocol = SwampProtocol()
+
+    assert protocol.encode_join_update_sync(0x7f) == bytes([0x05, 0x00, 0x05, 0x00, 0x00, 0x02, 0x03, 0x7f])
+    with pytest.raises(ValueError):
+        protocol.encode_join_update_sync(0x100)
+
+
+def test_coalesce_key():
+    """Test that register writes are keyed by (unit, zone, register)"""
+    protocol = SwampProtocol()
+
+    assert protocol.coalesce_key(protocol.encode_volume_command_sync(5, 3, 40)) == (5, 3, 0x02)
+    assert protocol.coalesce_key(protocol.encode_route_command_sync(5, 3, 2)) == (5, 3, 0x01)
+    assert protocol.coalesce_key(protocol.encode_pong_sync()) is None
+    assert protocol.coalesce_key(protocol.encode_join_digital_magic()[0]) is None
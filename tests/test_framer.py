@@ -0,0 +1,183 @@
+"""Test stream reassembly of CIP frames"""
+
+import asyncio
+import pytest
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+from swamp.protocol.framer import FrameReassembler
+from swamp.protocol.swamp_protocol import SwampProtocol
+from swamp.network.tcp_server import SwampTcpServer
+from tests.test_helpers import CLIENT_SIGNON, PING, get_free_port, serial_binary
+
+
+def test_single_frame():
+    """Test that one complete frame is yielded as-is"""
+    framer = FrameReassembler()
+
+    frames = [bytes(f) for f in framer.feed(PING)]
+
+    assert frames == [PING]
+    assert framer.pending == 0
+
+
+def test_coalesced_frames():
+    """Test that several frames in one chunk are all yielded in order"""
+    framer = FrameReassembler()
+    chunk = PING + serial_binary(3, 1, 0x01, 4) + CLIENT_SIGNON + serial_binary(3, 3, 0x02, 0x7fff)
+
+    frames = [bytes(f) for f in framer.feed(chunk)]
+
+    assert frames == [PING, serial_binary(3, 1, 0x01, 4), CLIENT_SIGNON, serial_binary(3, 3, 0x02, 0x7fff)]
+    assert framer.pending == 0
+
+
+def test_split_frame():
+    """Test that a frame split across reads is yielded once complete"""
+    framer = FrameReassembler()
+    message = serial_binary(4, 2, 0x01, 6)
+
+    assert [bytes(f) for f in framer.feed(message[:2])] == []
+    assert framer.pending == 2
+    assert [bytes(f) for f in framer.feed(message[2:9])] == []
+    assert framer.pending == 9
+    assert [bytes(f) for f in framer.feed(message[9:])] == [message]
+    assert framer.pending == 0
+
+
+def test_byte_at_a_time():
+    """Test reassembly when every byte arrives in its own read"""
+    framer = FrameReassembler()
+    stream = PING + serial_binary(5, 1, 0x02, 0xffff) + PING
+
+    frames = []
+    for i in range(len(stream)):
+        frames.extend(bytes(f) for f in framer.feed(stream[i:i + 1]))
+
+    assert frames == [PING, serial_binary(5, 1, 0x02, 0xffff), PING]
+
+
+def test_trailing_partial_frame_kept():
+    """Test that a partial frame after complete ones is buffered"""
+    framer = FrameReassembler()
+    second = serial_binary(3, 4, 0x01, 5)
+
+    frames = [bytes(f) for f in framer.feed(PING + second[:10])]
+    assert frames == [PING]
+    assert framer.pending == 10
+
+    frames = [bytes(f) for f in framer.feed(second[10:] + PING)]
+    assert frames == [second, PING]
+    assert framer.pending == 0
+
+
+def test_frames_are_views():
+    """Test that frames are memoryviews over the buffer, not copies"""
+    framer = FrameReassembler()
+
+    for frame in framer.feed(PING + PING):
+        assert isinstance(frame, memoryview)
+
+
+def test_reset_discards_partial_frame():
+    """Test that reset drops buffered bytes"""
+    framer = FrameReassembler()
+    list(framer.feed(CLIENT_SIGNON[:5]))
+
+    framer.reset()
+
+    assert framer.pending == 0
+    assert [bytes(f) for f in framer.feed(PING)] == [PING]
+
+
+@pytest.mark.asyncio
+async def test_decode_message_accepts_frame_view():
+    """Test that frames can be decoded straight from the reassembler"""
+    protocol = SwampProtocol()
+    framer = FrameReassembler()
+
+    results = []
+    for frame in framer.feed(PING + serial_binary(3, 4, 0x01, 6)):
+        results.append(await protocol.decode_message(frame))
+
+    assert results[0] == {'type': 'ping'}
+    assert results[1]['register'] == 'source'
+    assert results[1]['value'] == 6
+
+
+@pytest.mark.asyncio
+async def test_coalesced_register_echoes_update_state():
+    """Test that every register echo in one TCP segment reaches the state"""
+    test_port = get_free_port()
+
+    config = ConfigManager.load(Path('config/config.yaml'))
+    protocol = SwampProtocol()
+    state_manager = StateManager(config)
+    tcp_server = SwampTcpServer(test_port, protocol, state_manager)
+
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.3)
+
+    try:
+        reader, writer = await asyncio.open_connection('localhost', test_port)
+        await asyncio.wait_for(reader.read(4), timeout=1.0)  # WHOIS
+
+        # Source echoes for all loggia zones plus a split trailing frame
+        burst = b''.join(serial_binary(5, zone, 0x01, 6) for zone in range(1, 6))
+        trailing = serial_binary(4, 1, 0x01, 5)
+        writer.write(burst + trailing[:7])
+        await writer.drain()
+        await asyncio.sleep(0.1)
+        writer.write(trailing[7:])
+        await writer.drain()
+        await asyncio.sleep(0.2)
+
+        for zone in range(1, 6):
+            assert state_manager.state.zones[(5, zone)].source_id == 6
+        assert state_manager.state.zones[(4, 1)].source_id == 5
+
+        writer.close()
+        await writer.wait_closed()
+
+    finally:
+        server_task.cancel()
+        try:
+            await server_task
+        except asyncio.CancelledError:
+            pass
+        await tcp_server.close()
+
+
+def test_receive_into_buffer():
+    """Test the get_buffer/buffer_updated path used by BufferedProtocol"""
+    framer = FrameReassembler()
+    stream = PING + serial_binary(3, 1, 0x01, 4) + PING
+
+    frames = []
+    for i in range(0, len(stream), 4):
+        chunk = stream[i:i + 4]
+        buf = framer.get_buffer(len(chunk))
+        buf[:len(chunk)] = chunk
+        frames.extend(bytes(f) for f in framer.buffer_updated(len(chunk)))
+
+    assert frames == [PING, serial_binary(3, 1, 0x01, 4), PING]
+    assert framer.pending == 0
+
+
+def test_receive_buffer_compacts_partial_frame():
+    """Test that a partial frame is moved to the front when the tail runs low"""
+    framer = FrameReassembler(capacity=0)  # Smallest allowed: one maximum-size frame
+    frame = serial_binary(4, 2, 0x02, 0x1234)
+    filler = bytes([0x0f, 0xff, 0xf0]) + bytes(0xfff0)  # Fills most of the buffer
+
+    buf = framer.get_buffer(-1)
+    buf[:len(filler)] = filler
+    buf[len(filler):len(filler) + 5] = frame[:5]
+    assert [len(f) for f in framer.buffer_updated(len(filler) + 5)] == [len(filler)]
+    del buf
+
+    buf = framer.get_buffer(-1)
+    assert len(buf) >= len(frame)
+    buf[:len(frame) - 5] = frame[5:]
+    assert [bytes(f) for f in framer.buffer_updated(len(frame) - 5)] == [frame]
@@ -18,7 +18,7 @@ async def test_complete_handshake():
     1. Device connects
     2. Controller sends WHOIS
     3. Device sends CLIENT_SIGNON
-    4. Controller sends CONN_ACCEPTED
+    4. Controller sends CONN_ACCEPTED, then the magic DIGITAL JOIN packets
     5. Controller sends JOIN UPDATE (100ms later)
     6. Device sends PING
     7. Controller sends PONG
@@ -49,6 +49,8 @@ async def test_complete_handshake():
         # Step 4: Controller sends CONN_ACCEPTED
         conn_accepted = await asyncio.wait_for(reader.read(7), timeout=1.0)
         assert conn_accepted == bytes([0x02, 0x00, 0x04, 0x00, 0x00, 0x00, 0x03]), "Should receive CONN_ACCEPTED"
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
 
         # Step 5: Controller sends JOIN UPDATE (100ms after CONN_ACCEPTED)
         join_update = await asyncio.wait_for(reader.read(8), timeout=1.0)
@@ -73,3 +75,48 @@ async def test_complete_handshake():
         except asyncio.CancelledError:
             pass
         await tcp_server.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_continue_during_handshake():
+    """Test that frames after CLIENT_SIGNON are handled before JOIN UPDATE goes out"""
+    test_port = get_free_port()
+
+    config = ConfigManager.load(Path('config/config.yaml'))
+    protocol = SwampProtocol()
+    state_manager = StateManager(config)
+    tcp_server = SwampTcpServer(test_port, protocol, state_manager)
+
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.3)
+
+    try:
+        reader, writer = await asyncio.open_connection('localhost', test_port)
+        await asyncio.wait_for(reader.read(4), timeout=1.0)  # WHOIS
+
+        # CLIENT_SIGNON and a PING in one segment
+        client_signon = bytes([0x0a, 0x00, 0x0a, 0x00, 0x51, 0xa3, 0x42, 0x40, 0x02, 0x00, 0x00, 0x00, 0x00])
+        ping = bytes([0x0d, 0x00, 0x02, 0x00, 0x00])
+        writer.write(client_signon + ping)
+        await writer.drain()
+
+        await asyncio.wait_for(reader.read(7), timeout=1.0)  # CONN_ACCEPTED
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
+
+        # PONG is not held up by the 100ms JOIN UPDATE delay
+        pong = await asyncio.wait_for(reader.read(5), timeout=1.0)
+        assert pong == bytes([0x0e, 0x00, 0x02, 0x00, 0x00])
+        join_update = await asyncio.wait_for(reader.read(8), timeout=1.0)
+        assert join_update == bytes([0x05, 0x00, 0x05, 0x00, 0x00, 0x02, 0x03, 0x00])
+
+        writer.close()
+        await writer.wait_closed()
+
+    finally:
+        server_task.cancel()
+        try:
+            await server_task
+        except asyncio.CancelledError:
+            pass
+        await tcp_server.close()
@@ -2,6 +2,8 @@
 
 import socket
 
+from tests.mock_swamp import CLIENT_SIGNON, PING
+
 
 def get_free_port() -> int:
     """Get a free port for testing"""
@@ -14,3 +16,35 @@ def get_free_port() -> int:
 
 # Default test port - different from production default (41794)
 TEST_PORT = 41795
+
+
+class RecordingWriter:
+    """Writer stand-in that records every write and drain"""
+
+    def __init__(self):
+        self.calls = []
+
+    def write(self, data):
+        self.calls.append(('write', bytes(data)))
+
+    def writelines(self, frames):
+        self.calls.append(('writelines', [bytes(data) for data in frames]))
+
+    async def drain(self):
+        self.calls.append(('drain',))
+
+    @property
+    def batches(self) -> list[list[bytes]]:
+        """Frames of each writelines() call"""
+        return [call[1] for call in self.calls if call[0] == 'writelines']
+
+
+def serial_binary(unit: int, zone: int, register: int, value: int) -> bytes:
+    """Build a SERIAL_BINARY register echo as sent by the device"""
+    return bytes([
+        0x05, 0x00, 0x0e,
+        0x00, 0x00, 0x0b,
+        0x20,
+        unit, 0x08, 0x20, zone, 0x05, 0x14, 0x00, register,
+        (value >> 8) & 0xff, value & 0xff
+    ])
@@ -9,7 +9,8 @@ from swamp.core.state_manager import StateManager
 from swamp.protocol.swamp_protocol import SwampProtocol
 from swamp.network.tcp_server import SwampTcpServer
 from swamp.core.controller import SwampController
-from tests.test_helpers import get_free_port
+from swamp.network.connection import MAGIC_SETTLE_DELAY
+from tests.test_helpers import CLIENT_SIGNON, RecordingWriter, get_free_port
 
 
 @pytest.mark.asyncio
@@ -29,8 +30,8 @@ async def test_encode_magic_packets():
 
 
 @pytest.mark.asyncio
-async def test_magic_packets_sent_before_serial_binary():
-    """Test that magic packets are sent automatically before first SERIAL_BINARY command"""
+async def test_magic_packets_sent_after_conn_accepted():
+    """Test that magic packets follow CONN_ACCEPTED, ahead of the first SERIAL_BINARY command"""
     test_port = get_free_port()
 
     config = ConfigManager.load(Path('config/config.yaml'))
@@ -52,26 +53,27 @@ async def test_magic_packets_sent_before_serial_binary():
         writer.write(client_signon)
         await writer.drain()
         await asyncio.wait_for(reader.read(7), timeout=1.0)  # CONN_ACCEPTED
-        await asyncio.wait_for(reader.read(8), timeout=1.0)  # JOIN UPDATE
-
-        # Verify magic packets not sent yet
-        assert not tcp_server.magic_packets_sent
-
-        # Send first SERIAL_BINARY command (route)
-        source_id = config.sources[0].id
-        target_id = config.targets[0].id
-        await controller.route_source_to_target(source_id, target_id)
 
-        # Should receive magic packets first
+        # Magic packets are sent right after CONN_ACCEPTED, before JOIN UPDATE
         magic1 = await asyncio.wait_for(reader.read(9), timeout=1.0)
         assert magic1 == bytes([0x05, 0x00, 0x06, 0x00, 0x00, 0x03, 0x00, 0x70, 0x49])
 
         magic2 = await asyncio.wait_for(reader.read(9), timeout=1.0)
         assert magic2 == bytes([0x05, 0x00, 0x06, 0x00, 0x00, 0x03, 0x00, 0x70, 0xc9])
 
+        await asyncio.wait_for(reader.read(8), timeout=1.0)  # JOIN UPDATE
+
         # Verify magic packets marked as sent
         assert tcp_server.magic_packets_sent
 
+        # Send first SERIAL_BINARY command (route); it isn't held up by the magic packets
+        source_id = config.sources[0].id
+        target_id = config.targets[0].id
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await controller.route_source_to_target(source_id, target_id)
+        assert loop.time() - start < 0.05
+
         # Then receive the actual SERIAL_BINARY command(s)
         target = next(t for t in config.targets if t.id == target_id)
         num_zones = len(target.swamp_zones)
@@ -92,6 +94,35 @@ async def test_magic_packets_sent_before_serial_binary():
             pass
 
 
+@pytest.mark.asyncio
+async def test_serial_binary_right_after_accept_sends_magic_once():
+    """Test that a command submitted with CONN_ACCEPTED waits for the queued magic pair"""
+    config = ConfigManager.load(Path('config/config.yaml'))
+    protocol = SwampProtocol()
+    tcp_server = SwampTcpServer(get_free_port(), protocol, StateManager(config))
+    writer = RecordingWriter()
+    connection = tcp_server._add_connection(writer, ('127.0.0.1', 0))
+    magic = list(protocol.encode_join_digital_magic())
+    volume = protocol.encode_volume_command_sync(5, 1, 40)
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    connection.accept(CLIENT_SIGNON)
+    await tcp_server.send_commands([volume])
+    elapsed = loop.time() - start
+    await connection.close()
+
+    frames = []
+    for call in writer.calls:
+        if call[0] == 'write':
+            frames.append(call[1])
+        elif call[0] == 'writelines':
+            frames.extend(call[1])
+    assert frames.count(magic[0]) == 1 and frames.count(magic[1]) == 1
+    assert frames[:4] == [protocol.encode_conn_accepted_sync(), *magic, volume]
+    assert elapsed >= MAGIC_SETTLE_DELAY
+
+
 @pytest.mark.asyncio
 async def test_magic_packets_only_sent_once():
     """Test that magic packets are only sent once per connection"""
@@ -116,6 +147,8 @@ async def test_magic_packets_only_sent_once():
         writer.write(client_signon)
         await writer.drain()
         await asyncio.wait_for(reader.read(7), timeout=1.0)  # CONN_ACCEPTED
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
         await asyncio.wait_for(reader.read(8), timeout=1.0)  # JOIN UPDATE
 
         # Send first command
@@ -126,9 +159,7 @@ async def test_magic_packets_only_sent_once():
 
         await controller.route_source_to_target(source_id, target_id)
 
-        # Read magic packets and SERIAL_BINARY commands
-        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
-        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
+        # Read SERIAL_BINARY commands
         for _ in range(num_zones):
             await asyncio.wait_for(reader.read(17), timeout=1.0)  # SERIAL_BINARY
 
@@ -176,10 +207,11 @@ async def test_magic_packets_reset_on_reconnect():
         writer1.write(client_signon)
         await writer1.drain()
         await asyncio.wait_for(reader1.read(7), timeout=1.0)
+        await asyncio.wait_for(reader1.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader1.read(9), timeout=1.0)  # Magic 2
         await asyncio.wait_for(reader1.read(8), timeout=1.0)
 
-        # Send magic packets will be sent with first command
-        # (not sending command, just verifying flag state)
+        assert tcp_server.magic_packets_sent
 
         # Disconnect
         writer1.close()
@@ -199,6 +231,8 @@ async def test_magic_packets_reset_on_reconnect():
         writer2.write(client_signon)
         await writer2.drain()
         await asyncio.wait_for(reader2.read(7), timeout=1.0)
+        await asyncio.wait_for(reader2.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader2.read(9), timeout=1.0)  # Magic 2
         await asyncio.wait_for(reader2.read(8), timeout=1.0)
 
         writer2.close()
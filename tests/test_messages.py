@@ -0,0 +1,121 @@
+"""Test typed message decoding and the legacy dict view"""
+
+import pytest
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+from swamp.protocol.messages import (
+    ClientSignon,
+    JoinType,
+    JoinUpdate,
+    MessageType,
+    Ping,
+    Pong,
+    Register,
+    SerialBinaryJoin,
+    UnknownJoin,
+    UnknownSerialBinaryJoin,
+)
+from swamp.protocol.swamp_protocol import SwampProtocol
+
+
+def test_decode_frame_returns_typed_messages():
+    """Test that each known frame decodes to its message class"""
+    protocol = SwampProtocol()
+
+    assert type(protocol.decode_frame(bytes([0x0d, 0x00, 0x02, 0x00, 0x00]))) is Ping
+    assert type(protocol.decode_frame(bytes([0x0e, 0x00, 0x02, 0x00, 0x00]))) is Pong
+
+    signon = protocol.decode_frame(bytes([0x0a, 0x00, 0x0a, 0x00, 0x51, 0xa3, 0x42, 0x40, 0x02, 0x00, 0x00, 0x00, 0x00]))
+    assert signon == ClientSignon(bytes([0x00, 0x51, 0xa3, 0x42, 0x40, 0x02, 0x00, 0x00, 0x00, 0x00]))
+
+    update = protocol.decode_frame(bytes([0x05, 0x00, 0x05, 0x00, 0x00, 0x02, 0x03, 0x00]))
+    assert update == JoinUpdate(b'\x00')
+
+    digital = protocol.decode_frame(bytes([0x05, 0x00, 0x06, 0x00, 0x00, 0x03, 0x00, 0x70, 0x49]))
+    assert digital == UnknownJoin(JoinType.DIGITAL, b'\x70\x49')
+
+
+def test_serial_binary_message_fields():
+    """Test that register values decode to integer fields"""
+    protocol = SwampProtocol()
+
+    message = protocol.decode_frame(protocol.encode_route_command_sync(3, 4, 6))
+
+    assert message == SerialBinaryJoin(unit=3, zone=4, register=Register.SOURCE, value=6)
+    assert message.register_name == 'source'
+    assert message.message_type == MessageType.JOIN
+    assert message.join_type == JoinType.SERIAL_BINARY
+
+
+def test_unknown_register_message_type():
+    """Test SERIAL_BINARY with a register message type other than 0x14"""
+    protocol = SwampProtocol()
+    frame = bytes([0x05, 0x00, 0x0e, 0x00, 0x00, 0x0b, 0x20, 0x03, 0x08, 0x20, 0x04, 0x05, 0x15, 0x00, 0x01, 0x00, 0x06])
+
+    message = protocol.decode_frame(frame)
+
+    assert message == UnknownSerialBinaryJoin(unit=3, zone=4, register_msg_type=0x15)
+    assert protocol.decode_message_sync(frame) == {
+        'type': 'join',
+        'join_type': 'serial_binary',
+        'unit': 3,
+        'zone': 4,
+        'register_msg_type': 'unknown_15'
+    }
+
+
+def test_dict_view_matches_legacy_format():
+    """Test that as_dict() reproduces the dicts decode_message has always returned"""
+    protocol = SwampProtocol()
+
+    assert protocol.decode_message_sync(protocol.encode_volume_command_sync(5, 2, 100)) == {
+        'type': 'join',
+        'join_type': 'serial_binary',
+        'unit': 5,
+        'zone': 2,
+        'register': 'volume',
+        'value': 100
+    }
+    assert protocol.decode_message_sync(bytes([0x05, 0x00, 0x05, 0x00, 0x00, 0x02, 0x03, 0x00])) == {
+        'type': 'join',
+        'join_type': 'update',
+        'join_data': '00'
+    }
+    assert protocol.decode_message_sync(bytes([0x05, 0x00, 0x06, 0x00, 0x00, 0x03, 0x00, 0x70, 0x49])) == {
+        'type': 'join',
+        'join_type': 'unknown_00',
+        'join_data': '7049'
+    }
+    assert SerialBinaryJoin(3, 1, 0x07, 1).as_dict()['register'] == 'unknown_07'
+
+
+def test_messages_are_slotted():
+    """Test that message objects carry no per-instance __dict__"""
+    message = SerialBinaryJoin(3, 4, Register.VOLUME, 50)
+
+    assert not hasattr(message, '__dict__')
+
+
+@pytest.mark.asyncio
+async def test_state_accepts_typed_and_dict_messages():
+    """Test that update_from_device handles typed messages and legacy dicts alike"""
+    config = ConfigManager.load(Path('config/config.yaml'))
+    state_manager = StateManager(config)
+
+    await state_manager.update_from_device(SerialBinaryJoin(3, 1, Register.SOURCE, 4))
+    await state_manager.update_from_device(SerialBinaryJoin(3, 1, Register.VOLUME, 55))
+    await state_manager.update_from_device({
+        'type': 'join',
+        'join_type': 'serial_binary',
+        'unit': 3,
+        'zone': 3,
+        'register': 'volume',
+        'value': 20
+    })
+
+    assert state_manager.state.zones[(3, 1)].source_id == 4
+    assert state_manager.state.zones[(3, 1)].source_received
+    assert state_manager.state.zones[(3, 1)].volume == 55
+    assert state_manager.state.zones[(3, 3)].volume == 20
@@ -0,0 +1,150 @@
+"""Test several SWAMP devices connected to one server"""
+
+import asyncio
+import pytest
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+from swamp.protocol.swamp_protocol import SwampProtocol
+from swamp.network.tcp_server import SwampTcpServer
+from tests.mock_swamp import CLIENT_SIGNON, read_message
+from tests.test_helpers import get_free_port
+
+
+def signon_for(ip_id: int) -> bytes:
+    """CLIENT_SIGNON of a device configured with the given IP ID"""
+    return CLIENT_SIGNON[:4] + bytes([ip_id]) + CLIENT_SIGNON[5:]
+
+
+async def sign_on(port: int, unit: int, protocol: SwampProtocol, signon: bytes = CLIENT_SIGNON):
+    """Connect as a device, complete the handshake and echo a register of `unit`"""
+    reader, writer = await asyncio.open_connection('localhost', port)
+    await asyncio.wait_for(reader.read(4), timeout=1.0)  # WHOIS
+    writer.write(signon)
+    writer.write(protocol.encode_route_command_sync(unit, 1, 1))
+    await writer.drain()
+    await asyncio.wait_for(reader.read(7), timeout=1.0)  # CONN_ACCEPTED
+    await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+    await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
+    await asyncio.wait_for(reader.read(8), timeout=1.0)  # JOIN UPDATE
+    return reader, writer
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('receive_mode', ['stream', 'buffered'])
+async def test_commands_routed_to_owning_device(receive_mode):
+    """Test that register writes go to the connection that reported their unit"""
+    test_port = get_free_port()
+
+    config = ConfigManager.load(Path('config/config.yaml'))
+    protocol = SwampProtocol()
+    state_manager = StateManager(config)
+    tcp_server = SwampTcpServer(test_port, protocol, state_manager, receive_mode=receive_mode)
+
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.3)
+
+    try:
+        reader1, writer1 = await sign_on(test_port, 1, protocol, signon_for(0x51))
+        reader2, writer2 = await sign_on(test_port, 2, protocol, signon_for(0x52))
+
+        assert len(tcp_server.connections) == 2
+        device1 = tcp_server.connection_for_unit(1)
+        device2 = tcp_server.connection_for_unit(2)
+        assert device1 is not None and device2 is not None
+        assert device1 is not device2
+        assert state_manager.state.connected
+
+        frame1 = protocol.encode_volume_command_sync(1, 3, 40)
+        frame2 = protocol.encode_volume_command_sync(2, 4, 60)
+        await tcp_server.send_commands([frame1, frame2])
+
+        assert await asyncio.wait_for(read_message(reader1), timeout=1.0) == frame1
+        assert await asyncio.wait_for(read_message(reader2), timeout=1.0) == frame2
+
+        # Frames without a unit go to every device
+        await tcp_server.send_command(protocol.encode_whois_sync())
+        assert await asyncio.wait_for(reader1.read(4), timeout=1.0) == protocol.encode_whois_sync()
+        assert await asyncio.wait_for(reader2.read(4), timeout=1.0) == protocol.encode_whois_sync()
+
+        stats = tcp_server.connection_stats()
+        assert sorted(entry['units'] for entry in stats.values()) == [[1], [2]]
+        assert all(entry['frames_sent'] >= 6 for entry in stats.values())
+
+        # The remaining device keeps its unit and the link stays up
+        writer1.close()
+        await writer1.wait_closed()
+        await asyncio.sleep(0.1)
+        assert list(tcp_server.connections.values()) == [device2]
+        assert tcp_server.connection_for_unit(1) is None
+        assert state_manager.state.connected
+
+        writer2.close()
+        await writer2.wait_closed()
+        await asyncio.sleep(0.1)
+        assert not tcp_server.connections
+        assert not state_manager.state.connected
+        assert not state_manager.state.socket_connected
+
+    finally:
+        server_task.cancel()
+        try:
+            await server_task
+        except asyncio.CancelledError:
+            pass
+        await tcp_server.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('receive_mode', ['stream', 'buffered'])
+async def test_reconnect_supersedes_stale_session(receive_mode):
+    """Test that a device dialling in again replaces its half-open old session"""
+    test_port = get_free_port()
+
+    config = ConfigManager.load(Path('config/config.yaml'))
+    protocol = SwampProtocol()
+    state_manager = StateManager(config)
+    tcp_server = SwampTcpServer(test_port, protocol, state_manager, receive_mode=receive_mode)
+
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.3)
+
+    try:
+        reader1, writer1 = await sign_on(test_port, 1, protocol)
+        stale = tcp_server.connection_for_unit(1)
+
+        # The old socket stays open while the rebooted device signs on again
+        reader2, writer2 = await sign_on(test_port, 1, protocol)
+        await asyncio.sleep(0.05)
+
+        assert stale.superseded
+        assert tcp_server.takeovers == 1
+        assert len(tcp_server.connections) == 1
+        session = tcp_server.connection_for_unit(1)
+        assert session is tcp_server.connection
+        assert session.generation > stale.generation
+        assert session.time_to_operational is not None
+        assert stale.handler_task.done()
+
+        # The stale handler's cleanup left the new session's state alone
+        state = state_manager.state
+        assert state.socket_connected and state.conn_accepted_sent and state.connected
+        assert state.client_address == str(session.address)
+        assert await asyncio.wait_for(reader1.read(), timeout=1.0) == b''
+
+        frame = protocol.encode_volume_command_sync(1, 2, 50)
+        await tcp_server.send_command(frame)
+        assert await asyncio.wait_for(read_message(reader2), timeout=1.0) == frame
+
+        writer1.close()
+        writer2.close()
+        await writer2.wait_closed()
+
+    finally:
+        server_task.cancel()
+        try:
+            await server_task
+        except asyncio.CancelledError:
+            pass
+        await tcp_server.close()
@@ -0,0 +1,273 @@
+"""Test the per-connection outbound queue and writer task"""
+
+import asyncio
+import pytest
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+from swamp.network.outbound import OutboundQueue, Priority
+from swamp.network.tcp_server import SwampTcpServer
+from swamp.protocol.swamp_protocol import SwampProtocol
+from tests.test_helpers import get_free_port
+
+
+class GatedWriter:
+    """Writer stand-in whose drain() blocks until the gate opens"""
+
+    def __init__(self, fail: Exception | None = None):
+        self.batches = []
+        self.writes = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.fail = fail
+
+    def write(self, data):
+        self.writes.append(bytes(data))
+
+    def writelines(self, frames):
+        if self.fail is not None:
+            raise self.fail
+        self.batches.append([bytes(data) for data in frames])
+
+    async def drain(self):
+        await self.gate.wait()
+
+
+@pytest.mark.asyncio
+async def test_pending_frames_batched_in_order():
+    """Test that frames queued while a write is in flight go out as one ordered batch"""
+    writer = GatedWriter()
+    queue = OutboundQueue(writer)
+    queue.start()
+
+    writer.gate.clear()
+    first = queue.submit([b'a'])
+    await asyncio.sleep(0)  # Writer task takes 'a' and blocks in drain
+    waiters = [queue.submit([bytes([ord('b') + i])]) for i in range(3)]
+    assert queue.depth == 3
+
+    writer.gate.set()
+    await asyncio.gather(first, *waiters)
+
+    assert writer.batches == [[b'a'], [b'b', b'c', b'd']]
+    assert queue.depth == 0
+    assert queue.frames_sent == 4
+    assert queue.batches_sent == 2
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_fire_and_forget():
+    """Test that frames submitted without waiting are still sent"""
+    writer = GatedWriter()
+    queue = OutboundQueue(writer)
+    queue.start()
+
+    assert queue.submit([b'x', b'y'], wait=False) is None
+    await asyncio.sleep(0.01)
+
+    assert writer.batches == [[b'x', b'y']]
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_write_error_reaches_waiters():
+    """Test that a failed write fails the waiting callers"""
+    queue = OutboundQueue(GatedWriter(fail=OSError('broken pipe')))
+    queue.start()
+
+    with pytest.raises(OSError):
+        await queue.submit([b'x'])
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_close_fails_pending_and_rejects_new_frames():
+    """Test that closing the queue fails queued frames and refuses new ones"""
+    writer = GatedWriter()
+    writer.gate.clear()
+    queue = OutboundQueue(writer)
+    queue.start()
+
+    in_flight = queue.submit([b'a'])
+    await asyncio.sleep(0)
+    queued = queue.submit([b'b'])
+    await queue.close()
+
+    for waiter in (in_flight, queued):
+        with pytest.raises(ConnectionError):
+            await waiter
+    with pytest.raises(ConnectionError):
+        queue.submit([b'c'])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_senders_send_magic_packets_once():
+    """Test that concurrent callers can't race the magic packet check"""
+    config = ConfigManager.load(Path('config/config.yaml'))
+    protocol = SwampProtocol()
+    tcp_server = SwampTcpServer(get_free_port(), protocol, StateManager(config))
+    writer = GatedWriter()
+    connection = tcp_server._add_connection(writer, ('127.0.0.1', 0))
+
+    frames = [protocol.encode_volume_command_sync(5, zone, 30) for zone in range(1, 6)]
+    await asyncio.gather(*(tcp_server.send_command(frame) for frame in frames))
+
+    assert writer.writes == list(protocol.encode_join_digital_magic())
+    assert [frame for batch in writer.batches for frame in batch] == frames
+    assert tcp_server.magic_packets_sent
+    await connection.close()
+
+
+@pytest.mark.asyncio
+async def test_superseded_register_writes_elided():
+    """Test that only the newest queued value per register is sent"""
+    protocol = SwampProtocol()
+    writer = GatedWriter()
+    queue = OutboundQueue(writer, coalesce_key=protocol.coalesce_key)
+    queue.start()
+
+    writer.gate.clear()
+    first = queue.submit([protocol.encode_volume_command_sync(1, 1, 10)])
+    await asyncio.sleep(0)  # Writer task blocks in drain
+    ramp = [queue.submit([protocol.encode_volume_command_sync(1, 1, volume)]) for volume in range(20, 70, 10)]
+    route = queue.submit([protocol.encode_route_command_sync(1, 1, 3)])
+    other_zone = queue.submit([protocol.encode_volume_command_sync(1, 2, 20)])
+    assert queue.depth == 3
+    assert queue.frames_elided == 4
+
+    writer.gate.set()
+    await asyncio.gather(first, *ramp, route, other_zone)
+
+    assert writer.batches == [
+        [protocol.encode_volume_command_sync(1, 1, 10)],
+        [
+            protocol.encode_volume_command_sync(1, 1, 60),
+            protocol.encode_route_command_sync(1, 1, 3),
+            protocol.encode_volume_command_sync(1, 2, 20),
+        ],
+    ]
+    assert queue.frames_sent == 4
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_superseded_waiters_resolve_in_submission_order():
+    """Test that callers of a coalesced register write are resumed oldest first"""
+    protocol = SwampProtocol()
+    writer = GatedWriter()
+    queue = OutboundQueue(writer, coalesce_key=protocol.coalesce_key)
+    queue.start()
+
+    writer.gate.clear()
+    in_flight = queue.submit([protocol.encode_volume_command_sync(1, 1, 5)])
+    await asyncio.sleep(0)  # Writer task blocks in drain
+    resumed = []
+    waiters = [queue.submit([protocol.encode_volume_command_sync(1, 1, volume)]) for volume in (10, 20, 30)]
+    queue.submit([protocol.encode_volume_command_sync(1, 1, 40)], wait=False)
+    for i, waiter in enumerate(waiters):
+        waiter.add_done_callback(lambda _, i=i: resumed.append(i))
+
+    writer.gate.set()
+    await asyncio.gather(in_flight, *waiters)
+
+    assert resumed == [0, 1, 2]
+    assert writer.batches[-1] == [protocol.encode_volume_command_sync(1, 1, 40)]
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_multi_frame_submit_waits_for_superseding_frames():
+    """Test that a submit whose earlier frame was superseded resolves once the newer value is sent"""
+    protocol = SwampProtocol()
+    writer = GatedWriter()
+    queue = OutboundQueue(writer, coalesce_key=protocol.coalesce_key, background_batch_size=1)
+    queue.start()
+
+    writer.gate.clear()
+    in_flight = queue.submit([protocol.encode_volume_command_sync(3, 1, 5)])
+    await asyncio.sleep(0)  # Writer task blocks in drain
+    queue.submit([protocol.encode_volume_command_sync(2, 1, 10)], wait=False, priority=Priority.BACKGROUND)
+    scene = queue.submit([protocol.encode_volume_command_sync(1, 1, 10),
+                          protocol.encode_volume_command_sync(1, 2, 10)])
+    # Supersedes the scene's first frame, but leaves in the next BACKGROUND slice
+    ramp = queue.submit([protocol.encode_volume_command_sync(1, 1, 20)], priority=Priority.BACKGROUND)
+    resolved_at_write = []
+
+    def writelines(frames):
+        resolved_at_write.append(scene.done())
+        GatedWriter.writelines(writer, frames)
+
+    writer.writelines = writelines
+    writer.gate.set()
+    await asyncio.gather(in_flight, scene, ramp)
+
+    assert writer.batches[1:] == [
+        [protocol.encode_volume_command_sync(1, 2, 10), protocol.encode_volume_command_sync(2, 1, 10)],
+        [protocol.encode_volume_command_sync(1, 1, 20)],
+    ]
+    assert resolved_at_write == [False, False]  # Still waiting when the newer value is written
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_uncoalesced_frames_never_elided():
+    """Test that frames without a coalesce key are all sent"""
+    protocol = SwampProtocol()
+    writer = GatedWriter()
+    writer.gate.clear()
+    queue = OutboundQueue(writer, coalesce_key=protocol.coalesce_key)
+    queue.start()
+
+    in_flight = queue.submit([protocol.encode_pong_sync()])
+    await asyncio.sleep(0)
+    queued = [queue.submit([protocol.encode_pong_sync()]) for _ in range(3)]
+
+    writer.gate.set()
+    await asyncio.gather(in_flight, *queued)
+
+    assert queue.frames_elided == 0
+    assert queue.frames_sent == 4
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_control_and_interactive_frames_overtake_background():
+    """Test that urgent frames are written ahead of queued bulk traffic"""
+    writer = GatedWriter()
+    writer.gate.clear()
+    queue = OutboundQueue(writer, background_batch_size=2)
+    queue.start()
+
+    in_flight = queue.submit([b'a'])
+    await asyncio.sleep(0)
+    ramp = queue.submit([b'r1', b'r2', b'r3', b'r4'], priority=Priority.BACKGROUND)
+    power_off = queue.submit([b'off'])
+    ping = queue.submit([b'ping'], priority=Priority.CONTROL)
+
+    writer.gate.set()
+    await asyncio.gather(in_flight, ramp, power_off, ping)
+
+    assert writer.batches == [[b'a'], [b'ping', b'off', b'r1', b'r2'], [b'r3', b'r4']]
+    assert queue.depth == 0
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_latency_recorded_per_class():
+    """Test that submit-to-drained latency is tracked per traffic class"""
+    writer = GatedWriter()
+    queue = OutboundQueue(writer)
+    queue.start()
+
+    await queue.submit([b'ping'], priority=Priority.CONTROL)
+    await queue.submit([b'r1', b'r2'], priority=Priority.BACKGROUND)
+
+    assert queue.latency[Priority.CONTROL].count == 1
+    assert queue.latency[Priority.BACKGROUND].count == 2
+    assert queue.latency[Priority.INTERACTIVE].count == 0
+    assert queue.latency[Priority.INTERACTIVE].mean == 0.0
+    stats = queue.latency[Priority.BACKGROUND]
+    assert 0.0 <= stats.mean <= stats.max
+    await queue.close()
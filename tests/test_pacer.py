@@ -0,0 +1,150 @@
+"""Test token-bucket pacing of commands to the amp"""
+
+import asyncio
+import pytest
+import yaml
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.models.config import RateLimit
+from swamp.network.outbound import OutboundQueue, Priority
+from swamp.network.pacer import CommandPacer, TokenBucket
+from swamp.core.state_manager import StateManager
+from swamp.network.tcp_server import SwampTcpServer
+from swamp.protocol.swamp_protocol import SwampProtocol
+from tests.test_helpers import RecordingWriter, get_free_port
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_up_to_burst():
+    """Test that a bucket starts full, empties, and refills at its rate"""
+    bucket = TokenBucket(rate=10, burst=2, now=0.0)
+
+    for _ in range(2):
+        assert bucket.delay(0.0) == 0.0
+        bucket.take()
+    assert bucket.delay(0.0) == pytest.approx(0.1)
+    assert bucket.delay(0.05) == pytest.approx(0.05)
+    assert bucket.delay(10.0) == 0.0
+    bucket.take()
+    bucket.take()
+    assert bucket.delay(10.0) > 0  # Capped at burst, not 100 tokens
+
+
+def test_global_budget_shared_by_units():
+    """Test that the global bucket limits all units together"""
+    clock = FakeClock()
+    pacer = CommandPacer(RateLimit(commands_per_second=10, burst=2), clock)
+
+    assert pacer.acquire(1) == 0.0
+    assert pacer.acquire(2) == 0.0
+    assert pacer.acquire(3) == pytest.approx(0.1)
+    assert pacer.times_throttled == 1
+
+    clock.now = 0.1
+    assert pacer.acquire(3) == 0.0
+
+
+def test_unit_budget_is_per_unit():
+    """Test that one busy unit doesn't use up another unit's budget"""
+    clock = FakeClock()
+    pacer = CommandPacer(RateLimit(unit_commands_per_second=5, unit_burst=1), clock)
+
+    assert pacer.acquire(1) == 0.0
+    assert pacer.acquire(1) == pytest.approx(0.2)
+    assert pacer.acquire(2) == 0.0
+
+
+def test_rate_limit_loaded_from_config(tmp_path):
+    """Test that the optional rate-limit section is parsed"""
+    path = tmp_path / 'config.yaml'
+    base = yaml.safe_load(open('config/config.yaml'))
+    path.write_text(yaml.safe_dump(base))
+    assert ConfigManager.load(path).rate_limit is None
+
+    base['rate-limit'] = {'commands-per-second': 100, 'burst': 20, 'unit-commands-per-second': 50}
+    path.write_text(yaml.safe_dump(base))
+    assert ConfigManager.load(path).rate_limit == RateLimit(
+        commands_per_second=100, burst=20, unit_commands_per_second=50, unit_burst=1
+    )
+
+
+@pytest.mark.asyncio
+async def test_outbound_queue_paces_register_writes():
+    """Test that paced writes are delayed, not dropped, and keepalives aren't paced"""
+    protocol = SwampProtocol()
+    writer = RecordingWriter()
+    pacer = CommandPacer(RateLimit(commands_per_second=50, burst=2))
+    queue = OutboundQueue(writer, coalesce_key=protocol.coalesce_key, pacer=pacer)
+    queue.start()
+
+    frames = [protocol.encode_volume_command_sync(1, zone, 30) for zone in range(1, 6)]
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    sent = queue.submit(frames)
+    ping = queue.submit([protocol.encode_ping_sync()], priority=Priority.CONTROL)
+    await asyncio.gather(sent, ping)
+
+    # Burst of 2, then 3 more at 50/s
+    assert loop.time() - start >= 0.05
+    assert [frame for batch in writer.batches for frame in batch] == [protocol.encode_ping_sync()] + frames
+    assert writer.batches[0][0] == protocol.encode_ping_sync()
+    assert pacer.times_throttled > 0
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_throttled_unit_does_not_hold_up_others():
+    """Test that a unit out of tokens only delays its own writes, which keep their order"""
+    protocol = SwampProtocol()
+    writer = RecordingWriter()
+    queue = OutboundQueue(writer, coalesce_key=protocol.coalesce_key,
+                          pacer=CommandPacer(RateLimit(unit_commands_per_second=10, unit_burst=1)))
+    queue.start()
+
+    unit1 = [protocol.encode_volume_command_sync(1, zone, 30) for zone in (1, 2, 3)]
+    unit2 = protocol.encode_volume_command_sync(2, 1, 30)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    busy = queue.submit(unit1)
+    await queue.submit([unit2])
+    unit2_sent = loop.time() - start
+    await busy
+
+    assert unit2_sent < 0.05
+    assert loop.time() - start >= 0.19  # Unit 1: 1, then 2 more at 10/s
+    assert writer.batches[0] == [unit1[0], unit2]
+    assert [frame for batch in writer.batches for frame in batch if frame != unit2] == unit1
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_connections_share_global_budget():
+    """Test that every device connection draws on the server's one global bucket"""
+    protocol = SwampProtocol()
+    config = ConfigManager.load(Path('config/config.yaml'))
+    tcp_server = SwampTcpServer(get_free_port(), protocol, StateManager(config),
+                                rate_limit=RateLimit(commands_per_second=20, burst=2))
+    connections = [tcp_server._add_connection(RecordingWriter(), ('127.0.0.1', port)) for port in (1, 2)]
+    for connection in connections:
+        connection.magic_packets_sent = True
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await asyncio.gather(*(
+        connection.outbound.submit([protocol.encode_volume_command_sync(unit, zone, 30) for zone in (1, 2)])
+        for unit, connection in zip((3, 4), connections)
+    ))
+
+    # Burst of 2 for both links together, then 2 more at 20/s
+    assert loop.time() - start >= 0.09
+    assert connections[0].outbound.pacer is connections[1].outbound.pacer is tcp_server.pacer
+    assert tcp_server.pacer.times_throttled > 0
+    await tcp_server.close_clients()
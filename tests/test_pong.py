@@ -51,6 +51,8 @@ async def test_pong_not_printed_as_unknown():
         # Read CONN_ACCEPTED
         conn_accepted = await asyncio.wait_for(reader.read(7), timeout=1.0)
         assert conn_accepted == bytes([0x02, 0x00, 0x04, 0x00, 0x00, 0x00, 0x03])
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
 
         # Read JOIN UPDATE
         join_update = await asyncio.wait_for(reader.read(8), timeout=1.0)
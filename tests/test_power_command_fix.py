@@ -36,6 +36,10 @@ async def test_power_on_uses_correct_source():
         writer.write(client_signon)
         await writer.drain()
         await asyncio.wait_for(reader.read(7), timeout=1.0)  # CONN_ACCEPTED
+        # Magic packets follow CONN_ACCEPTED, ahead of JOIN UPDATE and any command
+        magic1, magic2 = protocol.encode_join_digital_magic()
+        assert await asyncio.wait_for(reader.read(9), timeout=1.0) == magic1
+        assert await asyncio.wait_for(reader.read(9), timeout=1.0) == magic2
         await asyncio.wait_for(reader.read(8), timeout=1.0)  # JOIN UPDATE
 
         # Find a source with swamp_source_id != 1 to test with
@@ -56,11 +60,7 @@ async def test_power_on_uses_correct_source():
         # Send power on command with our test source
         await controller.set_power(target_id, True, test_source.id)
 
-        # Should receive magic packets first
-        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
-        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
-
-        # Then receive SERIAL_BINARY commands for each zone
+        # Then receive SERIAL_BINARY commands for each zone, with no further magic packets
         for _ in range(num_zones):
             msg = await asyncio.wait_for(reader.read(17), timeout=1.0)
 
@@ -109,6 +109,10 @@ async def test_power_off_sets_source_zero():
         writer.write(client_signon)
         await writer.drain()
         await asyncio.wait_for(reader.read(7), timeout=1.0)  # CONN_ACCEPTED
+        # Magic packets follow CONN_ACCEPTED, ahead of JOIN UPDATE and any command
+        magic1, magic2 = protocol.encode_join_digital_magic()
+        assert await asyncio.wait_for(reader.read(9), timeout=1.0) == magic1
+        assert await asyncio.wait_for(reader.read(9), timeout=1.0) == magic2
         await asyncio.wait_for(reader.read(8), timeout=1.0)  # JOIN UPDATE
 
         # Get first target
@@ -119,11 +123,7 @@ async def test_power_off_sets_source_zero():
         # Send power off command
         await controller.set_power(target_id, False, None)
 
-        # Should receive magic packets first
-        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
-        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
-
-        # Then receive SERIAL_BINARY commands for each zone
+        # Then receive SERIAL_BINARY commands for each zone, with no further magic packets
         for _ in range(num_zones):
             msg = await asyncio.wait_for(reader.read(17), timeout=1.0)
 
@@ -173,6 +173,9 @@ async def test_route_vs_power_consistency():
         async def send_command(self, data: bytes):
             self.commands_sent.append(data)
 
+        async def send_commands(self, frames):
+            self.commands_sent.extend(frames)
+
     tcp = MockTcp()
     controller = SwampController(config, tcp, state_manager)
 
@@ -0,0 +1,137 @@
+"""Test batched multi-zone command writes"""
+
+import asyncio
+import pytest
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+from swamp.protocol.swamp_protocol import SwampProtocol
+from swamp.network.tcp_server import SwampTcpServer
+from swamp.core.controller import SwampController
+from tests.test_helpers import RecordingWriter, get_free_port
+
+
+def attach_writer(tcp_server: SwampTcpServer, writer, address=('127.0.0.1', 0)):
+    """Set up the outbound path as a device connection would"""
+    return tcp_server._add_connection(writer, address)
+
+
+@pytest.mark.asyncio
+async def test_send_commands_single_write_and_drain():
+    """Test that all frames go out in one writelines() with one drain"""
+    config = ConfigManager.load(Path('config/config.yaml'))
+    protocol = SwampProtocol()
+    tcp_server = SwampTcpServer(get_free_port(), protocol, StateManager(config))
+    attach_writer(tcp_server, RecordingWriter())
+    tcp_server.magic_packets_sent = True
+
+    frames = [protocol.encode_volume_command_sync(5, zone, 40) for zone in range(1, 6)]
+    await tcp_server.send_commands(frames)
+    await tcp_server.connection.close()
+
+    assert tcp_server.client_writer.calls == [('writelines', frames), ('drain',)]
+
+
+@pytest.mark.asyncio
+async def test_send_commands_sends_magic_packets_first():
+    """Test that magic packets precede the first SERIAL_BINARY batch only"""
+    config = ConfigManager.load(Path('config/config.yaml'))
+    protocol = SwampProtocol()
+    tcp_server = SwampTcpServer(get_free_port(), protocol, StateManager(config))
+    attach_writer(tcp_server, RecordingWriter())
+    magic1, magic2 = protocol.encode_join_digital_magic()
+
+    frames = [protocol.encode_route_command_sync(5, zone, 6) for zone in range(1, 3)]
+    await tcp_server.send_commands(frames)
+    await tcp_server.send_commands(frames)
+    await tcp_server.connection.close()
+
+    assert tcp_server.client_writer.calls == [
+        ('write', magic1), ('drain',),
+        ('write', magic2), ('drain',),
+        ('writelines', frames), ('drain',),
+        ('writelines', frames), ('drain',),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_send_commands_requires_connection():
+    """Test that sending without a device connected raises ConnectionError"""
+    config = ConfigManager.load(Path('config/config.yaml'))
+    tcp_server = SwampTcpServer(get_free_port(), SwampProtocol(), StateManager(config))
+
+    with pytest.raises(ConnectionError):
+        await tcp_server.send_commands([b'\x0f\x00\x01\x02'])
+
+
+@pytest.mark.asyncio
+async def test_multi_zone_volume_arrives_together():
+    """Test that a five-zone target's volume change reaches the device in one read"""
+    test_port = get_free_port()
+
+    config = ConfigManager.load(Path('config/config.yaml'))
+    protocol = SwampProtocol()
+    state_manager = StateManager(config)
+    tcp_server = SwampTcpServer(test_port, protocol, state_manager)
+    controller = SwampController(config, tcp_server, state_manager)
+
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.3)
+
+    try:
+        reader, writer = await asyncio.open_connection('localhost', test_port)
+        await asyncio.wait_for(reader.read(4), timeout=1.0)  # WHOIS
+        tcp_server.magic_packets_sent = True
+
+        await controller.set_volume('loggia', 40)
+        data = await asyncio.wait_for(reader.read(1024), timeout=1.0)
+
+        zones = state_manager.get_zones_for_target('loggia')
+        assert len(zones) == 5
+        assert data == b''.join(
+            protocol.encode_volume_command_sync(zone.unit, zone.zone, 40) for zone in zones
+        )
+        assert all(zone.volume == 40 for zone in zones)
+
+        writer.close()
+        await writer.wait_closed()
+
+    finally:
+        server_task.cancel()
+        try:
+            await server_task
+        except asyncio.CancelledError:
+            pass
+        await tcp_server.close()
+
+
+def test_magic_packets_sent_without_connection():
+    """Test that the most-recent-connection shortcut fails cleanly with no device"""
+    config = ConfigManager.load(Path('config/config.yaml'))
+    tcp_server = SwampTcpServer(get_free_port(), SwampProtocol(), StateManager(config))
+
+    assert not tcp_server.magic_packets_sent
+    with pytest.raises(ConnectionError):
+        tcp_server.magic_packets_sent = True
+
+
+@pytest.mark.asyncio
+async def test_set_volume_clamps_out_of_range_and_float_levels():
+    """Test that the level sent and the level assumed agree for out-of-range and float input"""
+    config = ConfigManager.load(Path('config/config.yaml'))
+    protocol = SwampProtocol()
+    state_manager = StateManager(config)
+    tcp_server = SwampTcpServer(get_free_port(), protocol, state_manager)
+    controller = SwampController(config, tcp_server, state_manager)
+    attach_writer(tcp_server, RecordingWriter())
+    tcp_server.magic_packets_sent = True
+    zone = state_manager.get_zones_for_target('office-terrace')[0]
+
+    for level, expected in ((-5, 0), (250, 100), (50.4, 50), (49.6, 50)):
+        await controller.set_volume('office-terrace', level)
+        assert tcp_server.client_writer.batches[-1] == [
+            protocol.encode_volume_command_sync(zone.unit, zone.zone, expected)
+        ]
+        assert zone.volume == expected
+    await tcp_server.connection.close()
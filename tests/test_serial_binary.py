@@ -162,6 +162,8 @@ async def test_serial_binary_state_update_source():
 
         # Read CONN_ACCEPTED and JOIN UPDATE
         await asyncio.wait_for(reader.read(7), timeout=1.0)
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
         await asyncio.wait_for(reader.read(8), timeout=1.0)
 
         # Send SERIAL_BINARY source update
@@ -225,6 +227,8 @@ async def test_serial_binary_state_update_volume():
 
         # Read CONN_ACCEPTED and JOIN UPDATE
         await asyncio.wait_for(reader.read(7), timeout=1.0)
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
         await asyncio.wait_for(reader.read(8), timeout=1.0)
 
         # Send SERIAL_BINARY volume update (75% = 0xbfff)
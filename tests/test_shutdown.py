@@ -39,6 +39,8 @@ async def test_shutdown_with_connected_client():
 
         # Read CONN_ACCEPTED and JOIN UPDATE
         await asyncio.wait_for(reader.read(7), timeout=1.0)  # CONN_ACCEPTED
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
         await asyncio.wait_for(reader.read(8), timeout=1.0)  # JOIN UPDATE
 
         # Verify client is connected
@@ -0,0 +1,121 @@
+"""Test TCP options applied to device sockets"""
+
+import asyncio
+import socket
+import statistics
+import pytest
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+from swamp.models.config import SocketOptions
+from swamp.protocol.swamp_protocol import SwampProtocol
+from swamp.network.tcp_server import SwampTcpServer
+from tests.mock_swamp import CLIENT_SIGNON, read_message
+from tests.test_helpers import get_free_port
+
+
+async def start_server(receive_mode='stream', socket_options=None):
+    config = ConfigManager.load(Path('config/config.yaml'))
+    tcp_server = SwampTcpServer(get_free_port(), SwampProtocol(), StateManager(config),
+                                receive_mode=receive_mode, socket_options=socket_options)
+    server_task = asyncio.create_task(tcp_server.start())
+    await asyncio.sleep(0.3)
+    return tcp_server, server_task
+
+
+async def stop_server(tcp_server, server_task):
+    server_task.cancel()
+    try:
+        await server_task
+    except asyncio.CancelledError:
+        pass
+    await tcp_server.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('receive_mode', ['stream', 'buffered'])
+async def test_default_socket_options(receive_mode):
+    """Test that accepted sockets get TCP_NODELAY and TCP keepalive"""
+    tcp_server, server_task = await start_server(receive_mode)
+    try:
+        reader, writer = await asyncio.open_connection('localhost', tcp_server.port)
+        await asyncio.wait_for(reader.read(4), timeout=1.0)  # WHOIS
+
+        sock = tcp_server.client_writer.transport.get_extra_info('socket')
+        assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+        assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE) == 30
+            assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL) == 10
+            assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT) == 3
+
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        await stop_server(tcp_server, server_task)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('receive_mode', ['stream', 'buffered'])
+async def test_custom_socket_options(receive_mode):
+    """Test that configured options replace the defaults"""
+    options = SocketOptions(nodelay=False, keepalive_idle=0, write_buffer_high=4096, write_buffer_low=1024)
+    tcp_server, server_task = await start_server(receive_mode, options)
+    try:
+        reader, writer = await asyncio.open_connection('localhost', tcp_server.port)
+        await asyncio.wait_for(reader.read(4), timeout=1.0)  # WHOIS
+
+        transport = tcp_server.client_writer.transport
+        sock = transport.get_extra_info('socket')
+        assert not sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+        assert not sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+        assert transport.get_write_buffer_limits() == (1024, 4096)
+
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        await stop_server(tcp_server, server_task)
+
+
+@pytest.mark.asyncio
+async def test_single_command_latency():
+    """Test that lone commands reach the device without a Nagle / delayed-ACK stall"""
+    tcp_server, server_task = await start_server()
+    protocol = tcp_server.protocol
+    try:
+        reader, writer = await asyncio.open_connection('localhost', tcp_server.port)
+        writer.write(CLIENT_SIGNON)
+        await writer.drain()
+        while not tcp_server.magic_packets_sent:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.2)  # Past the magic packet settle time
+
+        loop = asyncio.get_running_loop()
+        latencies = []
+        for level in range(20):
+            frame = protocol.encode_volume_command_sync(1, 1, level)
+            start = loop.time()
+            await tcp_server.send_command(frame)
+            while await asyncio.wait_for(read_message(reader), timeout=1.0) != frame:
+                pass
+            latencies.append(loop.time() - start)
+            # The device answers, as it echoes register writes, then goes quiet
+            writer.write(frame)
+            await writer.drain()
+            await asyncio.sleep(0.005)
+
+        # A stall waiting for the device's delayed ACK takes ~40ms
+        assert statistics.median(latencies) < 0.02
+
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        await stop_server(tcp_server, server_task)
+
+
+@pytest.mark.parametrize('high, low', [(100, 200), (-1, None), (None, -1)])
+def test_invalid_write_buffer_limits_rejected(high, low):
+    """Test that write buffer limits the transport would refuse are rejected up front"""
+    with pytest.raises(ValueError, match='write_buffer'):
+        SocketOptions(write_buffer_high=high, write_buffer_low=low)
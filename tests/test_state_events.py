@@ -0,0 +1,136 @@
+"""Test state change events from StateManager"""
+
+import asyncio
+import pytest
+from contextlib import aclosing
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.state_manager import StateManager
+from swamp.models.state import Origin, StateChange
+from swamp.protocol.messages import Register, SerialBinaryJoin
+
+
+def volume(unit, zone, value):
+    return SerialBinaryJoin(unit, zone, Register.VOLUME, value)
+
+
+def source(unit, zone, value):
+    return SerialBinaryJoin(unit, zone, Register.SOURCE, value)
+
+
+@pytest.fixture
+def state_manager():
+    return StateManager(ConfigManager.load(Path('config/config.yaml')))
+
+
+async def test_device_change_published_once(state_manager):
+    """Test that only values that actually change are published"""
+    changes = []
+    state_manager.subscribe(changes.append)
+
+    await state_manager.apply_batch([volume(3, 1, 40), volume(3, 1, 40), volume(3, 3, 0)])
+    await state_manager.update_from_device(volume(3, 1, 40))
+
+    assert changes == [StateChange(3, 1, 'volume', 0, 40, Origin.DEVICE)]
+
+
+async def test_source_marks_zone_received(state_manager):
+    """Test that the first source report also publishes source_received"""
+    changes = []
+    state_manager.subscribe(changes.append)
+
+    await state_manager.update_from_device(source(3, 1, 4))
+    await state_manager.update_from_device(source(3, 1, 4))
+
+    assert [(change.field, change.new) for change in changes] == [('source_id', 4), ('source_received', True)]
+
+
+async def test_optimistic_changes(state_manager):
+    """Test that values assumed after a command are published as optimistic"""
+    changes = []
+    state_manager.subscribe(changes.append)
+    zones = state_manager.get_zones_for_target('office-terrace')
+
+    state_manager.set_optimistic(zones, power=True, source_id=5)
+    state_manager.set_optimistic(zones, power=True)
+
+    assert changes == [
+        StateChange(3, 1, 'power', False, True, Origin.OPTIMISTIC),
+        StateChange(3, 1, 'source_id', None, 5, Origin.OPTIMISTIC),
+    ]
+
+
+async def test_zone_filtered_subscription(state_manager):
+    """Test that a zone subscriber only hears about its zones, until it unsubscribes"""
+    changes = []
+    unsubscribe = state_manager.subscribe(changes.append, zones=[(3, 3)])
+
+    await state_manager.apply_batch([volume(3, 1, 10), volume(3, 3, 20)])
+    unsubscribe()
+    await state_manager.apply_batch([volume(3, 3, 30)])
+
+    assert [(change.key, change.new) for change in changes] == [((3, 3), 20)]
+    assert not state_manager.events
+
+
+async def test_failing_subscriber_isolated(state_manager):
+    """Test that an exception in one callback doesn't stop the others or the update"""
+    changes = []
+
+    def broken(change):
+        raise RuntimeError('boom')
+
+    state_manager.subscribe(broken)
+    state_manager.subscribe(changes.append)
+    await state_manager.update_from_device(volume(3, 1, 55))
+
+    assert len(changes) == 1
+    assert state_manager.state.zones[(3, 1)].volume == 55
+
+
+async def test_async_iterator(state_manager):
+    """Test consuming changes with async for"""
+    received = []
+
+    async def consume():
+        async with aclosing(state_manager.changes(zones=[(3, 1)])) as changes:
+            async for change in changes:
+                received.append(change)
+                if len(received) == 2:
+                    break
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0)
+    await state_manager.apply_batch([volume(3, 1, 10), volume(3, 3, 10), volume(3, 1, 20)])
+    await asyncio.wait_for(task, timeout=1.0)
+
+    assert [change.new for change in received] == [10, 20]
+    assert not state_manager.events
+
+
+async def test_changes_subscribe_before_first_iteration(state_manager):
+    """Test that changes published before the first iteration are not lost"""
+    async with aclosing(state_manager.changes(zones=[(3, 1)])) as changes:
+        await state_manager.update_from_device(volume(3, 1, 30))
+        change = await asyncio.wait_for(anext(changes), timeout=1.0)
+
+    assert change.new == 30
+    assert not state_manager.events
+
+
+async def test_changes_backlog_drops_oldest(state_manager):
+    """Test that a consumer falling behind loses the oldest changes, not the newest"""
+    changes = state_manager.events.changes(backlog=2)
+    await state_manager.apply_batch([volume(3, 1, level) for level in (10, 20, 30, 40)])
+
+    assert [(await anext(changes)).new for _ in range(2)] == [30, 40]
+    assert changes.dropped == 2
+    await changes.aclose()
+    assert not state_manager.events
+
+
+async def test_abandoned_changes_iterator_unsubscribes(state_manager):
+    """Test that a changes() iterator that is dropped without closing stops receiving"""
+    state_manager.changes()
+    assert not state_manager.events
@@ -0,0 +1,71 @@
+"""Test StateManager's indexed target, source and zone lookups"""
+
+import dataclasses
+import pytest
+from pathlib import Path
+
+from swamp.core.config_manager import ConfigManager
+from swamp.core.controller import SwampController
+from swamp.core.state_manager import StateManager
+from swamp.models.config import SwampZone, Target
+from swamp.network.tcp_server import SwampTcpServer
+from swamp.protocol.swamp_protocol import SwampProtocol
+from tests.test_helpers import get_free_port
+
+
+@pytest.fixture
+def state_manager():
+    return StateManager(ConfigManager.load(Path('config/config.yaml')))
+
+
+def test_zones_for_target(state_manager):
+    """Test that a target's zones are the live ZoneState objects, in config order"""
+    zones = state_manager.get_zones_for_target('loggia')
+
+    assert [(z.unit, z.zone) for z in zones] == [(5, zone) for zone in range(1, 6)]
+    assert zones[0] is state_manager.state.zones[(5, 1)]
+    assert state_manager.get_zones_for_target('loggia') is zones
+    with pytest.raises(ValueError, match='Unknown target'):
+        state_manager.get_zones_for_target('attic')
+
+
+def test_source_lookups(state_manager):
+    """Test looking sources up by id and by SWAMP source number"""
+    assert state_manager.get_source_by_id('music-b').swamp_source_id == 5
+    assert state_manager.get_source_by_swamp_id(6).id == 'music-main'
+    assert state_manager.get_source_by_swamp_id(0) is None
+    with pytest.raises(ValueError, match='Unknown source'):
+        state_manager.get_source_by_id('radio')
+
+
+def test_set_config_rebuilds_indexes(state_manager):
+    """Test that a new config keeps shared zone state, drops removed zones and reindexes"""
+    state_manager.state.zones[(3, 1)].volume = 35
+    config = state_manager.config
+    targets = [t for t in config.targets if t.id != 'loggia']
+    targets.append(Target('garage', 'Garage', [SwampZone(3, 1), SwampZone(6, 1)]))
+
+    state_manager.set_config(dataclasses.replace(config, targets=targets))
+
+    assert [z.volume for z in state_manager.get_zones_for_target('garage')] == [35, 0]
+    assert (5, 1) not in state_manager.state.zones
+    with pytest.raises(ValueError):
+        state_manager.get_zones_for_target('loggia')
+
+
+async def test_status_after_set_config(state_manager):
+    """Test that the controller follows a config change made through the StateManager"""
+    tcp_server = SwampTcpServer(get_free_port(), SwampProtocol(), state_manager)
+    controller = SwampController(state_manager.config, tcp_server, state_manager)
+    config = state_manager.config
+    targets = [t for t in config.targets if t.id != 'loggia']
+    targets.append(Target('garage', 'Garage', [SwampZone(6, 1)]))
+
+    state_manager.set_config(dataclasses.replace(config, targets=targets))
+    status = await controller.get_status()
+
+    assert controller.config is state_manager.config
+    assert [t['id'] for t in status['targets']] == [t.id for t in targets]
+    assert status['targets'][-1]['zones'] == [
+        {'unit': 6, 'zone': 1, 'power': False, 'volume': 0, 'source': None, 'source_received': False}
+    ]
@@ -0,0 +1,82 @@
+"""Test the synchronous codec API and its async compatibility wrappers"""
+
+import pytest
+
+from swamp.protocol.base import ProtocolHandler
+from swamp.protocol.swamp_protocol import SwampProtocol
+
+
+@pytest.mark.asyncio
+async def test_sync_and_async_encoders_agree():
+    """Test that the async wrappers return exactly what the sync codec does"""
+    protocol = SwampProtocol()
+
+    assert await protocol.encode_route_command(3, 4, 6) == protocol.encode_route_command_sync(3, 4, 6)
+    assert await protocol.encode_volume_command(3, 4, 75) == protocol.encode_volume_command_sync(3, 4, 75)
+    assert await protocol.encode_power_command(3, 4, False) == protocol.encode_power_command_sync(3, 4, False)
+    assert await protocol.encode_whois() == protocol.encode_whois_sync()
+    assert await protocol.encode_pong() == protocol.encode_pong_sync()
+    assert await protocol.encode_conn_accepted() == protocol.encode_conn_accepted_sync()
+    assert await protocol.encode_join_update() == protocol.encode_join_update_sync()
+
+
+@pytest.mark.asyncio
+async def test_sync_and_async_decoders_agree():
+    """Test that decode_message wraps decode_message_sync"""
+    protocol = SwampProtocol()
+    frame = protocol.encode_route_command_sync(3, 4, 6)
+
+    assert await protocol.decode_message(frame) == protocol.decode_message_sync(frame)
+    assert protocol.decode_message_sync(frame)['value'] == 6
+
+
+@pytest.mark.asyncio
+async def test_handler_only_needs_sync_methods():
+    """Test that a ProtocolHandler implementing the sync codec gets async methods for free"""
+
+    class Echo:
+        def __init__(self, length):
+            self.length = length
+
+        def as_dict(self):
+            return {'type': 'echo', 'length': self.length}
+
+    class EchoProtocol(ProtocolHandler):
+        def encode_route_command_sync(self, unit, zone, source_id):
+            return bytes([unit, zone, source_id])
+
+        def encode_volume_command_sync(self, unit, zone, volume):
+            return bytes([unit, zone, volume])
+
+        def encode_power_command_sync(self, unit, zone, power_on):
+            return bytes([unit, zone, int(power_on)])
+
+        def decode_frame(self, data):
+            return Echo(len(data))
+
+        def encode_query_state_sync(self, unit):
+            return bytes([unit])
+
+        def encode_whois_sync(self):
+            return b'w'
+
+        def encode_pong_sync(self):
+            return b'p'
+
+        def encode_conn_accepted_sync(self):
+            return b'c'
+
+    protocol = EchoProtocol()
+
+    assert await protocol.encode_route_command(1, 2, 3) == bytes([1, 2, 3])
+    assert await protocol.encode_power_command(1, 2, True) == bytes([1, 2, 1])
+    assert await protocol.decode_message(b'abc') == {'type': 'echo', 'length': 3}
+    assert await protocol.encode_whois() == b'w'
+
+
+def test_query_state_not_implemented():
+    """Test that the undocumented query state encoder still raises"""
+    protocol = SwampProtocol()
+
+    with pytest.raises(NotImplementedError):
+        protocol.encode_query_state_sync(3)
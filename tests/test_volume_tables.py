@@ -0,0 +1,50 @@
+"""Test the volume conversion lookup tables"""
+
+from swamp.protocol.swamp_protocol import RAW_TO_VOLUME, VOLUME_TO_RAW, SwampProtocol
+from tests.test_helpers import serial_binary
+
+
+def test_every_volume_round_trips():
+    """Test that each 0-100 level decodes back to itself (29 used to come back as 28)"""
+    protocol = SwampProtocol()
+
+    for volume in range(101):
+        message = protocol.decode_frame(protocol.encode_volume_command_sync(3, 1, volume))
+        assert message.value == volume
+
+
+def test_wire_values_unchanged():
+    """Test that encoding produces the same register values as the float conversion"""
+    for volume in range(101):
+        assert VOLUME_TO_RAW[volume] == int((volume / 100) * 0xFFFF)
+
+
+def test_decode_rounds_to_nearest():
+    """Test that raw values from other controllers decode to the nearest level"""
+    protocol = SwampProtocol()
+
+    assert len(RAW_TO_VOLUME) == 0x10000
+    assert protocol.decode_frame(serial_binary(3, 1, 0x02, 0x0000)).value == 0
+    assert protocol.decode_frame(serial_binary(3, 1, 0x02, 0x7fff)).value == 50
+    assert protocol.decode_frame(serial_binary(3, 1, 0x02, 0x8000)).value == 50
+    assert protocol.decode_frame(serial_binary(3, 1, 0x02, 0xffff)).value == 100
+    assert protocol.decode_frame(serial_binary(3, 1, 0x02, 0x0147)).value == 0   # Just under half a step
+    assert protocol.decode_frame(serial_binary(3, 1, 0x02, 0x0148)).value == 1   # Just over half a step
+
+
+def test_volume_clamped():
+    """Test that levels outside 0-100 are clamped rather than wrapping"""
+    protocol = SwampProtocol()
+
+    assert protocol.encode_volume_command_sync(3, 1, -5) == protocol.encode_volume_command_sync(3, 1, 0)
+    assert protocol.encode_volume_command_sync(3, 1, 150) == protocol.encode_volume_command_sync(3, 1, 100)
+
+
+def test_float_levels_round_to_nearest():
+    """Test that float levels (as HA and the control API may pass) are rounded and clamped"""
+    protocol = SwampProtocol()
+
+    assert protocol.encode_volume_command_sync(3, 1, 50.0) == protocol.encode_volume_command_sync(3, 1, 50)
+    assert protocol.encode_volume_command_sync(3, 1, 49.6) == protocol.encode_volume_command_sync(3, 1, 50)
+    assert protocol.encode_volume_command_sync(3, 1, 100.4) == protocol.encode_volume_command_sync(3, 1, 100)
+    assert protocol.encode_volume_command_sync(3, 1, -0.5) == protocol.encode_volume_command_sync(3, 1, 0)
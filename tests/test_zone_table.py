@@ -0,0 +1,100 @@
+"""Test the array-backed zone state table"""
+
+import pytest
+
+from swamp.models.state import ZoneRecord, ZoneState, ZoneTable
+
+
+@pytest.fixture
+def table():
+    table = ZoneTable()
+    for zone in range(1, 5):
+        table.add(3, zone)
+    return table
+
+
+def test_views_read_and_write_columns(table):
+    """Test that a zone's view is reused and its fields are stored in the columns"""
+    zone = table[(3, 2)]
+    zone.volume = 45
+    zone.source_id = 6
+    zone.power = True
+
+    assert table[(3, 2)] is zone
+    assert table.volume[table.row((3, 2))] == 45
+    assert (zone.power, zone.source_id, zone.muted) == (True, 6, False)
+    zone.source_id = None
+    assert zone.source_id is None
+
+
+def test_standalone_zone_state():
+    """Test that a ZoneState built on its own behaves like the old dataclass"""
+    zone = ZoneState(unit=3, zone=4, volume=10)
+    zone.source_received = True
+
+    assert zone == ZoneState(3, 4, volume=10, source_received=True)
+    assert zone.record() == ZoneRecord(3, 4, False, 10, None, False, True)
+    assert 'volume=10' in repr(zone)
+
+
+def test_setitem_copies_fields(table):
+    """Test that assigning a ZoneState copies its values into the table"""
+    table[(4, 1)] = ZoneState(unit=4, zone=1, source_id=5)
+    table[(3, 1)] = ZoneState(unit=3, zone=1, volume=70)
+
+    assert table[(4, 1)].source_id == 5
+    assert table[(3, 1)].volume == 70
+    assert len(table) == 5
+
+
+def test_delete_keeps_rows_dense(table):
+    """Test that removing a zone moves the last row into its place"""
+    table[(3, 4)].volume = 40
+    removed = table[(3, 1)]
+    removed.volume = 15
+    del table[(3, 1)]
+
+    assert (3, 1) not in table
+    assert sorted(table) == [(3, 2), (3, 3), (3, 4)]
+    assert table.row((3, 4)) == 0 and table[(3, 4)].volume == 40
+    assert removed.volume == 15
+    removed.volume = 20
+    assert [r.volume for r in table.records()] == [40, 0, 0]
+
+
+def test_snapshot_and_diff(table):
+    """Test diffing the table against an earlier snapshot"""
+    before = table.snapshot()
+    table[(3, 3)].source_id = 4
+    table[(3, 3)].source_received = True
+    table[(3, 1)].volume = 30
+
+    assert table.diff(before) == [
+        ((3, 1), 'volume', 0, 30),
+        ((3, 3), 'source_id', None, 4),
+        ((3, 3), 'source_received', False, True),
+    ]
+    assert before[(3, 3)].source_id is None
+
+    del table[(3, 2)]
+    assert table.diff(before) == [
+        ((3, 1), 'volume', 0, 30),
+        ((3, 3), 'source_id', None, 4),
+        ((3, 3), 'source_received', False, True),
+    ]
+
+
+def test_out_of_range_and_float_values_clamped(table):
+    """Test that values the column types can't hold are rounded and clamped, not raised"""
+    zone = table[(3, 1)]
+    zone.volume = -5
+    assert zone.volume == 0
+    zone.volume = 70000
+    assert zone.volume == 0xFFFF
+    zone.volume = 42.6
+    assert zone.volume == 43
+    zone.source_id = 4.0
+    assert zone.source_id == 4
+    zone.source_id = -3
+    assert zone.source_id == 0
+    assert ZoneState(3, 9, volume=-1, source_id=2.2).record() == ZoneRecord(3, 9, False, 0, 2, False, False)
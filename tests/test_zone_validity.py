@@ -134,6 +134,8 @@ async def test_status_display_after_source_received():
         writer.write(client_signon)
         await writer.drain()
         await asyncio.wait_for(reader.read(7), timeout=1.0)
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
         await asyncio.wait_for(reader.read(8), timeout=1.0)
 
         # Get first zone from config
@@ -205,6 +207,8 @@ async def test_integration_zone_becomes_valid():
         writer.write(client_signon)
         await writer.drain()
         await asyncio.wait_for(reader.read(7), timeout=1.0)
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 1
+        await asyncio.wait_for(reader.read(9), timeout=1.0)  # Magic 2
         await asyncio.wait_for(reader.read(8), timeout=1.0)
 
         # Initially, all zones should not be valid